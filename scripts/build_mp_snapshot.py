@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+构建Materials Project本地快照
+批量下载常用化学体系（默认Fe、Co、Mn、Ni、Cu、Mo、W的单质、氧化物、硫化物和氮化物）的summary文档，
+供MaterialsProjectTool在覆盖范围内离线回答查询。
+
+用法示例:
+    python scripts/build_mp_snapshot.py
+    python scripts/build_mp_snapshot.py --metals Fe,Mn --anions O,S --chemsys Fe-Mn-O
+    python scripts/build_mp_snapshot.py --elements Fe --output /tmp/mp_snapshot.json.gz
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# 添加项目根目录到Python路径
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+# 确保环境变量已加载
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.config.config import Config
+from src.tools.mp_snapshot import build_snapshot, chemsys_of, default_snapshot_chemsys
+
+
+def _split(value):
+    """拆分逗号分隔的参数"""
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="构建Materials Project本地快照")
+    parser.add_argument("--metals", help="金属元素，逗号分隔（默认取 MP_SNAPSHOT_METALS）")
+    parser.add_argument("--anions", help="阴离子元素，逗号分隔（默认取 MP_SNAPSHOT_ANIONS）")
+    parser.add_argument("--chemsys", action="append", default=[],
+                        help="额外完整下载的化学体系，如 Fe-Mn-O，可重复")
+    parser.add_argument("--elements", action="append", default=[],
+                        help="下载包含这些元素的全部材料，如 Fe 或 Fe,O，可重复")
+    parser.add_argument("--output", default=Config.MP_SNAPSHOT_PATH, help="快照输出路径")
+    parser.add_argument("--batch-size", type=int, default=20, help="每次请求的化学体系数量")
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+
+    if Config.MP_OFFLINE:
+        print("MP_OFFLINE=True 时无法下载快照，请先关闭离线模式")
+        return 1
+
+    # 延迟导入，避免在参数错误时初始化MP客户端
+    from src.tools.materials_project_tool import get_materials_project_tool
+    try:
+        tool = get_materials_project_tool()
+    except (ImportError, ValueError) as e:
+        print(f"无法初始化Materials Project工具: {e}")
+        return 1
+
+    chemsys = default_snapshot_chemsys(_split(args.metals), _split(args.anions))
+    chemsys.extend(chemsys_of(system.split("-")) for system in args.chemsys)
+    element_groups = [_split(group) for group in args.elements if _split(group)]
+
+    def search(**kwargs):
+        # 经过共享的速率与并发控制调用summary接口
+        return tool._call_mp(tool.mpr.materials.summary.search, **kwargs)
+
+    print(f"下载 {len(set(chemsys))} 个化学体系和 {len(element_groups)} 个元素组...")
+    start_time = time.time()
+    snapshot = build_snapshot(search, chemsys=chemsys, elements=element_groups, batch_size=args.batch_size)
+    path = snapshot.save(args.output)
+
+    print(f"快照已保存到 {path}")
+    print(f"记录数: {len(snapshot.records)}, 耗时: {time.time() - start_time:.1f} 秒")
+    print(f"文件大小: {os.path.getsize(path) / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+化学式解析回归检查 / Formula parser regression checks
+覆盖电荷写法（含氧阴离子的下标不能被当作电荷）、规范键和分子量
+/ Covers charge notation (oxyanion subscripts must not be read as charges), canonical keys and molecular weights
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from src.utils.composition import molecular_weight
+from src.utils.formula_parser import canonical_key, formula_charge, name_key, normalize_formula, parse_formula
+
+# (化学式, 规范化写法, 元素计数, 电荷) / (formula, normalized spelling, element counts, charge)
+PARSE_CASES = [
+    # 含氧阴离子：紧邻符号的数字是下标 / Oxyanions: the digit next to the sign is a subscript
+    ("MnO4-", "MnO4^-", {"Mn": 1, "O": 4}, -1),
+    ("NO3-", "NO3^-", {"N": 1, "O": 3}, -1),
+    ("NO2-", "NO2^-", {"N": 1, "O": 2}, -1),
+    ("HSO5-", "HSO5^-", {"H": 1, "S": 1, "O": 5}, -1),
+    ("H2PO4-", "H2PO4^-", {"H": 2, "P": 1, "O": 4}, -1),
+    ("ClO4-", "ClO4^-", {"Cl": 1, "O": 4}, -1),
+    ("NH4+", "NH4^+", {"N": 1, "H": 4}, 1),
+    ("OH-", "OH^-", {"O": 1, "H": 1}, -1),
+    # 多电荷含氧阴离子：下标后紧跟的一位数字是电荷 / Multiply charged oxyanions: the digit after the subscript is the charge
+    ("SO42-", "SO4^2-", {"S": 1, "O": 4}, -2),
+    ("Cr2O72-", "Cr2O7^2-", {"Cr": 2, "O": 7}, -2),
+    ("PO43-", "PO4^3-", {"P": 1, "O": 4}, -3),
+    # 显式电荷 / Explicit charges
+    ("SO4^2-", "SO4^2-", {"S": 1, "O": 4}, -2),
+    ("SO4 2-", "SO4^2-", {"S": 1, "O": 4}, -2),
+    ("MnO4^-", "MnO4^-", {"Mn": 1, "O": 4}, -1),
+    ("[Fe(CN)6]4-", "[Fe(CN)6]^4-", {"Fe": 1, "C": 6, "N": 6}, -4),
+    # 单原子离子 / Monatomic ions
+    ("Fe3+", "Fe^3+", {"Fe": 1}, 3),
+    ("Fe+3", "Fe^+3", {"Fe": 1}, 3),
+    ("Cu2+", "Cu^2+", {"Cu": 1}, 2),
+    ("Ni²⁺", "Ni^2+", {"Ni": 1}, 2),
+    # 中性化合物 / Neutral compounds
+    ("Fe2O3", "Fe2O3", {"Fe": 2, "O": 3}, 0),
+    ("CuSO4·5H2O", "CuSO4·5H2O", {"Cu": 1, "S": 1, "O": 9, "H": 10}, 0),
+]
+
+# (化学式, 规范键) / (formula, canonical key)
+KEY_CASES = [
+    ("HSO5-", "HO5S^-"),
+    ("MnO4-", "MnO4^-"),
+    ("O3Fe2", "Fe2O3"),
+    ("SO42-", "O4S^2-"),
+]
+
+# (名称, 名称键)：化学式保留大小写，普通名称转为小写 / (name, name key): formulas keep their case, plain names are lower-cased
+NAME_KEY_CASES = [
+    ("Co", "Co"),
+    ("CO", "CO"),
+    ("HF", "HF"),
+    ("Hf", "Hf"),
+    ("  Carbon   Monoxide ", "carbon monoxide"),
+]
+
+# (化学式, 分子量) / (formula, molecular weight)
+WEIGHT_CASES = [
+    ("MnO4-", 118.934),
+    ("NO3-", 62.004),
+    ("Fe2O3", 159.687),
+]
+
+
+def run_checks():
+    """运行全部检查，返回失败条目 / Run every check and return the failures"""
+    failures = []
+    for formula, normalized, counts, charge in PARSE_CASES:
+        actual = (normalize_formula(formula), parse_formula(formula), formula_charge(formula))
+        if actual != (normalized, {element: float(amount) for element, amount in counts.items()}, charge):
+            failures.append(f"{formula}: {actual}")
+    for formula, key in KEY_CASES:
+        if canonical_key(formula) != key:
+            failures.append(f"canonical_key({formula}) = {canonical_key(formula)}, 期望 {key}")
+    for name, key in NAME_KEY_CASES:
+        if name_key(name) != key:
+            failures.append(f"name_key({name!r}) = {name_key(name)!r}, 期望 {key!r}")
+    for formula, weight in WEIGHT_CASES:
+        actual = molecular_weight(formula)
+        if actual is None or abs(actual - weight) > 0.01:
+            failures.append(f"molecular_weight({formula}) = {actual}, 期望 {weight}")
+    return failures
+
+
+def main():
+    """主函数"""
+    failures = run_checks()
+    total = len(PARSE_CASES) + len(KEY_CASES) + len(NAME_KEY_CASES) + len(WEIGHT_CASES)
+    for failure in failures:
+        print(f"  ✗ {failure}")
+    print(f"化学式解析检查: {total - len(failures)}/{total} 通过")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
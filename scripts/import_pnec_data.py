@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+导入PNEC参考数据
+将内置数据集和指定的CSV/SQLite文件批量导入持久化的SQLite数据库，供PNECTool离线查询。
+设置 PNEC_DB_PATH 指向输出文件后，PNECTool启动时直接使用该数据库。
+
+用法示例:
+    python scripts/import_pnec_data.py --output ~/.cache/ecomats/pnec.sqlite
+    python scripts/import_pnec_data.py extra_metals.csv echa_pnec.sqlite --output /tmp/pnec.sqlite
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# 添加项目根目录到Python路径
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+# 确保环境变量已加载
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.config.config import Config
+from src.tools.pnec_database import BUILTIN_PNEC_DATASET, PNECDatabase
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="导入PNEC参考数据")
+    parser.add_argument("files", nargs="*", help="要导入的CSV或SQLite文件（默认取 PNEC_DATASET_PATHS）")
+    parser.add_argument("--output", default=Config.PNEC_DB_PATH or os.path.expanduser(os.path.join("~", ".cache", "ecomats", "pnec.sqlite")),
+                        help="输出的SQLite数据库路径")
+    parser.add_argument("--no-builtin", action="store_true", help="不导入内置数据集")
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    output = os.path.expanduser(args.output)
+    if os.path.exists(output):
+        print(f"输出文件已存在，将被替换: {output}")
+        os.remove(output)
+
+    files = ([] if args.no_builtin else [BUILTIN_PNEC_DATASET]) + (args.files or Config.PNEC_DATASET_PATHS)
+    start_time = time.time()
+    database = PNECDatabase(output)
+    for path in files:
+        try:
+            print(f"{path}: {database.load(path)} 条记录")
+        except Exception as e:
+            print(f"无法导入 {path}: {e}")
+            return 1
+
+    stats = database.stats()
+    print(f"数据库已保存到 {output}")
+    print(f"记录数: {stats['records']}, 元素数: {stats['elements']}, 耗时: {time.time() - start_time:.2f} 秒")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
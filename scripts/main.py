@@ -10,7 +10,11 @@ import os
 project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
 sys.path.insert(0, os.path.abspath(project_root))
 
+import datetime
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # 确保环境变量已加载 / Ensure environment variables are loaded
 from dotenv import load_dotenv
@@ -19,6 +23,8 @@ load_dotenv()
 from crewai import Agent, Task, Crew, Process
 from langchain_openai import ChatOpenAI
 from src.config.config import Config
+from src.utils.material_context import ensure_material_context, material_context
+from src.utils.task_scheduler import TaskGraph, TaskNode, TaskScheduler
 import dashscope
 
 # 智能体导入 / Agent imports
@@ -115,14 +121,38 @@ def create_all_agents(llm):
         'operation_suggesting': operation_suggesting_agent
     }
 
+def parse_result_data(result):
+    """
+    将任务或Crew输出解析为JSON数据 / Parse a task or crew output into JSON data
+    
+    支持字符串、dict、带 json_dict/raw 属性的输出对象，以及包裹在```json代码块中的文本。
+    / Accepts strings, dicts, output objects with json_dict/raw attributes, and text wrapped in ```json fences.
+    
+    Args:
+        result: 任务输出 / Task output
+        
+    Returns:
+        解析后的数据；无法解析为JSON时返回原始输入 / Parsed data, or the input itself when it is not JSON
+    """
+    if isinstance(result, (dict, list)):
+        return result
+    json_dict = getattr(result, "json_dict", None)
+    if json_dict:
+        return json_dict
+    text = getattr(result, "raw", result)
+    if not isinstance(text, str):
+        return result
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return json.loads(text)
+
 def extract_feedback_from_result(result):
     """从结果中提取反馈信息 / Extract feedback information from results"""
     try:
         # 尝试解析JSON结果 / Try to parse JSON results
-        if isinstance(result, str):
-            result_data = json.loads(result)
-        else:
-            result_data = result
+        result_data = parse_result_data(result)
             
         # 查找反馈信息 / Find feedback information
         feedback = ""
@@ -150,10 +180,7 @@ def check_if_iteration_needed(result):
     """检查是否需要迭代设计 / Check if iterative design is needed"""
     try:
         # 尝试解析JSON结果 / Try to parse JSON results
-        if isinstance(result, str):
-            result_data = json.loads(result)
-        else:
-            result_data = result
+        result_data = parse_result_data(result)
             
         # 检查最终验证专家的结果 / Check results from final validation expert
         if isinstance(result_data, dict) and "results" in result_data:
@@ -180,37 +207,336 @@ def check_if_iteration_needed(result):
         print(f"检查迭代需求时出错: {e}")
         return False
 
-def run_design_iteration(user_requirement, llm, iteration_count=0):
-    """运行设计迭代 / Run design iteration"""
-    if iteration_count >= Config.MAX_DESIGN_ITERATIONS:
-        return "已达到最大迭代次数，停止迭代设计。"
-    
-    print(f"开始第 {iteration_count + 1} 轮设计迭代...")
-    
-    # 运行预设工作流 / Run preset workflow
-    result = run_preset_workflow(user_requirement, llm)
-    
-    # 检查是否需要迭代 / Check if iteration is needed
-    if check_if_iteration_needed(result):
-        print("当前设计方案未达到要求，需要进行迭代优化...")
-        # 提取反馈信息 / Extract feedback information
-        feedback = extract_feedback_from_result(result)
-        if feedback:
-            # 更新用户需求，加入反馈 / Update user requirements with feedback
-            updated_requirement = f"{user_requirement}\n\n基于上一轮评估的改进建议：{feedback}"
-            # 进行下一轮迭代 / Proceed to next iteration
-            return run_design_iteration(updated_requirement, llm, iteration_count + 1)
-        else:
-            return result
-    else:
+class DesignIterationEngine:
+    """设计迭代引擎类 / Design iteration engine class
+    
+    智能体（及其LLM客户端和工具实例）、材料上下文和流程结果文件每个会话只创建一次，各轮复用；每轮重新执行设计、评估和
+    最终验证，下游任务只在方案被接受或最后一轮时执行。
+    / Agents (with their LLM clients and tool instances), the material context and the workflow result file are
+    created once per session and reused by every round; each round re-runs design, evaluation and final validation,
+    and the downstream tasks run only once the design is accepted or in the last round.
+    """
+    
+    def __init__(self, llm, max_iterations=None):
+        """
+        初始化迭代引擎并创建所有智能体 / Initialize the iteration engine and create all agents
+        
+        Args:
+            llm: 语言模型实例 / Language model instance
+            max_iterations (int, optional): 最大迭代轮数，默认 MAX_DESIGN_ITERATIONS / Maximum rounds, defaults to MAX_DESIGN_ITERATIONS
+        """
+        import datetime
+        self.llm = llm
+        self.max_iterations = Config.MAX_DESIGN_ITERATIONS if max_iterations is None else max_iterations
+        # 所有轮次写入同一个流程结果文件 / Every round appends to the same workflow result file
+        self.workflow_timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.rounds = []
+        
+        start_time = time.perf_counter()
+        self.agents = create_all_agents(llm)
+        self.setup_seconds = round(time.perf_counter() - start_time, 2)
+    
+    def record_round(self, design_task, final_validation_task, timings):
+        """
+        记录一轮的设计和最终验证输出 / Record one round's design and final validation outputs
+        
+        Args:
+            design_task (Task): 设计任务 / Design task
+            final_validation_task (Task): 最终验证任务 / Final validation task
+            timings (list): 各阶段耗时 / Per-stage timings
+        """
+        self.rounds.append({
+            "design": design_task.output,
+            "final_validation": final_validation_task.output,
+            "timings": timings
+        })
+    
+    def run(self, user_requirement):
+        """
+        循环执行设计轮次，直到方案被接受或达到最大迭代次数 / Run design rounds until the design is accepted or the
+        maximum number of iterations is reached
+        
+        Args:
+            user_requirement (str): 用户需求 / User requirement
+            
+        Returns:
+            最后一轮的结果 / Result of the last round
+        """
+        if self.max_iterations <= 0:
+            return "已达到最大迭代次数，停止迭代设计。"
+        
+        result = None
+        # 材料上下文覆盖整个会话，每个材料只识别一次 / One material context for the whole session, each material is resolved once
+        with material_context():
+            for iteration in range(self.max_iterations):
+                print(f"开始第 {iteration + 1} 轮设计迭代...")
+                last_round = iteration + 1 >= self.max_iterations
+                result = run_preset_workflow(user_requirement, self.llm, gate_downstream=not last_round, session=self)
+                
+                # 检查是否需要迭代 / Check if iteration is needed
+                validation = self.rounds[-1]["final_validation"]
+                if not check_if_iteration_needed(validation):
+                    break
+                # 提取反馈信息 / Extract feedback information
+                feedback = extract_feedback_from_result(validation)
+                if not feedback:
+                    break
+                if last_round:
+                    print("已达到最大迭代次数，停止迭代设计。")
+                    break
+                print("当前设计方案未达到要求，需要进行迭代优化...")
+                # 更新用户需求，加入反馈 / Update user requirements with feedback
+                user_requirement = f"{user_requirement}\n\n基于上一轮评估的改进建议：{feedback}"
+        
+        self.print_summary()
         return result
+    
+    def print_summary(self):
+        """输出会话统计：轮数、一次性准备耗时和跳过的下游任务数 / Print session statistics: rounds, one-off setup time and skipped downstream tasks"""
+        skipped = sum(timing["tasks"] for round_info in self.rounds for timing in round_info["timings"] if timing.get("skipped"))
+        print(f"设计迭代: {len(self.rounds)} 轮, 智能体准备耗时 {self.setup_seconds:.2f} s（每个会话一次）, 跳过下游任务 {skipped} 个"
+              f" / Design iterations: {len(self.rounds)} rounds, agent setup {self.setup_seconds:.2f} s (once per session), "
+              f"{skipped} downstream tasks skipped")
+
+def run_design_iteration(user_requirement, llm):
+    """运行设计迭代（智能体在各轮之间复用） / Run design iteration (agents are reused across rounds)"""
+    return DesignIterationEngine(llm).run(user_requirement)
+
+# 并发任务共享同一个流程结果文件，整段写入需串行 / Concurrent tasks share one workflow result file, so each section is written under a lock
+_workflow_result_lock = threading.Lock()
+
+def append_workflow_result(workflow_timestamp, section):
+    """
+    将一整段内容追加到流程结果文件 / Append one whole section to the workflow result file
+    
+    Args:
+        workflow_timestamp (str): 流程结果文件的时间戳 / Timestamp of the workflow result file
+        section (str): 要追加的内容 / Section text to append
+    """
+    outputs_dir = os.path.join(project_root, "outputs")
+    os.makedirs(outputs_dir, exist_ok=True)
+    workflow_result_filepath = os.path.join(outputs_dir, f"workflow_result_{workflow_timestamp}.txt")
+    with _workflow_result_lock:
+        with open(workflow_result_filepath, 'a', encoding='utf-8') as f:
+            f.write(section)
+
+def make_task_callback(workflow_timestamp):
+    """
+    创建把任务输出追加到流程结果文件的回调，可被并发执行的任务同时调用
+    / Create the callback that appends task outputs to the workflow result file; safe to call from concurrent tasks
+    
+    Args:
+        workflow_timestamp (str): 流程结果文件的时间戳 / Timestamp of the workflow result file
+        
+    Returns:
+        callable: 任务回调 / Task callback
+    """
+    def task_callback(task_output):
+        # 获取任务名称
+        task_name = getattr(task_output, 'name', 'unknown_task')
+        if not task_name:
+            task_name = 'unknown_task'
+        
+        # 先组装整段内容，再一次性追加到流程结果文件
+        lines = [
+            f"\n\n{'='*60}\n",
+            f"任务名称: {task_name}\n",
+            f"执行时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            "=" * 60 + "\n",
+            f"任务描述: {getattr(task_output, 'description', 'N/A')}\n",
+            f"预期输出: {getattr(task_output, 'expected_output', 'N/A')}\n",
+            "=" * 60 + "\n",
+            f"实际输出:\n{str(task_output)}\n",
+        ]
+        
+        # 如果有JSON输出，也保存
+        if hasattr(task_output, 'json_dict') and task_output.json_dict:
+            lines.append("\n" + "=" * 60 + "\n")
+            lines.append("JSON输出:\n")
+            lines.append(json.dumps(task_output.json_dict, ensure_ascii=False, indent=2))
+        lines.append(f"\n{'='*60}\n")
+        append_workflow_result(workflow_timestamp, "".join(lines))
+    
+    return task_callback
+
+def run_single_task(task, task_callback=None):
+    """
+    以单任务Crew执行一个任务 / Run one task as a single-task crew
+    
+    Args:
+        task (Task): 任务 / Task
+        task_callback (callable, optional): 任务完成后的回调 / Callback invoked after the task
+        
+    Returns:
+        CrewOutput: 任务输出 / Task output
+    """
+    crew = Crew(
+        agents=[task.agent],
+        tasks=[task],
+        process=Process.sequential,
+        verbose=Config.VERBOSE,
+        task_callback=task_callback
+    )
+    return crew.kickoff()
+
+def build_autonomous_task_graph(llm, user_requirement):
+    """
+    构建自主调度模式的任务图：任务类型 → 工厂、依赖 / Build the task graph of the autonomous mode: task type → factory, dependencies
+    
+    新的任务类型只需在此注册一个节点（智能体由TaskAllocator的映射解析）。
+    / A new task type only needs a node here (agents are resolved through the TaskAllocator mapping).
+    
+    Args:
+        llm: 语言模型实例 / Language model instance
+        user_requirement (str): 用户需求 / User requirement
+        
+    Returns:
+        TaskGraph: 任务图 / Task graph
+    """
+    from crewai import Task
+    
+    def design_placeholder(agents, context):
+        # 需要评估但不需要设计时，用占位任务向评估任务传递用户提供的材料信息（不执行）
+        # When evaluation is needed without design, a placeholder passes the user's material information to the evaluations (never executed)
+        return [Task(
+            description=f"Existing material design information provided by user:\n{user_requirement}",
+            expected_output="Material information for evaluation",
+            agent=agents[0]
+        )]
+    
+    def downstream(task_class):
+        # 机理、合成和运行建议任务：有最终验证任务时以其为上下文，否则直接使用用户需求
+        # Mechanism, synthesis and operation tasks: use the final validation as context when present, else the user requirement
+        def factory(agents, context):
+            context_task = context["final_validation"][0] if "final_validation" in context else None
+            return [task_class(llm).create_task(agents[0], context_task, user_requirement=user_requirement)]
+        return factory
+    
+    graph = TaskGraph()
+    graph.add(TaskNode(
+        "material_design",
+        lambda agents, context: [DesignTask(llm).create_task(agents[0], user_requirement=user_requirement)],
+        placeholder=design_placeholder
+    ))
+    graph.add(TaskNode(
+        "evaluation",
+        lambda agents, context: [
+            EvaluationTask(llm).create_task(agent, context["material_design"][0], user_requirement)
+            for agent in agents
+        ],
+        depends_on=("material_design",),
+        implies=("final_validation",)
+    ))
+    graph.add(TaskNode(
+        "final_validation",
+        lambda agents, context: [FinalValidationTask(llm).create_task(
+            agents[0], context["material_design"] + context["evaluation"], user_requirement=user_requirement
+        )],
+        depends_on=("material_design", "evaluation")
+    ))
+    graph.add(TaskNode("mechanism_analysis", downstream(MechanismAnalysisTask), optional=("final_validation",)))
+    graph.add(TaskNode("synthesis_method", downstream(SynthesisMethodTask), optional=("final_validation",)))
+    graph.add(TaskNode("operation_suggestion", downstream(OperationSuggestingTask), optional=("final_validation",)))
+    return graph
+
+def iteration_gate(output):
+    """
+    最终验证后的迭代门控：在代码中评估迭代判据 / Iteration gate after the final validation: evaluates the iteration criterion in code
+    
+    Args:
+        output: 最终验证任务的输出 / Output of the final validation task
+        
+    Returns:
+        str: 需要下一轮设计时返回跳过原因，否则返回None / Skip reason when another design round is needed, else None
+    """
+    if check_if_iteration_needed(output) and extract_feedback_from_result(output):
+        return "最终验证要求迭代设计 / Final validation requires another design iteration"
+    return None
+
+def run_task_stages(stages, task_callback=None, gates=None):
+    """
+    按阶段执行任务：同一阶段内的任务互不依赖，各自以单任务Crew并发执行，阶段结束时汇合后再进入下一阶段
+    / Run tasks stage by stage: tasks within a stage are independent and run concurrently as single-task crews,
+    joined at the end of the stage before the next stage starts
+    
+    后续任务通过 task.context 读取前序任务对象上的输出，因此拆分为多个Crew不影响上下文传递。
+    / Later tasks read the outputs stored on earlier task objects through task.context, so splitting the run
+    into several crews does not change how context is passed.
+    
+    Args:
+        stages (list): [(阶段名称, [任务, ...]), ...] / [(stage name, [task, ...]), ...]
+        task_callback (callable, optional): 每个任务完成后的回调 / Callback invoked after each task
+        gates (dict, optional): {阶段名称: 门控函数}，门控函数接收该阶段最后一个输出，返回跳过原因时其后的阶段不再执行
+            / {stage name: gate}, a gate receives the stage's last output; when it returns a skip reason the
+            remaining stages are not run
+        
+    Returns:
+        tuple: (最后一个执行的任务的输出, 各阶段耗时列表，被跳过的阶段带有 skipped 和 reason)
+            / (output of the last executed task, list of per-stage timings; skipped stages carry skipped and reason)
+    """
+    gates = gates or {}
+    result = None
+    timings = []
+    for index, (stage_name, tasks) in enumerate(stages):
+        start_time = time.perf_counter()
+        if len(tasks) == 1:
+            outputs = [run_single_task(tasks[0], task_callback)]
+        else:
+            # 每个阶段使用独立的线程池，避免与工具执行器的共享线程池相互等待
+            # A dedicated pool per stage, so crews never wait on the tool executor's shared pool
+            with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix=f"preset-{stage_name}") as pool:
+                outputs = list(pool.map(lambda task: run_single_task(task, task_callback), tasks))
+        timings.append({
+            "stage": stage_name,
+            "tasks": len(tasks),
+            "seconds": round(time.perf_counter() - start_time, 2)
+        })
+        result = outputs[-1]
+        
+        reason = gates[stage_name](result) if stage_name in gates else None
+        if reason:
+            for skipped_name, skipped_tasks in stages[index + 1:]:
+                timings.append({
+                    "stage": skipped_name,
+                    "tasks": len(skipped_tasks),
+                    "seconds": 0.0,
+                    "skipped": True,
+                    "reason": reason
+                })
+            break
+    return result, timings
+
+def print_stage_timings(timings, wall_seconds=None):
+    """输出各阶段耗时；并发执行时另给出实际总耗时 / Print per-stage timings, plus the wall time for concurrent runs"""
+    total = sum(timing["seconds"] for timing in timings)
+    print("各阶段耗时 / Stage timings:")
+    for timing in timings:
+        if timing.get("skipped"):
+            print(f"  - {timing['stage']}: 已跳过 / skipped ({timing['tasks']} 个任务 / tasks) - {timing['reason']}")
+            continue
+        print(f"  - {timing['stage']}: {timing['seconds']:.2f} s ({timing['tasks']} 个任务 / tasks)")
+    print(f"  总计 / Total: {total:.2f} s")
+    if wall_seconds is not None:
+        print(f"  实际耗时 / Wall time: {wall_seconds:.2f} s")
 
-def run_preset_workflow(user_requirement, llm):
-    """运行预设工作流模式 / Run preset workflow mode"""
+def run_preset_workflow(user_requirement, llm, gate_downstream=False, session=None):
+    """
+    运行预设工作流模式 / Run preset workflow mode
+    
+    Args:
+        user_requirement (str): 用户需求 / User requirement
+        llm: 语言模型实例 / Language model instance
+        gate_downstream (bool): 最终验证要求迭代时跳过合成、机理和运行建议任务，并返回最终验证的输出
+            / Skip the synthesis, mechanism and operation tasks when the final validation demands another
+            iteration, returning the final validation output
+        session (DesignIterationEngine, optional): 迭代会话，提供复用的智能体和流程结果文件，并记录本轮的设计和最终验证输出
+            / Iteration session providing the reused agents and workflow result file, and recording this round's
+            design and final validation outputs
+    """
     print("启动预设工作流模式...")
     
-    # 创建所有智能体 / Create all agents
-    agents = create_all_agents(llm)
+    # 创建所有智能体（迭代会话中复用会话的智能体） / Create all agents (an iteration session reuses its agents)
+    agents = session.agents if session is not None else create_all_agents(llm)
     
     # 创建任务，将用户需求传递给任务 / Create tasks and pass user requirements to tasks
     # 1. 首先创建材料设计任务 / First create material design task
@@ -238,74 +564,106 @@ def run_preset_workflow(user_requirement, llm):
     # 定义任务回调函数，用于保存整体流程结果
     # 生成全局时间戳，确保所有任务使用相同的流程结果文件
     import datetime
-    global_workflow_timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    def task_callback(task_output):
-        import json
-        import os
-        
-        # 确保outputs目录存在
-        outputs_dir = os.path.join(project_root, "outputs")
-        os.makedirs(outputs_dir, exist_ok=True)
-        
-        # 生成流程结果文件名
-        workflow_result_filename = f"workflow_result_{global_workflow_timestamp}.txt"
-        workflow_result_filepath = os.path.join(outputs_dir, workflow_result_filename)
-        
-        # 获取任务名称
-        task_name = getattr(task_output, 'name', 'unknown_task')
-        if not task_name:
-            task_name = 'unknown_task'
-        
-        # 将任务输出追加到流程结果文件
-        with open(workflow_result_filepath, 'a', encoding='utf-8') as f:
-            f.write(f"\n\n{'='*60}\n")
-            f.write(f"任务名称: {task_name}\n")
-            f.write(f"执行时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 60 + "\n")
-            f.write(f"任务描述: {getattr(task_output, 'description', 'N/A')}\n")
-            f.write(f"预期输出: {getattr(task_output, 'expected_output', 'N/A')}\n")
-            f.write("=" * 60 + "\n")
-            f.write(f"实际输出:\n{str(task_output)}\n")
-            
-            # 如果有JSON输出，也保存
-            if hasattr(task_output, 'json_dict') and task_output.json_dict:
-                f.write("\n" + "=" * 60 + "\n")
-                f.write("JSON输出:\n")
-                json.dump(task_output.json_dict, f, ensure_ascii=False, indent=2)
-            f.write(f"\n{'='*60}\n")
+    if session is not None:
+        global_workflow_timestamp = session.workflow_timestamp
+    else:
+        global_workflow_timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    task_callback = make_task_callback(global_workflow_timestamp)
+    
+    def record_skipped_stages(timings):
+        # 将门控跳过的任务记录到流程结果文件 / Record the tasks skipped by the gate in the workflow result file
+        skipped = [timing for timing in timings if timing.get("skipped")]
+        if not skipped:
+            return
+        roles = [getattr(task.agent, 'role', 'unknown_agent') for task in downstream_tasks]
+        lines = [
+            f"\n\n{'='*60}\n",
+            "已跳过的任务 / Skipped tasks\n",
+            f"记录时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            "=" * 60 + "\n",
+        ]
+        for timing in skipped:
+            lines.append(f"阶段: {timing['stage']} ({timing['tasks']} 个任务 / tasks)\n")
+            lines.append(f"原因: {timing['reason']}\n")
+        lines.append(f"未执行的智能体: {', '.join(roles)}\n")
+        lines.append(f"{'='*60}\n")
+        append_workflow_result(global_workflow_timestamp, "".join(lines))
+    
+    downstream_tasks = [synthesis_method_task, mechanism_analysis_task, operation_suggesting_task]
+    gates = {"final_validation": iteration_gate} if gate_downstream else None
+    
+    if Config.PRESET_PARALLEL_EXECUTION:
+        # 并行模式：三个评估任务只依赖设计任务，三个下游任务只依赖最终验证任务，各自并发执行
+        # Parallel mode: the three evaluations depend only on the design and the three downstream tasks only on
+        # the final validation, so each group runs concurrently
+        stages = [
+            ("design", [design_task]),
+            ("evaluation", [evaluation_task_a, evaluation_task_b, evaluation_task_c]),
+            ("final_validation", [final_validation_task]),
+            ("downstream", downstream_tasks)
+        ]
+        with ensure_material_context():
+            result, timings = run_task_stages(stages, task_callback, gates)
+        print_stage_timings(timings)
+        record_skipped_stages(timings)
+        if session is not None:
+            session.record_round(design_task, final_validation_task, timings)
+        return result
     
     # 创建Crew / Create Crew
-    ecomats_crew = Crew(
-        agents=[
-            agents['coordinator'], 
-            agents['material_designer'],
-            agents['expert_a'], 
-            agents['expert_b'], 
-            agents['expert_c'],
-            agents['final_validator'],
-            agents['literature_processor'],
-            agents['mechanism_expert'],
-            agents['synthesis_expert'],
-            agents['operation_suggesting']
-        ],
-        tasks=[
-            design_task, 
-            evaluation_task_a, 
-            evaluation_task_b, 
-            evaluation_task_c, 
-            final_validation_task,
-            synthesis_method_task,
-            mechanism_analysis_task,
-            operation_suggesting_task
-        ],  # 任务按顺序执行 / Tasks executed in order
-        process=Process.sequential,  # 使用顺序流程执行任务 / Use sequential process to execute tasks
-        verbose=Config.VERBOSE,
-        task_callback=task_callback  # 添加任务回调函数
-    )
-    
-    # 执行 / Execute
-    result = ecomats_crew.kickoff()
+    all_agents = [
+        agents['coordinator'], 
+        agents['material_designer'],
+        agents['expert_a'], 
+        agents['expert_b'], 
+        agents['expert_c'],
+        agents['final_validator'],
+        agents['literature_processor'],
+        agents['mechanism_expert'],
+        agents['synthesis_expert'],
+        agents['operation_suggesting']
+    ]
+    validation_tasks = [
+        design_task, 
+        evaluation_task_a, 
+        evaluation_task_b, 
+        evaluation_task_c, 
+        final_validation_task
+    ]
+    
+    def create_crew(tasks):
+        return Crew(
+            agents=all_agents,
+            tasks=tasks,  # 任务按顺序执行 / Tasks executed in order
+            process=Process.sequential,  # 使用顺序流程执行任务 / Use sequential process to execute tasks
+            verbose=Config.VERBOSE,
+            task_callback=task_callback  # 添加任务回调函数
+        )
+    
+    # 执行（整个运行共享一个材料上下文，每个材料只识别一次） / Execute (one material context per run, each material is resolved once)
+    start_time = time.perf_counter()
+    with ensure_material_context():
+        if not gate_downstream:
+            ecomats_crew = create_crew(validation_tasks + downstream_tasks)
+            result = ecomats_crew.kickoff()
+            timings = [{"stage": "sequential", "tasks": len(ecomats_crew.tasks), "seconds": round(time.perf_counter() - start_time, 2)}]
+        else:
+            # 门控：先执行到最终验证，需要迭代时不再执行下游任务
+            # Gate: run up to the final validation, and skip the downstream tasks when iteration is needed
+            result = create_crew(validation_tasks).kickoff()
+            timings = [{"stage": "sequential", "tasks": len(validation_tasks), "seconds": round(time.perf_counter() - start_time, 2)}]
+            reason = iteration_gate(result)
+            if reason:
+                timings.append({"stage": "downstream", "tasks": len(downstream_tasks), "seconds": 0.0, "skipped": True, "reason": reason})
+            else:
+                downstream_start = time.perf_counter()
+                result = create_crew(downstream_tasks).kickoff()
+                timings.append({"stage": "downstream", "tasks": len(downstream_tasks), "seconds": round(time.perf_counter() - downstream_start, 2)})
+    print_stage_timings(timings)
+    record_skipped_stages(timings)
+    if session is not None:
+        session.record_round(design_task, final_validation_task, timings)
     return result
 
 def run_autonomous_workflow(user_requirement, llm):
@@ -334,192 +692,35 @@ def run_autonomous_workflow(user_requirement, llm):
     # 根据用户需求动态决定需要哪些任务 / Dynamically decide which tasks are needed based on user requirements
     required_task_types = task_allocator.determine_required_task_types(user_requirement)
     
-    # 初始化任务和智能体列表
-    required_tasks = []
-    required_agents = [coordinator_agent]
-    seen_roles = {coordinator_agent.role}
-    task_mapping = {}
-    design_task = None  # 初始化design_task变量
-    
-    # 特殊处理：如果只运行独立任务
-    independent_tasks = ["mechanism_analysis", "synthesis_method", "operation_suggestion"]
-    if len(required_task_types) == 1 and required_task_types[0] in independent_tasks:
-        # 只运行独立任务
-        task_type = required_task_types[0]
-        agent = task_allocator.get_agent_for_task(task_type)
-        if agent and agent.role not in seen_roles:
-            required_agents.append(agent)
-            seen_roles.add(agent.role)
-        
-        # 创建相应的任务，使用用户需求作为输入
-        if task_type == "mechanism_analysis":
-            mechanism_analysis_task = MechanismAnalysisTask(llm).create_task(agent, user_requirement=user_requirement)
-            task_mapping["mechanism_analysis"] = mechanism_analysis_task
-            required_tasks.append(mechanism_analysis_task)
-        elif task_type == "synthesis_method":
-            synthesis_method_task = SynthesisMethodTask(llm).create_task(agent, user_requirement=user_requirement)
-            task_mapping["synthesis_method"] = synthesis_method_task
-            required_tasks.append(synthesis_method_task)
-        elif task_type == "operation_suggestion":
-            operation_suggesting_task = OperationSuggestingTask(llm).create_task(agent, user_requirement=user_requirement)
-            task_mapping["operation_suggestion"] = operation_suggesting_task
-            required_tasks.append(operation_suggesting_task)
-    else:
-        # 检查是否需要材料设计任务
-        if "material_design" in required_task_types:
-            # 正常处理流程，需要材料设计任务
-            # 任务组织代理根据任务需求自主委派任务 / Task organizing agent autonomously delegates tasks based on task requirements
-            # 1. 委派材料设计任务 / Delegate material design task
-            design_agent = coordinator.delegate_task("material_design", task_allocator, user_requirement)
-            
-            # 2. 创建材料设计任务 / Create material design task
-            design_task = DesignTask(llm).create_task(design_agent, user_requirement=user_requirement)
-            
-            # 3. 添加材料设计智能体到所需智能体列表
-            if design_agent and design_agent.role not in seen_roles:
-                required_agents.append(design_agent)
-                seen_roles.add(design_agent.role)
-            
-            # 根据任务类型创建相应的任务 / Create tasks based on task types
-            # 首先处理材料设计任务 / First handle material design task
-            task_mapping["material_design"] = design_task
-        elif "evaluation" in required_task_types or "final_validation" in required_task_types:
-            # 如果需要评估但不需要设计，则创建一个虚拟的设计任务来传递材料信息
-            # 这样评估任务可以依赖于这个虚拟任务获取材料信息
-            from crewai import Task
-            design_task = Task(
-                description=f"Existing material design information provided by user:\n{user_requirement}",
-                expected_output="Material information for evaluation",
-                agent=agents['material_designer']  # 使用材料设计智能体作为占位符
-            )
-            task_mapping["material_design"] = design_task
-        
-        # 然后处理其他任务 / Then handle other tasks
-        # 处理评估任务链 / Handle evaluation task chain
-        evaluation_tasks = []
-        final_validation_task = None
-        
-        if "evaluation" in required_task_types:
-            # 委派评估任务给所有评估专家 / Delegate evaluation tasks to all evaluation experts
-            evaluation_agents = task_allocator.get_all_agents_for_task("evaluation")
-            for agent in evaluation_agents:
-                if agent.role not in seen_roles:
-                    required_agents.append(agent)
-                    seen_roles.add(agent.role)
-                task = EvaluationTask(llm).create_task(agent, design_task, user_requirement)
-                evaluation_tasks.append(task)
-            
-            # 委派最终验证任务 / Delegate final validation task
-            final_validation_agent = task_allocator.get_agent_for_task("final_validation")
-            if final_validation_agent and final_validation_agent.role not in seen_roles:
-                required_agents.append(final_validation_agent)
-                seen_roles.add(final_validation_agent.role)
-            final_validation_task = FinalValidationTask(llm).create_task(final_validation_agent, 
-                                                                   [design_task] + evaluation_tasks, user_requirement=user_requirement)
-            
-            task_mapping["evaluation"] = evaluation_tasks
-            task_mapping["final_validation"] = final_validation_task
-            required_tasks.extend(evaluation_tasks)
-            required_tasks.append(final_validation_task)
-        
-        # 处理独立任务（不依赖于评估任务） / Handle independent tasks (not dependent on evaluation tasks)
-        # 机理分析任务 / Mechanism analysis task
-        if "mechanism_analysis" in required_task_types:
-            mechanism_agent = task_allocator.get_agent_for_task("mechanism_analysis")
-            if mechanism_agent and mechanism_agent.role not in seen_roles:
-                required_agents.append(mechanism_agent)
-                seen_roles.add(mechanism_agent.role)
-            # 对于独立任务，可以使用用户需求作为输入，或者如果已有最终验证任务则依赖于它
-            context_task = final_validation_task if final_validation_task else None
-            mechanism_analysis_task = MechanismAnalysisTask(llm).create_task(mechanism_agent, context_task, user_requirement=user_requirement)
-            task_mapping["mechanism_analysis"] = mechanism_analysis_task
-            required_tasks.append(mechanism_analysis_task)
-        
-        # 合成方法任务 / Synthesis method task
-        if "synthesis_method" in required_task_types:
-            synthesis_agent = task_allocator.get_agent_for_task("synthesis_method")
-            if synthesis_agent and synthesis_agent.role not in seen_roles:
-                required_agents.append(synthesis_agent)
-                seen_roles.add(synthesis_agent.role)
-            # 对于独立任务，可以使用用户需求作为输入，或者如果已有最终验证任务则依赖于它
-            context_task = final_validation_task if final_validation_task else None
-            synthesis_method_task = SynthesisMethodTask(llm).create_task(synthesis_agent, context_task, user_requirement=user_requirement)
-            task_mapping["synthesis_method"] = synthesis_method_task
-            required_tasks.append(synthesis_method_task)
-            
-        # 操作建议任务 / Operation suggestion task
-        if "operation_suggestion" in required_task_types:
-            operation_suggesting_agent = task_allocator.get_agent_for_task("operation_suggestion")
-            if operation_suggesting_agent and operation_suggesting_agent.role not in seen_roles:
-                required_agents.append(operation_suggesting_agent)
-                seen_roles.add(operation_suggesting_agent.role)
-            # 对于独立任务，可以使用用户需求作为输入，或者如果已有最终验证任务则依赖于它
-            context_task = final_validation_task if final_validation_task else None
-            operation_suggesting_task = OperationSuggestingTask(llm).create_task(operation_suggesting_agent, context_task, user_requirement=user_requirement)
-            task_mapping["operation_suggestion"] = operation_suggesting_task
-            required_tasks.append(operation_suggesting_task)
+    # 由任务图构建执行计划：补全依赖、裁剪不需要的节点 / Build the plan from the task graph: complete dependencies, prune unneeded nodes
+    task_graph = build_autonomous_task_graph(llm, user_requirement)
+    plan = task_graph.build(required_task_types, task_allocator.get_all_agents_for_task)
+    print(f"任务计划 / Task plan: {plan.order}" + (f"（占位上下文 / placeholders: {list(plan.placeholders)}）" if plan.placeholders else ""))
     
     # 定义任务回调函数，用于保存整体流程结果
     # 生成全局时间戳，确保所有任务使用相同的流程结果文件
     import datetime
     global_workflow_timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    def task_callback(task_output):
-        import json
-        import os
-        
-        # 确保outputs目录存在
-        outputs_dir = os.path.join(project_root, "outputs")
-        os.makedirs(outputs_dir, exist_ok=True)
-        
-        # 生成流程结果文件名
-        workflow_result_filename = f"workflow_result_{global_workflow_timestamp}.txt"
-        workflow_result_filepath = os.path.join(outputs_dir, workflow_result_filename)
-        
-        # 获取任务名称
-        task_name = getattr(task_output, 'name', 'unknown_task')
-        if not task_name:
-            task_name = 'unknown_task'
-        
-        # 将任务输出追加到流程结果文件
-        with open(workflow_result_filepath, 'a', encoding='utf-8') as f:
-            f.write(f"\n\n{'='*60}\n")
-            f.write(f"任务名称: {task_name}\n")
-            f.write(f"执行时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 60 + "\n")
-            f.write(f"任务描述: {getattr(task_output, 'description', 'N/A')}\n")
-            f.write(f"预期输出: {getattr(task_output, 'expected_output', 'N/A')}\n")
-            f.write("=" * 60 + "\n")
-            f.write(f"实际输出:\n{str(task_output)}\n")
-            
-            # 如果有JSON输出，也保存
-            if hasattr(task_output, 'json_dict') and task_output.json_dict:
-                f.write("\n" + "=" * 60 + "\n")
-                f.write("JSON输出:\n")
-                json.dump(task_output.json_dict, f, ensure_ascii=False, indent=2)
-            f.write(f"\n{'='*60}\n")
-    
-    # 创建Crew / Create Crew
-    # 只有在真正需要设计任务时才将其添加到任务列表中
-    all_tasks = required_tasks
-    if design_task and "material_design" in required_task_types:
-        all_tasks = [design_task] + required_tasks
-    elif design_task:
-        # 如果是虚拟设计任务，不将其添加到任务列表中，但确保评估任务可以获取材料信息
-        # 评估任务已经依赖于design_task，所以不需要将其添加到任务列表中
-        all_tasks = required_tasks
-    
-    ecomats_crew = Crew(
-        agents=required_agents,
-        tasks=all_tasks,
-        process=Process.sequential,
-        verbose=Config.VERBOSE,
-        task_callback=task_callback  # 添加任务回调函数
+    task_callback = make_task_callback(global_workflow_timestamp)
+    
+    # 依赖已满足的任务并发执行（整个运行共享一个材料上下文，每个材料只识别一次）
+    # Tasks whose dependencies are met run concurrently (one material context per run, each material is resolved once)
+    scheduler = TaskScheduler(max_workers=Config.AUTONOMOUS_MAX_WORKERS)
+    start_time = time.perf_counter()
+    with material_context():
+        outputs, errors, timings = scheduler.run(plan, lambda task: run_single_task(task, task_callback))
+    print_stage_timings(
+        [{"stage": name, "tasks": 1, "seconds": seconds} for name, seconds in timings.items()],
+        wall_seconds=time.perf_counter() - start_time
     )
+    for name, error in errors.items():
+        print(f"任务 {name} 未完成: {error}")
+    if not outputs:
+        raise RuntimeError(f"自主调度模式没有任务成功完成: {errors}")
     
-    # 执行 / Execute
-    result = ecomats_crew.kickoff()
-    return result
+    # 返回拓扑顺序中最后一个完成的任务输出 / Return the output of the last completed task in topological order
+    return list(outputs.values())[-1]
 
 def main():
     print("基于CrewAI的ecomats多智能体系统 / ECOMATS Multi-Agent System Based on CrewAI")
@@ -562,6 +763,13 @@ def main():
     # 工作流结果已经通过task_callback保存到workflow_result文件中
     # 不再生成单独的result文件
     print("工作流执行完成，结果已保存到workflow_result文件中")
+    
+    # 输出LLM响应缓存命中统计（启用时） / Report LLM response cache hit statistics (when enabled)
+    from src.utils.llm_cache import get_llm_cache
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        stats = llm_cache.stats()
+        print(f"LLM缓存: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, 命中率 {stats['hit_rate']:.1%}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
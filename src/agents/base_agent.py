@@ -3,6 +3,7 @@ import os
 from crewai import Agent
 from src.utils.prompt_loader import load_prompt
 from src.config.config import Config
+from src.utils.llm_registry import get_llm_registry
 
 # 配置日志 / Configure logging
 logging.basicConfig(level=logging.WARNING)
@@ -19,35 +20,39 @@ class BaseAgent:
         self.prompt_file = prompt_file
         self.temperature = temperature
     
+    def _llm_settings(self):
+        """获取创建智能体LLM所需的参数 / Get the settings used to build the agent LLM"""
+        base_url = getattr(self.llm, 'base_url', None) or getattr(self.llm, 'openai_api_base', None)
+        api_key = getattr(self.llm, 'api_key', None) or getattr(self.llm, 'openai_api_key', None)
+        if hasattr(api_key, 'get_secret_value'):
+            api_key = api_key.get_secret_value()
+        model = getattr(self.llm, 'model', None) or getattr(self.llm, 'model_name', None)
+        
+        # 根据API基础URL判断使用哪种前缀
+        if model and not model.startswith(('openai/', 'qwen/')):
+            if base_url and 'dashscope' in base_url:
+                model = 'qwen/' + model
+            else:
+                model = 'openai/' + model
+        
+        return {
+            'base_url': base_url,
+            'api_key': api_key,
+            'model': model,
+            'temperature': self.temperature if self.temperature is not None else getattr(self.llm, 'temperature', None),
+            'max_tokens': getattr(self.llm, 'max_tokens', None)
+        }
+    
     def create_agent(self):
         # 如果提供了特定温度，则使用该温度，否则使用LLM的默认温度
         # If a specific temperature is provided, use that temperature, otherwise use the LLM's default temperature
-        agent_llm = self.llm
-        if self.temperature is not None:
-            # 创建一个新的LLM实例，使用指定的温度
-            # Create a new LLM instance with the specified temperature
-            # 获取原始LLM的属性
-            base_url = getattr(self.llm, 'base_url', None) or getattr(self.llm, 'openai_api_base', None)
-            api_key = getattr(self.llm, 'api_key', None) or getattr(self.llm, 'openai_api_key', None)
-            model = getattr(self.llm, 'model', None) or getattr(self.llm, 'model_name', None)
-            streaming = getattr(self.llm, 'streaming', False)
-            max_tokens = getattr(self.llm, 'max_tokens', None)
-            
-            # 根据API基础URL判断使用哪种前缀
-            if model and not model.startswith(('openai/', 'qwen/')):
-                if base_url and 'dashscope' in base_url:
-                    model = 'qwen/' + model
-                else:
-                    model = 'openai/' + model
-            
-            agent_llm = type(self.llm)(
-                base_url=base_url,
-                api_key=api_key,
-                model=model,
-                temperature=self.temperature,
-                streaming=streaming,
-                max_tokens=max_tokens
-            )
+        # 从注册表获取CrewAI LLM视图：共享端点的连接池，同一配置只创建一次，启用LLM缓存时带缓存
+        # Get a CrewAI LLM view from the registry: shares the endpoint's connection pool, created once per
+        # configuration, with caching when the LLM cache is enabled
+        agent_llm = get_llm_registry().agent_llm(
+            streaming=getattr(self.llm, 'streaming', False),
+            **self._llm_settings()
+        )
         
         return Agent(
             role=self.role,
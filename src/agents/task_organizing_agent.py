@@ -2,6 +2,7 @@ import logging
 from crewai import Agent
 from src.utils.prompt_loader import load_prompt
 from src.agents.base_agent import BaseAgent
+from src.utils.llm_registry import get_llm_registry
 
 # 配置日志 / Configure logging
 logging.basicConfig(level=logging.WARNING)
@@ -26,7 +27,7 @@ class TaskOrganizingAgent(BaseAgent):
             backstory=load_prompt("coordinator_prompt.md"),
             verbose=False,
             allow_delegation=True,
-            llm=self.llm
+            llm=get_llm_registry().agent_llm(**self._llm_settings())  # 共享连接池的CrewAI LLM / CrewAI LLM on the shared pool
         )
     
     def delegate_task(self, task_type, task_allocator, task_description):
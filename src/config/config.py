@@ -17,9 +17,70 @@ class Config:
     # Materials Project API配置 / Materials Project API configuration
     MATERIALS_PROJECT_API_KEY = os.getenv("MATERIALS_PROJECT_API_KEY")
     
+    # Materials Project请求控制：速率上限、自适应并发上限与重试次数 / Materials Project request control: rate cap, adaptive concurrency ceiling and retries
+    MP_RATE_LIMIT = float(os.getenv("MP_RATE_LIMIT", "10"))
+    MP_RATE_BURST = float(os.getenv("MP_RATE_BURST", "5"))
+    MP_MAX_CONCURRENCY = int(os.getenv("MP_MAX_CONCURRENCY", "4"))
+    MP_INITIAL_CONCURRENCY = int(os.getenv("MP_INITIAL_CONCURRENCY", "2"))
+    MP_MAX_RETRIES = int(os.getenv("MP_MAX_RETRIES", "3"))
+    
+    # Materials Project本地快照配置 / Materials Project local snapshot configuration
+    MP_SNAPSHOT_ENABLED = os.getenv("MP_SNAPSHOT_ENABLED", "True").lower() == "true"
+    MP_SNAPSHOT_PATH = os.path.expanduser(os.getenv("MP_SNAPSHOT_PATH", os.path.join("~", ".cache", "ecomats", "mp_snapshot.json.gz")))
+    # 离线模式：不连接MP API，仅使用快照回答查询 / Offline mode: never contact the MP API, answer only from the snapshot
+    MP_OFFLINE = os.getenv("MP_OFFLINE", "False").lower() == "true"
+    # 快照超过该天数时发出警告 / Warn when the snapshot is older than this many days
+    MP_SNAPSHOT_MAX_AGE_DAYS = float(os.getenv("MP_SNAPSHOT_MAX_AGE_DAYS", "30"))
+    MP_SNAPSHOT_METALS = [e.strip() for e in os.getenv("MP_SNAPSHOT_METALS", "Fe,Co,Mn,Ni,Cu,Mo,W").split(",") if e.strip()]
+    MP_SNAPSHOT_ANIONS = [e.strip() for e in os.getenv("MP_SNAPSHOT_ANIONS", "O,S,N").split(",") if e.strip()]
+    
     # PubChem API配置 / PubChem API configuration
     PUBCHEM_API_KEY = os.getenv("PUBCHEM_API_KEY")
     
+    # PubChem响应缓存配置 / PubChem response cache configuration
+    PUBCHEM_CACHE_ENABLED = os.getenv("PUBCHEM_CACHE_ENABLED", "True").lower() == "true"
+    PUBCHEM_CACHE_PATH = os.getenv("PUBCHEM_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "ecomats", "pubchem_cache.sqlite"))
+    PUBCHEM_CACHE_MAX_MB = float(os.getenv("PUBCHEM_CACHE_MAX_MB", "64"))
+    PUBCHEM_CACHE_DEFAULT_TTL = float(os.getenv("PUBCHEM_CACHE_DEFAULT_TTL", str(7 * 24 * 3600)))
+    
+    # "未找到"结果的负缓存：TTL短于正常结果，避免假想材料每次都走最慢的查询路径
+    # Negative cache for "not found" outcomes: shorter TTL than hits, so hypothetical materials skip the slowest lookup path
+    NEGATIVE_CACHE_ENABLED = os.getenv("NEGATIVE_CACHE_ENABLED", "True").lower() == "true"
+    NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", str(24 * 3600)))
+    NEGATIVE_CACHE_PATH = os.path.expanduser(os.getenv("NEGATIVE_CACHE_PATH", os.path.join("~", ".cache", "ecomats", "negative_cache.sqlite")))
+    
+    # PubChem共享速率限制（官方上限为5次/秒） / Shared PubChem rate limit (official limit is 5 requests/second)
+    PUBCHEM_RATE_LIMIT = float(os.getenv("PUBCHEM_RATE_LIMIT", "4"))
+    PUBCHEM_RATE_BURST = float(os.getenv("PUBCHEM_RATE_BURST", "3"))
+    # 异步PubChem客户端的最大并发请求数 / Maximum in-flight requests of the async PubChem client
+    PUBCHEM_MAX_CONCURRENCY = int(os.getenv("PUBCHEM_MAX_CONCURRENCY", "4"))
+    
+    # 本地PNEC参考数据库：额外导入的CSV/SQLite文件（逗号分隔），以及可选的持久化SQLite路径（为空时在内存中构建）
+    # Local PNEC reference database: extra CSV/SQLite files to import (comma separated) and an optional persistent SQLite path (built in memory when empty)
+    PNEC_DATASET_PATHS = [os.path.expanduser(p.strip()) for p in os.getenv("PNEC_DATASET_PATHS", "").split(",") if p.strip()]
+    PNEC_DB_PATH = os.path.expanduser(os.getenv("PNEC_DB_PATH", ""))
+    
+    # 评估工具执行器：并行执行工具调用的线程数与单个工具的超时时间（秒）
+    # Assessment tool executor: threads for parallel tool calls and per-tool timeout (seconds)
+    ASSESSMENT_TOOL_WORKERS = int(os.getenv("ASSESSMENT_TOOL_WORKERS", "6"))
+    ASSESSMENT_TOOL_TIMEOUT = float(os.getenv("ASSESSMENT_TOOL_TIMEOUT", "60"))
+    
+    # LLM响应缓存（可选，默认关闭）：同一需求重复运行时复用模型输出；BYPASS为True时只写不读，用于刷新缓存
+    # LLM response cache (opt-in): reuse model outputs when re-running the same requirement; BYPASS=True writes without reading, refreshing the cache
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "False").lower() == "true"
+    LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "False").lower() == "true"
+    LLM_CACHE_PATH = os.path.expanduser(os.getenv("LLM_CACHE_PATH", os.path.join("~", ".cache", "ecomats", "llm_cache.sqlite")))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "128"))
+    
+    # LLM客户端连接池：每个端点共享一个HTTP传输；PREWARM为True时首次使用端点即在后台预建连接
+    # LLM client pool: one shared HTTP transport per endpoint; with PREWARM=True connections are opened in the background on first use
+    LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+    LLM_POOL_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_POOL_KEEPALIVE_CONNECTIONS", "10"))
+    LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "120"))
+    LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "120"))
+    LLM_PREWARM = os.getenv("LLM_PREWARM", "True").lower() == "true"
+    
     # 模型参数配置 / Model parameter configuration
     MODEL_TEMPERATURE = float(os.getenv("MODEL_TEMPERATURE", "0.7"))
     MODEL_MAX_TOKENS = int(os.getenv("MODEL_MAX_TOKENS", "2048"))
@@ -45,6 +106,13 @@ class Config:
     # 统一的评估专家温度配置（向后兼容） / Unified evaluation expert temperature configuration (backward compatible)
     EXPERT_EVALUATION_TEMPERATURE = float(os.getenv("EXPERT_EVALUATION_TEMPERATURE", "0.3"))
     
+    # 预设工作流并行执行：互不依赖的任务（三个评估、三个下游任务）并发执行；False时使用顺序流程
+    # Preset workflow parallel execution: independent tasks (the three evaluations, the three downstream tasks) run concurrently; False uses the sequential process
+    PRESET_PARALLEL_EXECUTION = os.getenv("PRESET_PARALLEL_EXECUTION", "True").lower() == "true"
+    
+    # 自主调度模式：任务图中同时执行的最大任务数 / Autonomous mode: maximum tasks of the task graph running at once
+    AUTONOMOUS_MAX_WORKERS = int(os.getenv("AUTONOMOUS_MAX_WORKERS", "4"))
+    
     # 迭代设计配置 / Iterative design configuration
     MAX_DESIGN_ITERATIONS = int(os.getenv("MAX_DESIGN_ITERATIONS", "3"))
     MIN_ACCEPTABLE_SCORE = float(os.getenv("MIN_ACCEPTABLE_SCORE", "7.0"))
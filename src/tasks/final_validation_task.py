@@ -48,9 +48,9 @@ class FinalValidationTask(BaseTask):
            - 标记任何无法验证或明显错误的数据
         
         2. **材料结构验证阶段**：
-           - 对排名前5的材料，逐一调用Structure Validator Tool验证结构真实性
-           - 对于金属材料，同时调用Materials Project工具进行交叉验证
-           - 对于有机材料，同时调用PubChem工具进行交叉验证
+           - 对排名前5的材料，使用Batch Material Assessment工具一次性完成结构验证和交叉验证（传入全部5个化学式）
+           - 金属材料在该工具中通过Materials Project批量交叉验证，有机材料通过PubChem批量交叉验证
+           - 仅当批量结果中某个材料缺失或出错时，再单独调用Structure Validator、Materials Project或PubChem工具补查
            - 记录所有验证工具的查询参数和返回结果
            - 对无法验证的材料进行特别标注并影响最终排名
         
@@ -12,6 +12,7 @@ from .cid2properties_tool import get_cid2properties_tool
 from .formula2properties_tool import get_formula2properties_tool
 from .material_search_tool import get_material_search_tool
 from .pnec_tool import get_pnec_tool
+from .risk_quotient_engine import get_risk_quotient_engine
 from .material_identifier_tool import get_material_identifier_tool
 from .data_validator_tool import get_data_validator_tool
 from .structure_validator_tool import get_structure_validator_tool
@@ -25,9 +26,11 @@ from .crewai_cid2properties_tool import CrewAICID2PropertiesTool
 from .crewai_formula2properties_tool import CrewAIFormula2PropertiesTool
 from .crewai_material_search_tool import CrewAIMaterialSearchTool
 from .crewai_pnec_tool import CrewAIPNECTool
+from .crewai_risk_quotient_tool import CrewAIRiskQuotientTool
 from .crewai_material_identifier_tool import CrewAIMaterialIdentifierTool
 from .crewai_data_validator_tool import CrewAIDataValidatorTool
 from .crewai_structure_validator_tool import CrewAIStructureValidatorTool
+from .crewai_batch_assessment_tool import CrewAIBatchAssessmentTool
 
 # Import tool factory / 导入工具工厂
 from .factory import ToolFactory
@@ -49,6 +52,7 @@ __all__ = [
     'get_formula2properties_tool',
     'get_material_search_tool',
     'get_pnec_tool',
+    'get_risk_quotient_engine',
     'get_material_identifier_tool',
     'get_data_validator_tool',
     'get_structure_validator_tool',
@@ -60,8 +64,10 @@ __all__ = [
     'CrewAIFormula2PropertiesTool',
     'CrewAIMaterialSearchTool',
     'CrewAIPNECTool',
+    'CrewAIRiskQuotientTool',
     'CrewAIMaterialIdentifierTool',
     'CrewAIDataValidatorTool',
     'structure_validator_tool',
+    'CrewAIBatchAssessmentTool',
     'ToolFactory'
 ]
\ No newline at end of file
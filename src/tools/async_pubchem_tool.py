@@ -0,0 +1,758 @@
+#!/usr/bin/env python3
+"""
+异步PubChem客户端 / Async PubChem Client
+基于httpx.AsyncClient的PubChem查询工具，在共享速率限制下并发执行多个查询
+/ httpx.AsyncClient based PubChem query tool that runs many lookups concurrently under the shared rate limit
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+from src.config.config import Config
+from src.utils.response_cache import ResponseCache
+from src.utils.rate_limiter import TokenBucketRateLimiter, get_rate_limiter
+from src.utils.singleflight import get_singleflight
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# 标准性质字段列表 / Standard property field list
+PUBCHEM_PROPERTY_FIELDS = "MolecularFormula,MolecularWeight,IUPACName,CanonicalSMILES,IsomericSMILES,InChI,InChIKey,XLogP,HBondDonorCount,HBondAcceptorCount,RotatableBondCount,TPSA,Complexity"
+
+# 批量CID查询时每次请求的最大CID数量 / Maximum number of CIDs per request in batched lookups
+PUBCHEM_CID_BATCH_SIZE = 100
+
+# PubChem主机名，所有PubChem客户端共享该主机的速率限制器 / PubChem host, every PubChem client shares this host's rate limiter
+PUBCHEM_HOST = "pubchem.ncbi.nlm.nih.gov"
+
+# 按端点设置的缓存TTL（秒），首个匹配的关键字生效 / Per-endpoint cache TTLs (seconds), first matching keyword wins
+PUBCHEM_CACHE_TTL_RULES = [
+    ("/synonyms/", 30 * 24 * 3600),     # 同义词/CAS号几乎不变 / Synonyms and CAS numbers rarely change
+    ("compound/cid/", 30 * 24 * 3600),  # CID对应的性质表是稳定的 / Property tables by CID are stable
+    ("/cids/", 30 * 24 * 3600),         # 名称到CID的映射 / Name to CID mapping
+    ("compound/name/", 7 * 24 * 3600),  # 名称解析可能随同义词更新而变化 / Name resolution may change with synonym updates
+    ("compound/fastformula/", 24 * 3600),  # 分子式搜索结果会随新增化合物变化 / Formula search results grow with new compounds
+]
+
+class AsyncPubChemTool:
+    """异步PubChem数据库查询工具 / Async PubChem database query tool
+    
+    与PubChemTool提供相同的方法（均为协程），并发数由信号量限制，
+    请求速率由进程内共享的PubChem令牌桶控制，响应写入共享磁盘缓存。
+    / Exposes the same methods as PubChemTool (as coroutines); concurrency is bounded by a semaphore,
+    request rate by the process-wide PubChem token bucket, and responses go to the shared disk cache.
+    """
+    
+    def __init__(self, api_key: str = None, max_concurrency: Optional[int] = None):
+        """
+        初始化异步PubChem工具 / Initialize async PubChem tool
+        
+        Args:
+            api_key (str, optional): PubChem API密钥 / PubChem API key
+            max_concurrency (int, optional): 最大并发请求数 / Maximum number of in-flight requests
+        """
+        self.base_url = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+        self.api_key = api_key or os.getenv('PUBCHEM_API_KEY')
+        # 设置请求头 / Set request headers
+        self.headers = {
+            "User-Agent": "ECOMATS-PubChem-Tool/1.0"
+        }
+        # 如果有API密钥，添加到请求头 / Add API key to request headers if available
+        if self.api_key:
+            self.headers["X-PubChem-API-Key"] = self.api_key
+        self.max_concurrency = max_concurrency or Config.PUBCHEM_MAX_CONCURRENCY
+        
+        # 请求频率控制（进程内所有PubChem客户端共享） / Request rate control (shared by all PubChem clients in the process)
+        self.rate_limiter = get_pubchem_rate_limiter()
+        
+        # 磁盘响应缓存 / On-disk response cache
+        self.cache = get_pubchem_cache()
+        
+        # 合并并发的相同请求（所有PubChem客户端共享） / Coalesce concurrent identical requests (shared by all PubChem clients)
+        self.singleflight = get_singleflight(PUBCHEM_HOST)
+        
+        # httpx客户端和信号量绑定到事件循环，按循环分别创建 / httpx clients and semaphores are bound to an event loop, so keep one per loop
+        self._loop_state = weakref.WeakKeyDictionary()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        获取响应缓存统计信息 / Get response cache statistics
+        
+        Returns:
+            缓存命中/未命中统计 / Cache hit/miss statistics
+        """
+        if self.cache is None:
+            return {"enabled": False}
+        stats = self.cache.stats()
+        stats["enabled"] = True
+        return stats
+    
+    def request_stats(self) -> Dict[str, Any]:
+        """
+        获取请求控制统计信息 / Get request control statistics
+        
+        Returns:
+            速率限制与请求合并统计 / Rate limit and request coalescing statistics
+        """
+        return {
+            "rate_limiter": self.rate_limiter.stats(),
+            "singleflight": self.singleflight.stats()
+        }
+    
+    def _get_loop_state(self):
+        """
+        获取当前事件循环对应的httpx客户端和并发信号量 / Get the httpx client and concurrency semaphore for the running loop
+        
+        Returns:
+            (httpx.AsyncClient, asyncio.Semaphore)
+        """
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            client = httpx.AsyncClient(base_url=self.base_url, headers=self.headers, limits=limits)
+            state = (client, asyncio.Semaphore(self.max_concurrency))
+            self._loop_state[loop] = state
+        return state
+    
+    async def aclose(self) -> None:
+        """关闭当前事件循环上的httpx客户端 / Close the httpx client of the running loop"""
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.pop(loop, None)
+        if state is not None:
+            await state[0].aclose()
+    
+    async def _make_request(self, endpoint: str, timeout: int = 30, max_retries: int = 5, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        发送API请求，带重试机制 / Send API request with retry mechanism
+        
+        Args:
+            endpoint: API端点 / API endpoint
+            timeout: 超时时间（秒） / Timeout (seconds)
+            max_retries: 最大重试次数 / Maximum retry attempts
+            use_cache: 是否读写响应缓存 / Whether to read/write the response cache
+            
+        Returns:
+            API响应数据 / API response data
+        """
+        # 优先读取缓存，命中时无需等待频率控制 / Read from cache first, hits skip rate control
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(endpoint)
+            if cached is not None:
+                logger.debug(f"PubChem缓存命中: {endpoint} / PubChem cache hit: {endpoint}")
+                return cached
+        
+        # 相同端点的并发请求共享一次实际请求 / Concurrent requests for the same endpoint share one actual request
+        return await self.singleflight.do_async(
+            endpoint,
+            lambda: self._send_request(endpoint, timeout=timeout, max_retries=max_retries, use_cache=use_cache)
+        )
+    
+    async def _send_request(self, endpoint: str, timeout: int = 30, max_retries: int = 5, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        实际发送API请求（带重试），由_make_request在缓存未命中且无相同请求进行中时调用
+        / Actually send the API request (with retries); called by _make_request on a cache miss with no identical request in flight
+        
+        Args:
+            endpoint: API端点 / API endpoint
+            timeout: 超时时间（秒） / Timeout (seconds)
+            max_retries: 最大重试次数 / Maximum retry attempts
+            use_cache: 是否写入响应缓存 / Whether to write the response cache
+            
+        Returns:
+            API响应数据 / API response data
+        """
+        client, semaphore = self._get_loop_state()
+        for attempt in range(max_retries):
+            try:
+                logger.debug(f"请求PubChem API: {self.base_url}/{endpoint}")
+                
+                async with semaphore:
+                    # 请求频率控制 / Request rate control
+                    await self.rate_limiter.acquire_async()
+                    response = await client.get(endpoint, timeout=timeout)
+                
+                # 检查是否是503错误（服务器繁忙） / Check if it's a 503 error (server busy)
+                if response.status_code == 503:
+                    retry_after = int(response.headers.get('Retry-After', 30))
+                    logger.warning(f"PubChem服务器繁忙，将在 {retry_after} 秒后重试 / PubChem server is busy, will retry after {retry_after} seconds")
+                    if attempt < max_retries - 1:
+                        logger.info(f"等待 {retry_after} 秒后重试 / Waiting {retry_after} seconds before retry")
+                        # 暂停共享限制器，使所有PubChem客户端一起退避 / Pause the shared limiter so every PubChem client backs off together
+                        self.rate_limiter.pause(retry_after)
+                        continue
+                
+                # 404/400表示PubChem中没有该化合物（或名称无法解析），重试没有意义
+                # 404/400 means PubChem has no such compound (or cannot parse the name); retrying is pointless
+                if response.status_code in (400, 404):
+                    data = {"error": f"PubChem中未找到: {endpoint} (HTTP {response.status_code})", "not_found": True}
+                    if use_cache and self.cache is not None and Config.NEGATIVE_CACHE_ENABLED:
+                        self.cache.set(endpoint, data, ttl=Config.NEGATIVE_CACHE_TTL)
+                    return data
+                
+                response.raise_for_status()
+                data = response.json()
+                # 只缓存成功的响应 / Only cache successful responses
+                if use_cache and self.cache is not None and isinstance(data, dict) and "Fault" not in data:
+                    self.cache.set(endpoint, data)
+                return data
+                
+            except httpx.HTTPError as e:
+                logger.warning(f"PubChem API请求失败 (尝试 {attempt + 1}/{max_retries}): {e} / PubChem API request failed (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:  # 不是最后一次尝试
+                    # 指数退避延迟，增加基础延迟时间
+                    delay = (3 ** attempt) + (random.randint(0, 2000) / 1000)  # 1-5秒随机延迟
+                    logger.info(f"等待 {delay:.2f} 秒后重试 / Waiting {delay:.2f} seconds before retry")
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error(f"PubChem API请求最终失败: {e} / PubChem API request finally failed: {e}")
+                    return {"error": f"API请求失败: {str(e)}"}
+            except Exception as e:
+                logger.error(f"处理响应时出错: {e}")
+                return {"error": f"处理响应时出错: {str(e)}"}
+        
+        return {"error": "API请求失败: 超过最大重试次数"}
+    
+    async def get_basic_properties_by_name(self, compound_name: str) -> Dict[str, Any]:
+        """
+        通过化学名称查询基础信息 / Query basic information by compound name
+        
+        Args:
+            compound_name: 化合物名称 / Compound name
+            
+        Returns:
+            化合物基础信息 / Compound basic information
+        """
+        endpoint = f"compound/name/{compound_name}/property/MolecularFormula,MolecularWeight,IUPACName,CanonicalSMILES,IsomericSMILES,InChI,InChIKey,XLogP,HBondDonorCount,HBondAcceptorCount,RotatableBondCount,TPSA,Complexity/JSON"
+        return await self._make_request(endpoint, max_retries=3)
+    
+    async def get_synonyms_with_cas(self, compound_name: str) -> Dict[str, Any]:
+        """
+        获取化合物同义词（包含CAS号） / Get compound synonyms (including CAS numbers)
+        
+        Args:
+            compound_name: 化合物名称 / Compound name
+            
+        Returns:
+            化合物同义词列表（包含CAS号） / List of compound synonyms (including CAS numbers)
+        """
+        endpoint = f"compound/name/{compound_name}/synonyms/JSON"
+        return await self._make_request(endpoint, max_retries=3)
+    
+    async def get_synonyms_by_cid(self, cid: int) -> Dict[str, Any]:
+        """
+        通过CID获取化合物同义词（包含CAS号） / Get compound synonyms (including CAS numbers) by CID
+        
+        Args:
+            cid: PubChem化合物ID / PubChem compound ID
+            
+        Returns:
+            化合物同义词列表（包含CAS号） / List of compound synonyms (including CAS numbers)
+        """
+        endpoint = f"compound/cid/{cid}/synonyms/JSON"
+        return await self._make_request(endpoint, max_retries=3)
+    
+    async def get_properties_by_cid(self, cid: int) -> Dict[str, Any]:
+        """
+        通过CID获取详细信息 / Get detailed information by CID
+        
+        Args:
+            cid: PubChem化合物ID / PubChem compound ID
+            
+        Returns:
+            化合物详细信息 / Compound detailed information
+        """
+        endpoint = f"compound/cid/{cid}/property/{PUBCHEM_PROPERTY_FIELDS}/JSON"
+        return await self._make_request(endpoint, max_retries=3)
+    
+    async def get_properties_by_cids(self, cids: List[Any], chunk_size: int = PUBCHEM_CID_BATCH_SIZE) -> Dict[int, Dict[str, Any]]:
+        """
+        批量通过CID获取详细信息 / Get detailed information for multiple CIDs
+        
+        已缓存的CID直接返回，其余CID按chunk_size分块，每块只发送一次逗号分隔的请求。
+        / Cached CIDs are returned directly; the rest are split into chunks of chunk_size and fetched with one comma-separated request per chunk.
+        
+        Args:
+            cids: PubChem化合物ID列表 / List of PubChem compound IDs
+            chunk_size: 每次请求的最大CID数量 / Maximum number of CIDs per request
+            
+        Returns:
+            以CID为键的性质字典，未找到的CID对应包含error的字典 / Property dicts keyed by CID, missing CIDs map to a dict with an error
+        """
+        results = {}
+        pending = []
+        for cid in cids:
+            if not self.validate_cid(cid):
+                logger.warning(f"忽略无效的CID: {cid} / Ignoring invalid CID: {cid}")
+                continue
+            cid = int(cid)
+            if cid in results or cid in pending:
+                continue
+            
+            # 复用单个CID查询的缓存条目 / Reuse cache entries of single-CID lookups
+            if self.cache is not None:
+                cached = self.cache.get(f"compound/cid/{cid}/property/{PUBCHEM_PROPERTY_FIELDS}/JSON")
+                if cached and cached.get("PropertyTable", {}).get("Properties"):
+                    results[cid] = cached["PropertyTable"]["Properties"][0]
+                    continue
+            pending.append(cid)
+        
+        chunk_size = max(1, chunk_size)
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            endpoint = f"compound/cid/{','.join(str(cid) for cid in chunk)}/property/{PUBCHEM_PROPERTY_FIELDS}/JSON"
+            data = await self._make_request(endpoint, max_retries=3, use_cache=False)
+            
+            if "error" in data:
+                for cid in chunk:
+                    results[cid] = {"CID": cid, "error": data["error"]}
+                continue
+            
+            for properties in data.get("PropertyTable", {}).get("Properties", []):
+                cid = properties.get("CID")
+                if cid is None:
+                    continue
+                results[cid] = properties
+                # 按单个CID端点写回缓存，供后续单独查询复用 / Store under the single-CID endpoint so later single lookups hit the cache
+                if self.cache is not None:
+                    self.cache.set(
+                        f"compound/cid/{cid}/property/{PUBCHEM_PROPERTY_FIELDS}/JSON",
+                        {"PropertyTable": {"Properties": [properties]}}
+                    )
+            
+            for cid in chunk:
+                if cid not in results:
+                    results[cid] = {"CID": cid, "error": f"未找到CID: {cid}"}
+        
+        return results
+    
+    async def search_by_molecular_formula(self, formula: str) -> Dict[str, Any]:
+        """
+        通过分子式搜索化合物 / Search compound by molecular formula
+        
+        Args:
+            formula: 化学分子式 / Chemical molecular formula
+            
+        Returns:
+            化合物信息 / Compound information
+        """
+        endpoint = f"compound/fastformula/{formula}/property/MolecularFormula,MolecularWeight,IUPACName,CanonicalSMILES,IsomericSMILES,InChI,InChIKey,XLogP,HBondDonorCount,HBondAcceptorCount,RotatableBondCount,TPSA,Complexity/JSON"
+        return await self._make_request(endpoint, max_retries=3)
+    
+    async def search_by_inchikey(self, inchikey: str) -> Dict[str, Any]:
+        """
+        通过InChIKey搜索化合物 / Search compound by InChIKey
+        
+        Args:
+            inchikey: InChIKey标识符 / InChIKey identifier
+            
+        Returns:
+            化合物信息 / Compound information
+        """
+        endpoint = f"compound/inchikey/{inchikey}/property/MolecularFormula,MolecularWeight,IUPACName,CanonicalSMILES,IsomericSMILES,InChI,InChIKey,XLogP,HBondDonorCount,HBondAcceptorCount,RotatableBondCount,TPSA,Complexity/JSON"
+        return await self._make_request(endpoint, max_retries=3)
+    
+    async def search_compound(self, query: str, search_type: str = "auto") -> Dict[str, Any]:
+        """
+        智能搜索化合物（自动判断查询类型） / Intelligent search compound (automatically determine search type)
+        
+        Args:
+            query: 查询内容（化学名称、分子式或InChIKey） / Query content (compound name, molecular formula, or InChIKey)
+            search_type: 查询类型 ("auto", "name", "formula", "inchikey") / Search type ("auto", "name", "formula", "inchikey")
+            
+        Returns:
+            化合物信息 / Compound information
+        """
+        if search_type == "auto":
+            # 检查是否为InChIKey格式 (通常为27个字符，包含连字符)
+            if len(query) == 27 and query.count('-') >= 2:
+                # 可能是InChIKey，使用inchikey端点
+                return await self.search_by_inchikey(query)
+            # 检查是否为分子式格式 (包含元素符号和数字)
+            elif self._is_molecular_formula(query):
+                # 可能是分子式，使用fastformula端点
+                return await self.search_by_molecular_formula(query)
+            else:
+                # 可能是化学名称，使用name端点
+                return await self.get_basic_properties_by_name(query)
+        elif search_type == "name":
+            return await self.get_basic_properties_by_name(query)
+        elif search_type == "formula":
+            return await self.search_by_molecular_formula(query)
+        elif search_type == "inchikey":
+            return await self.search_by_inchikey(query)
+        else:
+            return {"error": f"不支持的搜索类型: {search_type}"}
+    
+    def _is_molecular_formula(self, query: str) -> bool:
+        """
+        判断查询字符串是否可能是分子式 / Determine if query string is likely a molecular formula
+        
+        Args:
+            query: 查询字符串 / Query string
+            
+        Returns:
+            是否可能是分子式 / Whether it is likely a molecular formula
+        """
+        import re
+        # 分子式通常由元素符号和数字组成，可能包含括号
+        # 元素符号以大写字母开头，可能跟着小写字母
+        # 例如: H2O, C6H6, C12H22O11, Ca(OH)2, NaCl
+        # 更准确的正则表达式，支持多种格式
+        formula_pattern = r'^([A-Z][a-z]?[0-9]*)+([A-Z][a-z]?[0-9]*)*$|^([A-Z][a-z]?[0-9]*)*\([A-Z][a-z]?[0-9]*\)[0-9]*([A-Z][a-z]?[0-9]*)*$'
+        return bool(re.match(formula_pattern, query))
+    
+    async def _plan_compound_lookup(self, query: str, need_synonyms: bool = False) -> Dict[str, Any]:
+        """
+        组合查询的请求规划器：只发出必要的端点调用并复用已获取的数据
+        / Request planner for composite lookups: issues only the required endpoint calls and reuses fetched data
+        
+        搜索端点已返回完整的性质表，因此不再按CID重复请求性质；
+        同义词直接通过已得到的CID查询，不再重新解析名称。
+        / Search endpoints already return the full property table, so properties are never re-requested by CID;
+        synonyms are fetched by the CID already resolved instead of re-resolving the name.
+        
+        Args:
+            query: 查询内容 / Query content
+            need_synonyms: 是否需要同义词（CAS号） / Whether synonyms (CAS numbers) are needed
+            
+        Returns:
+            包含basic_info、properties和synonyms的字典 / Dict with basic_info, properties and synonyms
+        """
+        plan = {"basic_info": None, "properties": None, "synonyms": None}
+        
+        # 第一步：名称/分子式/InChIKey -> 性质表 / Step 1: name/formula/InChIKey -> property table
+        basic_info = await self.search_compound(query)
+        plan["basic_info"] = basic_info
+        if "error" in basic_info:
+            return plan
+        
+        records = basic_info.get("PropertyTable", {}).get("Properties") or []
+        if not records:
+            return plan
+        plan["properties"] = records[0]
+        
+        # 第二步：CID -> 同义词（仅在需要时） / Step 2: CID -> synonyms (only when needed)
+        cid = records[0].get("CID")
+        if need_synonyms and cid:
+            synonyms_data = await self.get_synonyms_by_cid(cid)
+            info_list = synonyms_data.get("InformationList", {}).get("Information") or []
+            plan["synonyms"] = info_list[0].get("Synonym", []) if info_list else []
+        
+        return plan
+    
+    async def get_compound_info(self, query: str) -> Dict[str, Any]:
+        """
+        获取化合物完整信息 / Get complete compound information
+        
+        Args:
+            query: 化合物名称、CID、分子式或InChIKey / Compound name, CID, molecular formula, or InChIKey
+            
+        Returns:
+            化合物完整信息 / Complete compound information
+        """
+        try:
+            # 搜索结果已包含全部性质字段，只需一次请求 / The search result already carries every property field, one request suffices
+            plan = await self._plan_compound_lookup(query)
+            basic_info = plan["basic_info"]
+            
+            if "error" in basic_info:
+                return basic_info
+            
+            if "PropertyTable" not in basic_info or "Properties" not in basic_info["PropertyTable"]:
+                return basic_info
+            
+            detail_props = plan["properties"]
+            if not detail_props:
+                return {"error": "未找到化合物属性信息"}
+            if not detail_props.get("CID"):
+                return {"error": "无法提取化合物CID"}
+            
+            # 获取SMILES表示并验证有效性
+            canonical_smiles = detail_props.get("CanonicalSMILES", "N/A")
+            isomeric_smiles = detail_props.get("IsomericSMILES", "N/A")
+            
+            # 验证SMILES有效性（简单检查）
+            if canonical_smiles != "N/A" and self._is_valid_smiles(canonical_smiles):
+                canonical_smiles_value = canonical_smiles
+            else:
+                canonical_smiles_value = "N/A"
+                
+            if isomeric_smiles != "N/A" and self._is_valid_smiles(isomeric_smiles):
+                isomeric_smiles_value = isomeric_smiles
+            else:
+                isomeric_smiles_value = "N/A"
+            
+            # 合并信息 / Merge information
+            result = detail_props.copy()
+            result.update({
+                "canonical_smiles": canonical_smiles_value,
+                "isomeric_smiles": isomeric_smiles_value,
+                "inchi": detail_props.get("InChI", "N/A"),
+                "inchi_key": detail_props.get("InChIKey", "N/A"),
+                "molecular_formula": detail_props.get("MolecularFormula", "N/A"),
+                "molecular_weight": detail_props.get("MolecularWeight", "N/A"),
+                "iupac_name": detail_props.get("IUPACName", "N/A"),
+                "xlogp": detail_props.get("XLogP", "N/A"),
+                "hydrogen_bond_donor_count": detail_props.get("HBondDonorCount", "N/A"),
+                "hydrogen_bond_acceptor_count": detail_props.get("HBondAcceptorCount", "N/A"),
+                "rotatable_bond_count": detail_props.get("RotatableBondCount", "N/A"),
+                "tpsa": detail_props.get("TPSA", "N/A"),  # 极性表面积
+                "complexity": detail_props.get("Complexity", "N/A")
+            })
+            return {"Compound": result}
+                
+        except Exception as e:
+            logger.error(f"获取完整化合物信息时出错: {e}")
+            return {"error": f"获取完整化合物信息时出错: {str(e)}"}
+    
+    def _is_valid_smiles(self, smiles: str) -> bool:
+        """
+        简单验证SMILES字符串是否有效 / Simple validation of SMILES string
+        
+        Args:
+            smiles: SMILES字符串 / SMILES string
+            
+        Returns:
+            是否有效 / Whether it is valid
+        """
+        # 简单检查：确保不是明显的占位值（整体比较；"#"是SMILES中的三键，不能作为无效标记）
+        # / Reject obvious placeholder values (whole-value comparison; "#" is a triple bond in SMILES, not a marker)
+        if not smiles or smiles.strip() in ("N/A", "None", "null", "NULL"):
+            return False
+            
+        # 确保包含至少一个字母
+        if not any(c.isalpha() for c in smiles):
+            return False
+            
+        # 检查是否包含至少一个常见的化学元素符号（含芳香原子的小写写法） / At least one common element symbol (aromatic atoms are lower-case)
+        common_elements = ['C', 'H', 'O', 'N', 'P', 'S', 'F', 'Cl', 'Br', 'I', 'B', 'Si', 'c', 'n', 'o', 's', 'p', 'b']
+        if not any(element in smiles for element in common_elements):
+            return False
+            
+        return True
+    
+    def validate_cid(self, cid: Any) -> bool:
+        """
+        验证CID是否有效 / Validate if CID is valid
+        
+        Args:
+            cid: 化合物ID / Compound ID
+            
+        Returns:
+            CID是否有效 / Whether CID is valid
+        """
+        try:
+            # CID应该是正整数
+            if cid is None or cid == "" or cid == "N/A":
+                return False
+            cid_int = int(cid)
+            return cid_int > 0
+        except (ValueError, TypeError):
+            return False
+    
+    async def get_validated_compound_info(self, query: str) -> Dict[str, Any]:
+        """
+        获取经过验证的化合物信息 / Get validated compound information
+        
+        Args:
+            query: 查询内容 / Query content
+            
+        Returns:
+            经过验证的化合物信息 / Validated compound information
+        """
+        try:
+            # 获取化合物信息
+            compound_info = await self.get_compound_info(query)
+            
+            # 检查是否有错误
+            if "error" in compound_info:
+                return compound_info
+            
+            # 验证CID
+            if "Compound" in compound_info:
+                compound = compound_info["Compound"]
+                cid = compound.get("CID")
+                if not self.validate_cid(cid):
+                    return {
+                        "success": False,
+                        "query": query,
+                        "error": f"无效的CID: {cid}"
+                    }
+                
+                # 验证分子量
+                molecular_weight = compound.get("MolecularWeight")
+                if molecular_weight == "N/A" or molecular_weight is None:
+                    # 这是可以接受的，某些化合物可能没有分子量信息
+                    pass
+                else:
+                    try:
+                        mw = float(molecular_weight)
+                        if mw <= 0:
+                            return {
+                                "success": False,
+                                "query": query,
+                                "error": f"无效的分子量: {molecular_weight}"
+                            }
+                    except (ValueError, TypeError):
+                        # 分子量不是数字，这可能是一个问题
+                        pass
+                
+                # 添加验证标记
+                compound_info["validated"] = True
+                compound_info["validation_time"] = time.time()
+            
+            return compound_info
+            
+        except Exception as e:
+            logger.error(f"验证化合物信息时出错: {e}")
+            return {
+                "success": False,
+                "query": query,
+                "error": f"验证失败: {str(e)}"
+            }
+    
+    async def get_compound_info_with_cas(self, query: str) -> Dict[str, Any]:
+        """
+        获取化合物完整信息（包括CAS号） / Get complete compound information (including CAS numbers)
+        
+        Args:
+            query: 化合物名称或分子式 / Compound name or molecular formula
+            
+        Returns:
+            化合物完整信息 / Complete compound information
+        """
+        try:
+            # 名称 -> 性质表，然后 CID -> 同义词，共两次请求 / name -> properties, then CID -> synonyms: two requests in total
+            plan = await self._plan_compound_lookup(query, need_synonyms=True)
+            basic_info = plan["basic_info"]
+            
+            if "error" in basic_info:
+                return basic_info
+            
+            properties = plan["properties"]
+            if properties and properties.get("CID"):
+                # 筛选出CAS号（格式：XXXXX-XX-X） / Filter out CAS numbers (format: XXXXX-XX-X)
+                cas_numbers = [syn for syn in (plan["synonyms"] or []) if self._is_cas_number(syn)]
+                
+                # 合并信息 / Merge information
+                result = properties.copy()
+                result["CASNumbers"] = cas_numbers
+                return {"Compound": result}
+                        
+            return basic_info
+            
+        except Exception as e:
+            logger.error(f"获取完整化合物信息时出错: {e}")
+            return {"error": f"获取完整化合物信息时出错: {str(e)}"}
+    
+    async def search_compounds(self, queries: List[str], search_type: str = "auto") -> Dict[str, Dict[str, Any]]:
+        """
+        并发搜索多个化合物 / Search multiple compounds concurrently
+        
+        Args:
+            queries: 查询内容列表 / List of queries
+            search_type: 查询类型 / Search type
+            
+        Returns:
+            以查询内容为键的结果字典 / Results keyed by query
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        results = await asyncio.gather(*(self.search_compound(query, search_type) for query in unique_queries))
+        return dict(zip(unique_queries, results))
+    
+    async def get_compound_infos(self, queries: List[str], with_cas: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        并发获取多个化合物的完整信息 / Get complete information for multiple compounds concurrently
+        
+        Args:
+            queries: 查询内容列表 / List of queries
+            with_cas: 是否同时获取CAS号 / Whether to include CAS numbers
+            
+        Returns:
+            以查询内容为键的结果字典 / Results keyed by query
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        method = self.get_compound_info_with_cas if with_cas else self.get_compound_info
+        results = await asyncio.gather(*(method(query) for query in unique_queries))
+        return dict(zip(unique_queries, results))
+    
+    def _is_cas_number(self, text: str) -> bool:
+        """
+        判断文本是否为CAS号格式 / Determine if text is in CAS number format
+        
+        Args:
+            text: 待判断文本 / Text to be judged
+            
+        Returns:
+            是否为CAS号格式 / Whether it is in CAS number format
+        """
+        import re
+        # CAS号格式：XXXXX-XX-X / CAS number format: XXXXX-XX-X
+        cas_pattern = r'^\d{2,7}-\d{2}-\d$'
+        return bool(re.match(cas_pattern, text))
+
+def get_pubchem_rate_limiter() -> TokenBucketRateLimiter:
+    """
+    获取PubChem共享速率限制器 / Get the shared PubChem rate limiter
+    
+    Returns:
+        TokenBucketRateLimiter: 进程内共享的限制器 / Process-wide shared limiter
+    """
+    return get_rate_limiter(PUBCHEM_HOST, rate=Config.PUBCHEM_RATE_LIMIT, capacity=Config.PUBCHEM_RATE_BURST)
+
+# 共享磁盘缓存 / Shared disk cache
+_pubchem_cache = None
+_pubchem_cache_initialized = False
+_pubchem_cache_lock = threading.Lock()
+
+def get_pubchem_cache() -> Optional[ResponseCache]:
+    """
+    获取PubChem共享响应缓存，未启用或不可用时返回None / Get the shared PubChem response cache, None if disabled or unavailable
+    
+    Returns:
+        Optional[ResponseCache]: 共享缓存实例 / Shared cache instance
+    """
+    global _pubchem_cache, _pubchem_cache_initialized
+    with _pubchem_cache_lock:
+        if not _pubchem_cache_initialized:
+            _pubchem_cache_initialized = True
+            if Config.PUBCHEM_CACHE_ENABLED:
+                try:
+                    _pubchem_cache = ResponseCache(
+                        os.path.expanduser(Config.PUBCHEM_CACHE_PATH),
+                        default_ttl=Config.PUBCHEM_CACHE_DEFAULT_TTL,
+                        ttl_rules=PUBCHEM_CACHE_TTL_RULES,
+                        max_size_bytes=int(Config.PUBCHEM_CACHE_MAX_MB * 1024 * 1024)
+                    )
+                except Exception as e:
+                    logger.warning(f"PubChem缓存不可用，将直接请求API: {e} / PubChem cache unavailable, falling back to direct API requests: {e}")
+                    _pubchem_cache = None
+        return _pubchem_cache
+
+# 全局实例 / Global instance
+_async_pubchem_tool = None
+
+def get_async_pubchem_tool(api_key: str = None) -> AsyncPubChemTool:
+    """
+    获取异步PubChem工具实例 / Get async PubChem tool instance
+    
+    Args:
+        api_key (str, optional): PubChem API密钥 / PubChem API key
+        
+    Returns:
+        AsyncPubChemTool: 工具实例 / Tool instance
+    """
+    global _async_pubchem_tool
+    if _async_pubchem_tool is None:
+        _async_pubchem_tool = AsyncPubChemTool(api_key)
+    return _async_pubchem_tool
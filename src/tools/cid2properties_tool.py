@@ -5,7 +5,7 @@ CID2Properties工具
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 from src.tools.pubchem_tool import get_pubchem_tool
 
 # 配置日志
@@ -38,17 +38,7 @@ class CID2PropertiesTool:
                 # 提取属性数据
                 if "PropertyTable" in result and "Properties" in result["PropertyTable"]:
                     properties = result["PropertyTable"]["Properties"][0]
-                    return {
-                        "success": True,
-                        "cid": cid,
-                        "molecular_formula": properties.get("MolecularFormula", "N/A"),
-                        "molecular_weight": properties.get("MolecularWeight", "N/A"),
-                        "iupac_name": properties.get("IUPACName", "N/A"),
-                        "canonical_smiles": properties.get("CanonicalSMILES", "N/A"),
-                        "isomeric_smiles": properties.get("IsomericSMILES", "N/A"),
-                        "inchi": properties.get("InChI", "N/A"),
-                        "inchi_key": properties.get("InChIKey", "N/A")
-                    }
+                    return self._format_properties(cid, properties)
                 else:
                     return {
                         "success": False,
@@ -70,6 +60,64 @@ class CID2PropertiesTool:
                 "error": f"查询失败: {str(e)}"
             }
 
+    def get_properties_by_cids(self, cids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量根据PubChem CID查询化合物性质（合并为尽量少的请求）
+        
+        Args:
+            cids (List[str]): PubChem化合物ID列表
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: 以输入CID为键的性质字典
+        """
+        results = {}
+        try:
+            batch = self.pubchem_tool.get_properties_by_cids(cids)
+        except Exception as e:
+            logger.error(f"批量根据CID查询化合物性质时出错: {e}")
+            return {
+                str(cid): {"success": False, "cid": cid, "error": f"查询失败: {str(e)}"}
+                for cid in cids
+            }
+        
+        for cid in cids:
+            try:
+                properties = batch.get(int(cid))
+            except (ValueError, TypeError):
+                properties = None
+            
+            if properties is None:
+                results[str(cid)] = {"success": False, "cid": cid, "error": "无效的CID"}
+            elif "error" in properties:
+                results[str(cid)] = {"success": False, "cid": cid, "error": properties["error"]}
+            else:
+                results[str(cid)] = self._format_properties(cid, properties)
+        
+        return results
+    
+    def _format_properties(self, cid: Any, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        整理PubChem性质数据
+        
+        Args:
+            cid (Any): PubChem化合物ID
+            properties (Dict[str, Any]): PubChem返回的性质条目
+            
+        Returns:
+            Dict[str, Any]: 整理后的性质字典
+        """
+        return {
+            "success": True,
+            "cid": cid,
+            "molecular_formula": properties.get("MolecularFormula", "N/A"),
+            "molecular_weight": properties.get("MolecularWeight", "N/A"),
+            "iupac_name": properties.get("IUPACName", "N/A"),
+            "canonical_smiles": properties.get("CanonicalSMILES", "N/A"),
+            "isomeric_smiles": properties.get("IsomericSMILES", "N/A"),
+            "inchi": properties.get("InChI", "N/A"),
+            "inchi_key": properties.get("InChIKey", "N/A")
+        }
+
 # 全局实例
 _cid2properties_tool = None
 
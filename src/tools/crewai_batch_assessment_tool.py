@@ -0,0 +1,42 @@
+import json
+from typing import List
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from src.utils.assessment_tool_executor import AssessmentToolExecutor
+
+class BatchAssessmentToolInput(BaseModel):
+    """批量评估工具输入参数模型"""
+    material_formulas: List[str] = Field(description="待验证的材料化学式列表，例如排名前5的材料")
+    mp_limit: int = Field(default=5, description="每个金属材料返回的Materials Project结果数量")
+
+class CrewAIBatchAssessmentTool(BaseTool):
+    """CrewAI工具包装器，用于一次性对多个候选材料执行强制工具调用"""
+
+    name: str = "Batch Material Assessment"
+    description: str = (
+        "一次性对多个候选材料执行全部强制验证：材料识别、结构验证、Materials Project/PubChem查询、PNEC、数据验证和相似材料搜索。"
+        "同一材料的不同写法只查询一次，金属材料合并为一次Materials Project查询，有机材料合并为一次PubChem查询。"
+        "当需要交叉验证排名靠前的多个材料时使用此工具，而不是逐个材料调用各个工具。"
+    )
+    args_schema: type[BaseModel] = BatchAssessmentToolInput
+
+    def _run(self, material_formulas: List[str], mp_limit: int = 5) -> str:
+        """
+        执行批量材料评估
+
+        Args:
+            material_formulas: 材料化学式列表
+            mp_limit: 每个金属材料返回的Materials Project结果数量
+
+        Returns:
+            JSON格式的结果，以输入化学式为键
+        """
+        try:
+            # 执行批量工具调用
+            result = AssessmentToolExecutor().execute_for_many(material_formulas, mp_limit=mp_limit)
+
+            # 返回JSON格式的结果
+            return json.dumps(result, ensure_ascii=False, indent=2, default=str)
+
+        except Exception as e:
+            return json.dumps({"error": f"执行批量评估时出错: {str(e)}"}, ensure_ascii=False)
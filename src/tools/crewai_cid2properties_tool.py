@@ -6,7 +6,7 @@ from src.tools.cid2properties_tool import get_cid2properties_tool
 
 class CID2PropertiesToolInput(BaseModel):
     """CID2Properties工具输入参数模型"""
-    cid: str = Field(description="PubChem化合物ID")
+    cid: str = Field(description="PubChem化合物ID，多个CID用逗号分隔（例如 '702,887'）")
 
 class CrewAICID2PropertiesTool(BaseTool):
     """CrewAI工具包装器，用于根据PubChem CID查询性质"""
@@ -16,6 +16,7 @@ class CrewAICID2PropertiesTool(BaseTool):
         "根据PubChem化合物ID (CID) 查询化合物的详细性质。"
         "可以获取分子结构、物理化学性质、生物活性等信息。"
         "当需要通过已知的CID获取化合物详细信息时使用此工具。"
+        "需要同时查询多个化合物时，请在一次调用中传入逗号分隔的CID列表。"
     )
     args_schema: type[BaseModel] = CID2PropertiesToolInput
     
@@ -24,7 +25,7 @@ class CrewAICID2PropertiesTool(BaseTool):
         执行CID到化合物性质的查询
         
         Args:
-            cid: PubChem化合物ID
+            cid: PubChem化合物ID，多个CID用逗号分隔
             
         Returns:
             JSON格式的查询结果
@@ -33,8 +34,12 @@ class CrewAICID2PropertiesTool(BaseTool):
             # 获取工具实例
             tool = get_cid2properties_tool()
             
-            # 执行查询
-            result = tool.get_properties_by_cid(cid)
+            # 执行查询（多个CID时合并为批量请求）
+            cids = [item.strip() for item in str(cid).split(",") if item.strip()]
+            if len(cids) > 1:
+                result = tool.get_properties_by_cids(cids)
+            else:
+                result = tool.get_properties_by_cid(cid)
             
             # 返回JSON格式的结果
             return json.dumps(result, ensure_ascii=False, indent=2)
@@ -62,7 +62,7 @@ class CrewAIDataValidatorTool(BaseTool):
                     result = {"error": "数据中未找到hazard_statements字段"}
             elif validation_type == "molecular_weight":
                 if "molecular_weight" in data:
-                    result = tool.validate_molecular_weight(data["molecular_weight"])
+                    result = tool.validate_molecular_weight(data["molecular_weight"], data.get("molecular_formula"))
                 else:
                     result = {"error": "数据中未找到molecular_weight字段"}
             elif validation_type == "material_id":
@@ -0,0 +1,65 @@
+import json
+from typing import List, Optional
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from src.tools.risk_quotient_engine import get_risk_quotient_engine
+
+class RiskQuotientToolInput(BaseModel):
+    """风险商工具输入参数模型"""
+    material_formula: str = Field(description="含金属的材料化学式")
+    doses_g: List[float] = Field(default=[0.1, 0.5, 1.0], description="催化剂投加量列表（g），可以为0")
+    volumes_l: List[float] = Field(default=[1.0], description="水体体积列表（L）")
+    leach_fractions: List[float] = Field(default=[0.001, 0.01, 0.05], description="金属浸出比例列表（0-1）")
+    n_samples: int = Field(default=10000, description="蒙特卡洛样本数，0表示只计算网格")
+    seed: Optional[int] = Field(default=None, description="随机种子")
+    dilution: float = Field(default=1.0, description="稀释因子")
+
+class CrewAIRiskQuotientTool(BaseTool):
+    """CrewAI工具包装器，用于计算材料中金属浸出的PEC/PNEC风险商"""
+
+    name: str = "Risk Quotient Calculator"
+    description: str = (
+        "根据材料组成和PNEC参考数据，计算材料中每种金属浸出后的风险商（RQ = PEC/PNEC）和危害指数（HI = ΣRQ）。"
+        "在投加量、水体体积和浸出比例的完整网格上计算，并给出蒙特卡洛分位数、超标概率和安全投加浓度。"
+        "当需要定量评估含金属催化剂的环境风险时使用此工具。"
+    )
+    args_schema: type[BaseModel] = RiskQuotientToolInput
+
+    def _run(
+        self,
+        material_formula: str,
+        doses_g: List[float] = [0.1, 0.5, 1.0],
+        volumes_l: List[float] = [1.0],
+        leach_fractions: List[float] = [0.001, 0.01, 0.05],
+        n_samples: int = 10000,
+        seed: Optional[int] = None,
+        dilution: float = 1.0
+    ) -> str:
+        """
+        执行风险商计算
+
+        Args:
+            material_formula: 材料化学式
+            doses_g: 催化剂投加量列表（g）
+            volumes_l: 水体体积列表（L）
+            leach_fractions: 金属浸出比例列表（0-1）
+            n_samples: 蒙特卡洛样本数
+            seed: 随机种子
+            dilution: 稀释因子
+
+        Returns:
+            JSON格式的计算结果
+        """
+        try:
+            # 获取引擎实例
+            engine = get_risk_quotient_engine()
+
+            # 执行网格与蒙特卡洛计算
+            result = engine.evaluate(material_formula, doses_g, volumes_l, leach_fractions,
+                                     n_samples=n_samples, seed=seed, dilution=dilution)
+
+            # 返回JSON格式的结果
+            return json.dumps(result, ensure_ascii=False, indent=2)
+
+        except Exception as e:
+            return json.dumps({"error": f"计算风险商时出错: {str(e)}"}, ensure_ascii=False)
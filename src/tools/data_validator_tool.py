@@ -8,6 +8,8 @@ import logging
 import re
 import time
 from typing import Dict, Any, List, Union
+from src.utils.composition import molecular_weight as local_molecular_weight
+from src.utils.formula_parser import ELEMENT_SET, is_valid_formula, normalize_formula
 
 # 配置日志
 logging.basicConfig(level=logging.WARNING)
@@ -18,14 +20,8 @@ class DataValidatorTool:
     
     def __init__(self):
         """初始化数据验证工具 / Initialize data validator tool"""
-        # 定义有效的化学元素符号
-        self.valid_elements = [
-            'H', 'He', 'Li', 'Be', 'B', 'C', 'N', 'O', 'F', 'Ne', 'Na', 'Mg', 'Al', 'Si', 'P', 'S', 'Cl', 'Ar',
-            'K', 'Ca', 'Sc', 'Ti', 'V', 'Cr', 'Mn', 'Fe', 'Co', 'Ni', 'Cu', 'Zn', 'Ga', 'Ge', 'As', 'Se', 'Br', 'Kr',
-            'Rb', 'Sr', 'Y', 'Zr', 'Nb', 'Mo', 'Tc', 'Ru', 'Rh', 'Pd', 'Ag', 'Cd', 'In', 'Sn', 'Sb', 'Te', 'I', 'Xe',
-            'Cs', 'Ba', 'La', 'Ce', 'Pr', 'Nd', 'Pm', 'Sm', 'Eu', 'Gd', 'Tb', 'Dy', 'Ho', 'Er', 'Tm', 'Yb', 'Lu',
-            'Hf', 'Ta', 'W', 'Re', 'Os', 'Ir', 'Pt', 'Au', 'Hg', 'Tl', 'Pb', 'Bi', 'Po', 'At', 'Rn'
-        ]
+        # 定义有效的化学元素符号（与共享的化学式解析器使用同一张元素表）
+        self.valid_elements = ELEMENT_SET
         
         # 定义有效的GHS危险声明代码
         self.valid_h_statements = [
@@ -36,6 +32,9 @@ class DataValidatorTool:
             "H340", "H341", "H350", "H351", "H360", "H361", "H362", "H370", "H371", "H372", "H373", "H400", "H401", 
             "H402", "H410", "H411", "H412", "H413", "H420"
         ]
+        
+        # 分子量与分子式计算值之间允许的相对偏差
+        self.molecular_weight_tolerance = 0.02
     
     def validate_cid(self, cid: Any) -> Dict[str, Any]:
         """
@@ -160,30 +159,28 @@ class DataValidatorTool:
                 "value": formula
             }
         
-        # 简单的分子式验证（支持括号）
-        formula_pattern = r'^([A-Z][a-z]?[0-9]*)+([A-Z][a-z]?[0-9]*)*$|^([A-Z][a-z]?[0-9]*)*\([A-Z][a-z]?[0-9]*\)[0-9]*([A-Z][a-z]?[0-9]*)*$'
-        if re.match(formula_pattern, formula):
-            # 提取元素符号并验证它们是否有效
-            elements = re.findall(r'[A-Z][a-z]?', formula)
-            invalid_elements = [e for e in elements if e not in self.valid_elements]
-            if not invalid_elements:
-                return {
-                    "valid": True,
-                    "reason": "分子式格式正确且元素有效",
-                    "value": formula
-                }
-            else:
-                return {
-                    "valid": False,
-                    "reason": f"分子式包含无效元素: {', '.join(invalid_elements)}",
-                    "value": formula
-                }
-        else:
+        # 使用共享的化学式解析器（支持括号、水合物、电荷和Unicode下标）
+        if is_valid_formula(formula):
+            return {
+                "valid": True,
+                "reason": "分子式格式正确且元素有效",
+                "value": formula
+            }
+        
+        # 区分"包含无效元素"和"格式不正确"
+        elements = re.findall(r'[A-Z][a-z]?', normalize_formula(formula))
+        invalid_elements = [e for e in elements if e not in self.valid_elements]
+        if invalid_elements:
             return {
                 "valid": False,
-                "reason": "分子式格式不正确",
+                "reason": f"分子式包含无效元素: {', '.join(invalid_elements)}",
                 "value": formula
             }
+        return {
+            "valid": False,
+            "reason": "分子式格式不正确",
+            "value": formula
+        }
     
     def validate_h_statements(self, h_statements: List[str]) -> Dict[str, Any]:
         """
@@ -217,17 +214,28 @@ class DataValidatorTool:
                 "invalid_statements": invalid_statements
             }
     
-    def validate_molecular_weight(self, molecular_weight: Union[str, float]) -> Dict[str, Any]:
+    def validate_molecular_weight(self, molecular_weight: Union[str, float], formula: str = None) -> Dict[str, Any]:
         """
-        验证分子量是否有效
+        验证分子量是否有效（提供分子式时与本地计算值比对）
         
         Args:
             molecular_weight: 分子量
+            formula: 分子式（可选），可解析时用本地原子量表计算分子量进行比对或补全
             
         Returns:
             验证结果字典
         """
-        if molecular_weight == "N/A" or molecular_weight == "null" or molecular_weight is None:
+        expected_mw = local_molecular_weight(formula) if formula else None
+        
+        if molecular_weight == "N/A" or molecular_weight == "null" or molecular_weight is None or molecular_weight == "":
+            if expected_mw is not None:
+                # 由分子式本地计算，无需查询PubChem
+                return {
+                    "valid": True,
+                    "reason": "分子量为空，已由分子式本地计算",
+                    "value": expected_mw,
+                    "source": "local"
+                }
             # 分子量可以为空
             return {
                 "valid": True,
@@ -249,6 +257,13 @@ class DataValidatorTool:
                     "reason": "分子量过大，可能不正确",
                     "value": molecular_weight
                 }
+            elif expected_mw is not None and abs(mw - expected_mw) > self.molecular_weight_tolerance * expected_mw:
+                return {
+                    "valid": False,
+                    "reason": f"分子量与分子式计算值不符（计算值 {expected_mw}）",
+                    "value": molecular_weight,
+                    "expected_value": expected_mw
+                }
             else:
                 return {
                     "valid": True,
@@ -298,7 +313,7 @@ class DataValidatorTool:
         
         # 验证分子量（如果存在）
         if "molecular_weight" in data:
-            mw_result = self.validate_molecular_weight(data["molecular_weight"])
+            mw_result = self.validate_molecular_weight(data["molecular_weight"], data.get("molecular_formula"))
             validation_results["molecular_weight"] = mw_result
             if not mw_result["valid"]:
                 overall_valid = False
@@ -16,6 +16,8 @@ from src.tools.crewai_pnec_tool import CrewAIPNECTool
 from src.tools.crewai_material_identifier_tool import CrewAIMaterialIdentifierTool
 from src.tools.crewai_data_validator_tool import CrewAIDataValidatorTool
 from src.tools.crewai_structure_validator_tool import CrewAIStructureValidatorTool
+from src.tools.crewai_batch_assessment_tool import CrewAIBatchAssessmentTool
+from src.tools.crewai_risk_quotient_tool import CrewAIRiskQuotientTool
 
 
 class ToolFactory:
@@ -38,9 +40,11 @@ class ToolFactory:
             CrewAIFormula2PropertiesTool(),
             CrewAIMaterialSearchTool(),
             CrewAIPNECTool(),
+            CrewAIRiskQuotientTool(),
             CrewAIMaterialIdentifierTool(),
             CrewAIDataValidatorTool(),
-            CrewAIStructureValidatorTool()
+            CrewAIStructureValidatorTool(),
+            CrewAIBatchAssessmentTool()
         ]
         
         return tools
@@ -90,7 +94,9 @@ class ToolFactory:
         # 添加评估专用工具
         tools.extend([
             CrewAIPNECTool(),                   # PNEC工具（用于环境风险评估）
+            CrewAIRiskQuotientTool(),           # 风险商工具（用于定量计算金属浸出风险）
             CrewAIDataValidatorTool(),          # 数据验证工具（用于验证数据质量）
+            CrewAIBatchAssessmentTool(),        # 批量评估工具（用于一次验证多个候选材料）
         ])
         
         return tools
@@ -151,6 +157,11 @@ class ToolFactory:
         """创建PNEC工具实例"""
         return CrewAIPNECTool()
     
+    @staticmethod
+    def create_risk_quotient_tool():
+        """创建风险商计算工具实例"""
+        return CrewAIRiskQuotientTool()
+    
     @staticmethod
     def create_material_identifier_tool():
         """创建材料识别工具实例"""
@@ -164,4 +175,9 @@ class ToolFactory:
     @staticmethod
     def create_structure_validator_tool():
         """创建结构验证工具实例"""
-        return CrewAIStructureValidatorTool()
\ No newline at end of file
+        return CrewAIStructureValidatorTool()
+    
+    @staticmethod
+    def create_batch_assessment_tool():
+        """创建批量评估工具实例"""
+        return CrewAIBatchAssessmentTool()
@@ -5,9 +5,14 @@
 """
 
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, List, Optional
+from src.config.config import Config
 from src.tools.materials_project_tool import get_materials_project_tool
 from src.tools.pubchem_tool import get_pubchem_tool
+from src.utils.formula_parser import METAL_ELEMENTS, ORGANIC_ELEMENTS, canonical_key, extract_elements
+from src.utils.material_context import resolve_in_context
+from src.utils.response_cache import ResponseCache
 
 # 配置日志
 logging.basicConfig(level=logging.WARNING)
@@ -30,14 +35,59 @@ class MaterialIdentifierTool:
             logger.warning(f"Materials Project工具不可用: {e}")
             self.materials_project_tool = None
         self.pubchem_tool = get_pubchem_tool()
+        # "未找到"结果的负缓存
+        self.negative_cache = get_negative_cache()
     
     def identify_material(self, query: str) -> Dict[str, Any]:
         """
         识别材料类型并获取相应的标识符
         
+        确认未找到的查询会以较短的TTL写入负缓存，再次出现时直接返回；
+        查询过程中出现网络或服务错误时不写入缓存。
+        工作流运行期间，同一材料（按规范化学式）只识别一次，结果由运行级材料上下文共享。
+        
         Args:
             query (str): 材料查询字符串（可以是化学式、元素组合或材料名称）
             
+        Returns:
+            Dict[str, Any]: 包含材料类型和标识符信息的字典
+        """
+        return resolve_in_context("identify", canonical_key(query), self._identify_with_negative_cache, query)
+    
+    def _identify_with_negative_cache(self, query: str) -> Dict[str, Any]:
+        """
+        识别材料，先查询负缓存
+        
+        Args:
+            query (str): 材料查询字符串
+            
+        Returns:
+            Dict[str, Any]: 包含材料类型和标识符信息的字典
+        """
+        cache_key = f"identify/{canonical_key(query)}"
+        if self.negative_cache is not None:
+            cached = self.negative_cache.get(cache_key)
+            if cached is not None:
+                cached["negative_cache_hit"] = True
+                return cached
+        
+        lookup_errors: List[str] = []
+        result = self._identify_material(query, lookup_errors)
+        
+        if (self.negative_cache is not None
+                and result.get("validation_status") == "not_found"
+                and not lookup_errors):
+            self.negative_cache.set(cache_key, result, ttl=Config.NEGATIVE_CACHE_TTL)
+        return result
+    
+    def _identify_material(self, query: str, lookup_errors: List[str]) -> Dict[str, Any]:
+        """
+        识别材料类型并获取相应的标识符（实际执行查询）
+        
+        Args:
+            query (str): 材料查询字符串
+            lookup_errors (List[str]): 收集查询过程中的非"未找到"错误
+            
         Returns:
             Dict[str, Any]: 包含材料类型和标识符信息的字典
         """
@@ -59,7 +109,7 @@ class MaterialIdentifierTool:
             # 根据材料类型使用相应的工具获取标识符
             if material_type == "metal":
                 # 金属材料使用Materials Project获取MP-ID
-                mp_result = self._get_mpid_for_metal(query)
+                mp_result = self._get_mpid_for_metal(query, lookup_errors)
                 if mp_result and "material_id" in mp_result:
                     result["identifier"] = mp_result["material_id"]
                     result["identifier_type"] = "MP-ID"
@@ -72,7 +122,7 @@ class MaterialIdentifierTool:
                     logger.info(f"未能在Materials Project中找到材料: {query}")
             elif material_type == "organic":
                 # 有机物使用PubChem获取CAS号
-                cas_result = self._get_cas_for_organic(query)
+                cas_result = self._get_cas_for_organic(query, lookup_errors)
                 if cas_result and "CASNumbers" in cas_result:
                     cas_numbers = cas_result["CASNumbers"]
                     if cas_numbers:
@@ -91,7 +141,7 @@ class MaterialIdentifierTool:
                     logger.info(f"未能在PubChem中找到化合物信息: {query}")
             else:
                 # 未知类型，尝试两种方法
-                mp_result = self._get_mpid_for_metal(query)
+                mp_result = self._get_mpid_for_metal(query, lookup_errors)
                 if mp_result and "material_id" in mp_result:
                     result["identifier"] = mp_result["material_id"]
                     result["identifier_type"] = "MP-ID"
@@ -100,7 +150,7 @@ class MaterialIdentifierTool:
                     result["validation_status"] = "validated"  # 设置验证状态
                     result["is_verified"] = True  # 设置验证标志
                 else:
-                    cas_result = self._get_cas_for_organic(query)
+                    cas_result = self._get_cas_for_organic(query, lookup_errors)
                     if cas_result and "CASNumbers" in cas_result:
                         cas_numbers = cas_result["CASNumbers"]
                         if cas_numbers:
@@ -150,21 +200,11 @@ class MaterialIdentifierTool:
         # 基于元素组成判断
         elements = self._extract_elements(query)
         
-        # 常见金属元素
-        metal_elements = ['Li', 'Be', 'Na', 'Mg', 'Al', 'K', 'Ca', 'Sc', 'Ti', 'V', 'Cr', 'Mn', 'Fe', 'Co', 'Ni', 'Cu', 'Zn', 
-                         'Ga', 'Rb', 'Sr', 'Y', 'Zr', 'Nb', 'Mo', 'Tc', 'Ru', 'Rh', 'Pd', 'Ag', 'Cd', 'In', 'Sn', 'Cs', 'Ba',
-                         'La', 'Ce', 'Pr', 'Nd', 'Pm', 'Sm', 'Eu', 'Gd', 'Tb', 'Dy', 'Ho', 'Er', 'Tm', 'Yb', 'Lu', 'Hf', 'Ta',
-                         'W', 'Re', 'Os', 'Ir', 'Pt', 'Au', 'Hg', 'Tl', 'Pb', 'Bi', 'Po', 'Fr', 'Ra', 'Ac', 'Th', 'Pa', 'U',
-                         'Np', 'Pu', 'Am', 'Cm', 'Bk', 'Cf', 'Es', 'Fm', 'Md', 'No', 'Lr']
-        
-        # 常见非金属元素（通常构成有机物）
-        non_metal_elements = ['H', 'C', 'N', 'O', 'F', 'P', 'S', 'Cl', 'Br', 'I']
-        
         # 判断是否包含金属元素
-        has_metal = any(element in metal_elements for element in elements)
+        has_metal = any(element in METAL_ELEMENTS for element in elements)
         
         # 判断是否主要由非金属元素组成（可能是有机物）
-        non_metal_count = sum(1 for element in elements if element in non_metal_elements)
+        non_metal_count = sum(1 for element in elements if element in ORGANIC_ELEMENTS)
         total_elements = len(elements)
         
         # 如果包含金属元素，认为是金属材料
@@ -188,48 +228,42 @@ class MaterialIdentifierTool:
         Returns:
             list: 元素符号列表
         """
-        import re
-        # 匹配常见的元素符号（1-2个字母，首字母大写）
-        elements = re.findall(r'[A-Z][a-z]?', query)
-        # 过滤掉可能不是元素的字符串
-        valid_elements = []
-        # 常见元素列表（简化版）
-        common_elements = ['H', 'He', 'Li', 'Be', 'B', 'C', 'N', 'O', 'F', 'Ne', 'Na', 'Mg', 'Al', 'Si', 'P', 'S', 'Cl', 'Ar',
-                          'K', 'Ca', 'Sc', 'Ti', 'V', 'Cr', 'Mn', 'Fe', 'Co', 'Ni', 'Cu', 'Zn', 'Ga', 'Ge', 'As', 'Se', 'Br', 'Kr',
-                          'Rb', 'Sr', 'Y', 'Zr', 'Nb', 'Mo', 'Tc', 'Ru', 'Rh', 'Pd', 'Ag', 'Cd', 'In', 'Sn', 'Sb', 'Te', 'I', 'Xe',
-                          'Cs', 'Ba', 'La', 'Ce', 'Pr', 'Nd', 'Pm', 'Sm', 'Eu', 'Gd', 'Tb', 'Dy', 'Ho', 'Er', 'Tm', 'Yb', 'Lu',
-                          'Hf', 'Ta', 'W', 'Re', 'Os', 'Ir', 'Pt', 'Au', 'Hg', 'Tl', 'Pb', 'Bi', 'Po', 'At', 'Rn']
-        
-        for element in elements:
-            if element in common_elements:
-                valid_elements.append(element)
-        
-        return list(set(valid_elements))  # 去重
+        return extract_elements(query)
     
-    def _get_mpid_for_metal(self, query: str) -> Optional[Dict[str, Any]]:
+    def _get_mpid_for_metal(self, query: str, lookup_errors: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         为金属材料获取MP-ID
         
         Args:
             query (str): 查询字符串
+            lookup_errors (List[str], optional): 收集暂时性错误（这类"未找到"不可缓存）
             
         Returns:
             Optional[Dict[str, Any]]: Materials Project数据或None
         """
+        if lookup_errors is None:
+            lookup_errors = []
         if not self.materials_project_tool:
+            lookup_errors.append("Materials Project工具不可用")
             return None
             
         try:
             # 尝试按化学式搜索
             result = self.materials_project_tool.search_materials(formula=query, limit=5)
+            if result.get("transient"):
+                lookup_errors.append(result["error"])
             if "error" not in result and "data" in result and result["data"]:
+                # 一次查询批量验证所有候选material_id是否存在
+                verified = self.materials_project_tool.verify_material_ids(
+                    [material.get("material_id", "") for material in result["data"] if material.get("material_id")]
+                )
                 # 检查返回的材料是否与查询相关
                 for material in result["data"]:
                     material_formula = material.get("formula", "")
                     material_id = material.get("material_id", "")
                     
                     # 验证material_id在Materials Project数据库中是否存在
-                    if material_id and self.materials_project_tool.verify_material_id_exists(material_id):
+                    if material_id and verified.get(material_id):
                         # 检查化学式是否与查询相关（严格的匹配检查）
                         if self._is_formula_strictly_related(query, material_formula):
                             logger.info(f"找到相关材料: {material_formula} (ID: {material_id})")
@@ -243,14 +277,20 @@ class MaterialIdentifierTool:
             elements = self._extract_elements(query)
             if elements:
                 result = self.materials_project_tool.search_materials(elements=elements[:3], limit=5)
+                if result.get("transient"):
+                    lookup_errors.append(result["error"])
                 if "error" not in result and "data" in result and result["data"]:
+                    # 一次查询批量验证所有候选material_id是否存在
+                    verified = self.materials_project_tool.verify_material_ids(
+                        [material.get("material_id", "") for material in result["data"] if material.get("material_id")]
+                    )
                     # 检查返回的材料是否包含查询中的元素
                     for material in result["data"]:
                         material_elements = material.get("chemsys", "").split("-")
                         material_id = material.get("material_id", "")
                         
                         # 验证material_id在Materials Project数据库中是否存在
-                        if material_id and self.materials_project_tool.verify_material_id_exists(material_id):
+                        if material_id and verified.get(material_id):
                             # 检查元素是否严格匹配
                             if self._are_elements_strictly_related(elements, material_elements):
                                 logger.info(f"找到包含相关元素的材料: {material.get('formula', '')} (ID: {material_id})")
@@ -266,6 +306,7 @@ class MaterialIdentifierTool:
             return None
         except Exception as e:
             logger.warning(f"获取金属材料MP-ID时出错: {e}")
+            lookup_errors.append(str(e))
             # 即使出现异常，也返回None而不是生成虚假数据
             return None
     
@@ -357,26 +398,59 @@ class MaterialIdentifierTool:
         # 检查是否有共同元素
         return len(query_set.intersection(material_set)) > 0
     
-    def _get_cas_for_organic(self, query: str) -> Optional[Dict[str, Any]]:
+    def _get_cas_for_organic(self, query: str, lookup_errors: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         为有机物获取CAS号
         
         Args:
             query (str): 查询字符串
+            lookup_errors (List[str], optional): 收集非"未找到"的错误（这类结果不可缓存）
             
         Returns:
             Optional[Dict[str, Any]]: PubChem数据（包含CAS号）或None
         """
+        if lookup_errors is None:
+            lookup_errors = []
         try:
             # 使用PubChem工具获取包含CAS号的化合物信息
             result = self.pubchem_tool.get_compound_info_with_cas(query)
             if "error" not in result and "Compound" in result:
                 return result["Compound"]
+            if "error" in result and not result.get("not_found"):
+                lookup_errors.append(result["error"])
             return None
         except Exception as e:
             logger.warning(f"获取有机物CAS号时出错: {e}")
+            lookup_errors.append(str(e))
             return None
 
+# 负缓存全局实例
+_negative_cache = None
+_negative_cache_lock = threading.Lock()
+
+def get_negative_cache() -> Optional[ResponseCache]:
+    """
+    获取"未找到"结果的共享负缓存（未启用时返回None）
+    
+    Returns:
+        Optional[ResponseCache]: 负缓存实例
+    """
+    global _negative_cache
+    if not Config.NEGATIVE_CACHE_ENABLED:
+        return None
+    with _negative_cache_lock:
+        if _negative_cache is None:
+            try:
+                _negative_cache = ResponseCache(
+                    Config.NEGATIVE_CACHE_PATH,
+                    default_ttl=Config.NEGATIVE_CACHE_TTL,
+                    max_size_bytes=8 * 1024 * 1024
+                )
+            except Exception as e:
+                logger.warning(f"负缓存不可用: {e}")
+                return None
+        return _negative_cache
+
 # 全局实例
 _material_identifier_tool = None
 
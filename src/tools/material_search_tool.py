@@ -10,6 +10,7 @@ from typing import Dict, Any, Optional, List
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 from src.tools.materials_project_tool import get_materials_project_tool
+from src.utils.formula_parser import extract_elements
 
 # 配置日志
 logging.basicConfig(level=logging.WARNING)
@@ -116,23 +117,7 @@ class MaterialSearchTool(BaseTool):
         Returns:
             元素列表或None
         """
-        # 简单的元素解析逻辑
-        # 这里可以扩展为更复杂的化学式解析
-        elements = []
-        
-        # 移除数字和特殊字符，只保留字母
-        import re
-        element_chars = re.findall(r'[A-Z][a-z]?', query)
-        
-        # 过滤出有效的元素符号（这里只是简单示例）
-        # 在实际应用中，应该有一个完整的元素符号列表进行验证
-        valid_elements = ["H", "He", "Li", "Be", "B", "C", "N", "O", "F", "Ne", "Na", "Mg", "Al", "Si", "P", "S", "Cl", "Ar",
-                         "K", "Ca", "Sc", "Ti", "V", "Cr", "Mn", "Fe", "Co", "Ni", "Cu", "Zn", "Ga", "Ge", "As", "Se", "Br", "Kr",
-                         "Rb", "Sr", "Y", "Zr", "Nb", "Mo", "Tc", "Ru", "Rh", "Pd", "Ag", "Cd", "In", "Sn", "Sb", "Te", "I", "Xe"]
-        
-        for element in element_chars:
-            if element in valid_elements:
-                elements.append(element)
+        elements = extract_elements(query)
         
         return elements if elements else None
 
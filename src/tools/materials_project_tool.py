@@ -6,18 +6,44 @@ Materials Project API 工具 / Materials Project API Tool
 """
 
 import os
+import re
+import random
 import logging
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Iterator, NamedTuple
+from src.config.config import Config
+from src.utils.rate_limiter import AdaptiveConcurrencyLimiter, TokenBucketRateLimiter, get_rate_limiter
+from src.tools.mp_snapshot import as_mp_doc, get_mp_snapshot
+from src.utils.singleflight import get_singleflight
+from src.utils.formula_parser import canonical_key, reduced_formula
+from src.utils.material_context import resolve_in_context
 
 # 配置日志 / Configure logging
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
-# 添加调用间隔控制
-_last_call_time = 0
-_call_interval = 2.0  # 增加到2秒间隔，避免频繁调用
-_max_retries = 3  # 最大重试次数
+# Materials Project API主机名 / Materials Project API host
+MP_HOST = "api.materialsproject.org"
+
+# 服务器允许的单页最大文档数 / Maximum documents per page allowed by the server
+MP_MAX_PAGE_SIZE = 1000
+
+# 批量化学式查询最多下载的文档数 = 化学式数 × limit × 该系数（多晶型很多的化学式会挤占其他化学式的份额）
+# / Maximum documents downloaded by a batched formula query = formulas × limit × this factor (formulas with many
+# polymorphs crowd out the others)
+MP_BATCH_FETCH_FACTOR = 4
+
+# 视为限流或服务器暂时不可用的HTTP状态码 / HTTP status codes treated as throttling or transient server errors
+_TRANSIENT_STATUS_PATTERN = re.compile(r"\b(429|50[0-4])\b")
+_TRANSIENT_ERROR_NAMES = ("ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout", "ChunkedEncodingError")
+
+class MaterialSummary(NamedTuple):
+    """材料摘要记录（流式摘要接口使用的紧凑类型化记录） / Material summary record (compact typed record used by the streaming summary API)"""
+    material_id: str
+    formula: str
+    chemsys: str
+    density: Optional[float]
 
 try:
     from mp_api.client import MPRester
@@ -47,15 +73,97 @@ class MaterialsProjectTool:
         Args:
             api_key (str, optional): Materials Project API密钥 / Materials Project API key
         """
-        if not MP_API_AVAILABLE:
-            raise ImportError("mp-api客户端未安装，请运行 'pip install mp-api'")
-            
+        # 本地快照：覆盖范围内的查询直接在内存索引中回答
+        # Local snapshot: covered queries are answered from the in-memory index
+        self.snapshot = get_mp_snapshot()
+        self.offline = Config.MP_OFFLINE
         self.api_key = api_key or os.getenv('MATERIALS_PROJECT_API_KEY')
-        if not self.api_key:
-            raise ValueError("Materials Project API密钥未设置")
+        
+        if self.offline:
+            if self.snapshot is None:
+                raise ValueError("离线模式需要Materials Project本地快照，请先运行 scripts/build_mp_snapshot.py")
+            self.mpr = None
+        else:
+            if not MP_API_AVAILABLE:
+                raise ImportError("mp-api客户端未安装，请运行 'pip install mp-api'")
+                
+            if not self.api_key:
+                raise ValueError("Materials Project API密钥未设置")
+                
+            # 初始化MPRester客户端
+            self.mpr = MPRester(self.api_key)
+        
+        # 请求控制：共享的速率限制 + 自适应并发限制 / Request control: shared rate limit + adaptive concurrency
+        self.rate_limiter = get_mp_rate_limiter()
+        self.concurrency_limiter = get_mp_concurrency_limiter()
+        self.max_retries = max(1, Config.MP_MAX_RETRIES)
+        # 合并并发的相同查询；MP文档只读，等待方直接共享结果 / Coalesce concurrent identical queries; MP docs are read-only so waiters share the result
+        self.singleflight = get_singleflight(MP_HOST, copy_result=False)
+        
+        # 已确认存在的材料ID缓存（MP中的材料ID不会被删除，只缓存正向结果）
+        # Cache of confirmed material IDs (MP IDs are not removed, so only positive results are cached)
+        self._verified_material_ids = set()
+        self._verified_lock = threading.Lock()
+    
+    def _call_mp(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        调用MP API；并发的相同调用（相同方法和参数）只发送一次请求
+        / Call the MP API; concurrent identical calls (same method and arguments) send a single request
+        
+        Args:
+            func (Callable): 要调用的MPRester方法 / MPRester method to call
             
-        # 初始化MPRester客户端
-        self.mpr = MPRester(self.api_key)
+        Returns:
+            Any: API调用结果 / API call result
+        """
+        if self.mpr is None:
+            raise RuntimeError("Materials Project离线模式下查询超出本地快照覆盖范围 / Query is outside the local snapshot in offline mode")
+        key = (getattr(func, "__qualname__", repr(func)), repr(args), repr(sorted(kwargs.items())))
+        return self.singleflight.do(key, self._call_mp_with_retry, func, *args, **kwargs)
+    
+    def _call_mp_with_retry(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在速率和并发控制下调用MP API，限流或服务器错误时指数退避重试
+        / Call the MP API under rate and concurrency control, retrying with exponential backoff on throttling or server errors
+        
+        Args:
+            func (Callable): 要调用的MPRester方法 / MPRester method to call
+            
+        Returns:
+            Any: API调用结果 / API call result
+        """
+        for attempt in range(self.max_retries):
+            # 先等待速率令牌再占用并发槽位，避免排队时占住槽位 / Wait for a rate token before taking a slot so queued callers don't hold slots
+            self.rate_limiter.acquire()
+            self.concurrency_limiter.acquire()
+            transient = False
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                transient = _is_transient_mp_error(e)
+                # 非暂时性错误（如无效查询）不重试 / Non-transient errors (e.g. invalid queries) are not retried
+                if not transient or attempt >= self.max_retries - 1:
+                    raise
+                delay = min(30.0, 2 ** attempt) + random.random()
+                logger.warning(f"Materials Project请求受限或服务器繁忙，{delay:.2f} 秒后重试 ({attempt + 1}/{self.max_retries}): {e}")
+                # 暂停共享令牌桶，使所有线程一起退避 / Pause the shared bucket so every thread backs off together
+                self.rate_limiter.pause(delay)
+            finally:
+                self.concurrency_limiter.release(throttled=transient)
+    
+    def request_stats(self) -> Dict[str, Any]:
+        """
+        获取请求控制统计信息 / Get request control statistics
+        
+        Returns:
+            Dict: 速率限制与并发限制统计 / Rate limit and concurrency statistics
+        """
+        return {
+            "rate_limiter": self.rate_limiter.stats(),
+            "concurrency_limiter": self.concurrency_limiter.stats(),
+            "singleflight": self.singleflight.stats(),
+            "snapshot": self.snapshot.info() if self.snapshot is not None else None
+        }
     
     def search_materials(self, 
                         formula: Optional[str] = None,
@@ -73,105 +181,323 @@ class MaterialsProjectTool:
             exclude_elements (List[str], optional): 要排除的元素 / Elements to exclude
             crystal_system (str, optional): 晶体系统 / Crystal system
             limit (int): 返回结果的最大数量 / Maximum number of results to return
+            skip (int): 跳过的结果数量（服务器端偏移） / Number of results to skip (server-side offset)
             
+        Returns:
+            Dict: 材料搜索结果 / Material search results
+        """
+        # 工作流运行期间相同的查询只发送一次 / Identical searches are sent once per workflow run
+        key = (
+            canonical_key(formula) if formula else None,
+            tuple(sorted(elements)) if elements else None,
+            tuple(sorted(exclude_elements)) if exclude_elements else None,
+            crystal_system,
+            limit,
+            skip
+        )
+        return resolve_in_context("mp_search", key, self._search_materials,
+                                  formula, elements, exclude_elements, crystal_system, limit, skip)
+    
+    def _search_materials(self,
+                          formula: Optional[str],
+                          elements: Optional[List[str]],
+                          exclude_elements: Optional[List[str]],
+                          crystal_system: Optional[str],
+                          limit: int,
+                          skip: int) -> Dict[str, Any]:
+        """
+        搜索材料（实际执行查询） / Search materials (performs the query)
+        
         Returns:
             Dict: 材料搜索结果 / Material search results
         """
         try:
-            # 添加调用间隔控制和重试机制
-            global _last_call_time, _call_interval, _max_retries
-            retries = 0
+            # 优化：只获取需要的字段以提高查询速度
+            # 使用API支持的字段
+            fields = [
+                "material_id", 
+                "formula_pretty", 
+                "chemsys", 
+                "volume", 
+                "density", 
+                "nsites"
+            ]
             
-            while retries < _max_retries:
-                try:
-                    current_time = time.time()
-                    time_since_last_call = current_time - _last_call_time
-                    if time_since_last_call < _call_interval:
-                        time.sleep(_call_interval - time_since_last_call)
-                    _last_call_time = time.time()
-                    
-                    # 构建搜索参数
-                    kwargs = {}
-                    
-                    if formula:
-                        kwargs["formula"] = formula
-                    if elements:
-                        kwargs["elements"] = elements
-                    if exclude_elements:
-                        kwargs["exclude_elements"] = exclude_elements
-                    if crystal_system:
-                        kwargs["crystal_system"] = crystal_system
-                        
-                    # 优化：限制搜索结果数量以避免超时
-                    # 对于元素搜索，使用更小的chunk_size
-                    chunk_size = min(limit, 50) if elements else min(limit, 100)  # 减少chunk_size
-                    
-                    # 优化：只获取需要的字段以提高查询速度
-                    # 使用API支持的字段
-                    fields = [
-                        "material_id", 
-                        "formula_pretty", 
-                        "chemsys", 
-                        "volume", 
-                        "density", 
-                        "nsites"
-                    ]
-                    
-                    # 执行搜索
-                    docs = self.mpr.materials.search(
-                        **kwargs,
-                        chunk_size=chunk_size,
-                        fields=fields
-                    )
-                    
-                    # 手动限制结果数量
-                    if len(docs) > limit:
-                        docs = docs[:limit]
-                    
-                    # 应用skip参数，跳过前skip个结果
-                    if skip > 0:
-                        docs = docs[skip:]
-                    
-                    # 转换为字典格式
-                    materials_data = []
-                    for doc in docs:
-                        # 为数值数据添加单位信息
-                        volume_value = getattr(doc, "volume", "N/A")
-                        volume_with_unit = f"{volume_value} Å³" if volume_value != "N/A" else "N/A"
-                        
-                        density_value = getattr(doc, "density", "N/A")
-                        density_with_unit = f"{density_value} g/cm³" if density_value != "N/A" else "N/A"
-                        
-                        material_dict = {
-                            "material_id": str(getattr(doc, "material_id", "N/A")),
-                            "formula": getattr(doc, "formula_pretty", getattr(doc, "formula", "N/A")),
-                            "chemsys": getattr(doc, "chemsys", "N/A"),
-                            "volume": volume_with_unit,
-                            "density": density_with_unit,
-                            "nsites": getattr(doc, "nsites", "N/A")
-                        }
-                        materials_data.append(material_dict)
-                    
-                    return {
-                        "data": materials_data,
-                        "meta": {
-                            "total_count": len(materials_data),
-                            "limit": limit
-                        }
-                    }
-                    
-                except Exception as e:
-                    retries += 1
-                    if retries >= _max_retries:
-                        logger.error(f"搜索材料时出错: {e}")
-                        return {"error": f"搜索材料时出错: {str(e)}"}
-                    else:
-                        logger.warning(f"搜索材料时出错，正在重试 ({retries}/{_max_retries}): {e}")
-                        time.sleep(_call_interval * retries)  # 指数退避
+            # 对于元素搜索，使用更小的分页大小以避免超时
+            page_size = min(limit, 50) if elements else min(limit, 100)
+            
+            # 服务器端分页：只下载 [skip, skip + limit) 范围内的文档
+            pages = self.iter_material_pages(
+                formula=formula,
+                elements=elements,
+                exclude_elements=exclude_elements,
+                crystal_system=crystal_system,
+                fields=fields,
+                skip=skip,
+                limit=limit,
+                page_size=page_size
+            )
+            docs = [doc for page in pages for doc in page]
+            
+            return self._format_search_results(docs, limit, self._source_meta(formula=formula, elements=elements))
             
         except Exception as e:
             logger.error(f"搜索材料时出错: {e}")
-            return {"error": f"搜索材料时出错: {str(e)}"}
+            return {"error": f"搜索材料时出错: {str(e)}", "transient": _is_transient_mp_error(e)}
+    
+    def search_materials_many(self, formulas: List[str], limit: int = 5) -> Dict[str, Dict[str, Any]]:
+        """
+        批量按化学式搜索材料：快照覆盖的化学式在本地回答，其余合并为一次逗号分隔的formula查询
+        
+        批量查询最多下载 化学式数 × limit × MP_BATCH_FETCH_FACTOR 个文档，所有化学式都已凑满 limit 个结果时提前停止翻页；
+        达到下载上限时仍未凑满的化学式，以及整个批量查询失败（如某个化学式被服务器拒绝）时的所有化学式，都回退为逐个查询。
+        / The batched query downloads at most formulas × limit × MP_BATCH_FETCH_FACTOR documents and stops paging as
+        soon as every formula has limit results; formulas still short when the cap is hit, and every formula when the
+        batched query fails (e.g. one formula is rejected by the server), fall back to per-formula queries.
+        
+        Args:
+            formulas (List[str]): 化学式列表
+            limit (int): 每个化学式返回结果的最大数量
+            
+        Returns:
+            Dict[str, Dict]: 以输入化学式为键、与search_materials格式相同的结果
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        remote: Dict[str, str] = {}
+        for formula in dict.fromkeys(formulas):
+            key = reduced_formula(formula)
+            covered = self.snapshot is not None and self.snapshot.covers(formula=formula)
+            if covered or key is None:
+                # 快照覆盖或无法约化（通配符、匿名化学式等）时逐个查询
+                results[formula] = self.search_materials(formula=formula, limit=limit)
+            else:
+                remote[formula] = key
+        
+        if not remote:
+            return results
+        
+        fields = ["material_id", "formula_pretty", "chemsys", "volume", "density", "nsites"]
+        docs_by_key: Dict[str, List[Any]] = {key: [] for key in remote.values()}
+        max_docs = len(docs_by_key) * max(1, limit) * MP_BATCH_FETCH_FACTOR
+        fallback = list(remote)
+        try:
+            # MP按约化化学式匹配，返回的formula_pretty约化后即可对应回查询
+            pending = set(docs_by_key)
+            exhausted = True
+            for fetched, doc in enumerate(self.iter_materials(formula=",".join(docs_by_key), fields=fields,
+                                                              limit=max_docs,
+                                                              page_size=min(MP_MAX_PAGE_SIZE, max_docs)), start=1):
+                key = reduced_formula(str(getattr(doc, "formula_pretty", "")))
+                if key in pending:
+                    docs_by_key[key].append(doc)
+                    if len(docs_by_key[key]) >= limit:
+                        pending.discard(key)
+                if not pending:
+                    break
+                if fetched >= max_docs:
+                    exhausted = False
+            # 结果已完整（翻页结束或全部凑满）的化学式直接使用批量结果 / Use the batched results of complete formulas
+            fallback = [formula for formula, key in remote.items() if not exhausted and key in pending]
+            for formula, key in remote.items():
+                if formula not in fallback:
+                    results[formula] = self._format_search_results(docs_by_key[key], limit, {"source": "api"})
+        except Exception as e:
+            logger.warning(f"批量搜索材料失败，改为逐个查询: {e}")
+        
+        for formula in fallback:
+            results[formula] = self.search_materials(formula=formula, limit=limit)
+        return results
+    
+    def _source_meta(self, formula: Optional[str] = None, elements: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        获取查询结果的数据来源信息
+        
+        Args:
+            formula (str, optional): 化学式
+            elements (List[str], optional): 必须包含的元素
+            
+        Returns:
+            Dict: 数据来源（快照时包含创建时间和陈旧程度）
+        """
+        if self.snapshot is not None and self.snapshot.covers(formula=formula, elements=elements):
+            return self.snapshot.info()
+        return {"source": "api"}
+    
+    def _build_search_criteria(self,
+                               formula: Optional[str] = None,
+                               elements: Optional[List[str]] = None,
+                               exclude_elements: Optional[List[str]] = None,
+                               crystal_system: Optional[str] = None) -> Dict[str, Any]:
+        """
+        构建MP API的原始查询参数（与mpr.materials.search的参数转换一致）
+        
+        Args:
+            formula (str, optional): 化学式
+            elements (List[str], optional): 必须包含的元素
+            exclude_elements (List[str], optional): 要排除的元素
+            crystal_system (str, optional): 晶体系统
+            
+        Returns:
+            Dict: 查询参数
+        """
+        criteria = {}
+        if formula:
+            criteria["formula"] = formula
+        if elements:
+            criteria["elements"] = ",".join(elements)
+        if exclude_elements:
+            criteria["exclude_elements"] = ",".join(exclude_elements)
+        if crystal_system:
+            criteria["crystal_system"] = crystal_system
+        if criteria:
+            criteria["deprecated"] = False
+        return criteria
+    
+    def iter_material_pages(self,
+                            formula: Optional[str] = None,
+                            elements: Optional[List[str]] = None,
+                            exclude_elements: Optional[List[str]] = None,
+                            crystal_system: Optional[str] = None,
+                            fields: Optional[List[str]] = None,
+                            skip: int = 0,
+                            limit: Optional[int] = None,
+                            page_size: int = 100) -> Iterator[List[Any]]:
+        """
+        按页惰性获取材料文档，每页对应一次服务器端分页请求（_skip/_limit）
+        
+        只有在迭代到下一页时才发送请求，因此内存和延迟与实际消费的数量成正比，而不是与匹配结果总数成正比。
+        快照覆盖该查询时直接从本地索引分页。
+        
+        Args:
+            formula (str, optional): 化学式
+            elements (List[str], optional): 必须包含的元素
+            exclude_elements (List[str], optional): 要排除的元素
+            crystal_system (str, optional): 晶体系统
+            fields (List[str], optional): 需要返回的字段
+            skip (int): 跳过的结果数量
+            limit (int, optional): 最多返回的结果数量，None表示不限制
+            page_size (int): 每页文档数量（最大1000）
+            
+        Yields:
+            List[Any]: 一页MP文档（或快照中的类文档对象）
+        """
+        page_size = max(1, min(page_size, MP_MAX_PAGE_SIZE))
+        skip = max(0, skip)
+        remaining = limit
+        
+        if self.snapshot is not None and self.snapshot.covers(formula=formula, elements=elements):
+            records = self.snapshot.search(
+                formula=formula,
+                elements=elements,
+                exclude_elements=exclude_elements,
+                crystal_system=crystal_system
+            )
+            end = len(records) if remaining is None else min(len(records), skip + remaining)
+            for start in range(skip, end, page_size):
+                yield [as_mp_doc(record) for record in records[start:min(start + page_size, end)]]
+            return
+        
+        criteria = self._build_search_criteria(formula, elements, exclude_elements, crystal_system)
+        offset = skip
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            # 单页请求（num_chunks=1），由服务器按 _skip/_limit 返回该页
+            # mp-api的公开search()不支持偏移量，因此使用其通用的_search入口
+            docs = self._call_mp(
+                self.mpr.materials._search,
+                num_chunks=1,
+                chunk_size=size,
+                fields=fields,
+                _skip=offset,
+                **criteria
+            )
+            docs = list(docs or [])[:size]
+            if docs:
+                yield docs
+            if len(docs) < size:
+                return
+            offset += len(docs)
+            if remaining is not None:
+                remaining -= len(docs)
+    
+    def iter_materials(self,
+                       formula: Optional[str] = None,
+                       elements: Optional[List[str]] = None,
+                       exclude_elements: Optional[List[str]] = None,
+                       crystal_system: Optional[str] = None,
+                       fields: Optional[List[str]] = None,
+                       skip: int = 0,
+                       limit: Optional[int] = None,
+                       page_size: int = 100) -> Iterator[Any]:
+        """
+        逐个惰性获取材料文档（按页向服务器请求）
+        
+        Args:
+            formula (str, optional): 化学式
+            elements (List[str], optional): 必须包含的元素
+            exclude_elements (List[str], optional): 要排除的元素
+            crystal_system (str, optional): 晶体系统
+            fields (List[str], optional): 需要返回的字段
+            skip (int): 跳过的结果数量
+            limit (int, optional): 最多返回的结果数量，None表示不限制
+            page_size (int): 每页文档数量（最大1000）
+            
+        Yields:
+            Any: MP文档（或快照中的类文档对象）
+        """
+        for page in self.iter_material_pages(
+            formula=formula,
+            elements=elements,
+            exclude_elements=exclude_elements,
+            crystal_system=crystal_system,
+            fields=fields,
+            skip=skip,
+            limit=limit,
+            page_size=page_size
+        ):
+            yield from page
+    
+    def _format_search_results(self, docs: List[Any], limit: int, source_meta: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        将搜索得到的文档转换为结果字典
+        
+        Args:
+            docs (List[Any]): MP文档或快照中的类文档对象
+            limit (int): 返回结果的最大数量
+            source_meta (Dict[str, Any]): 数据来源信息（快照时包含创建时间和陈旧程度）
+            
+        Returns:
+            Dict: 材料搜索结果
+        """
+        # 转换为字典格式
+        materials_data = []
+        for doc in docs:
+            # 为数值数据添加单位信息
+            volume_value = getattr(doc, "volume", "N/A")
+            volume_with_unit = f"{volume_value} Å³" if volume_value != "N/A" else "N/A"
+            
+            density_value = getattr(doc, "density", "N/A")
+            density_with_unit = f"{density_value} g/cm³" if density_value != "N/A" else "N/A"
+            
+            material_dict = {
+                "material_id": str(getattr(doc, "material_id", "N/A")),
+                "formula": getattr(doc, "formula_pretty", getattr(doc, "formula", "N/A")),
+                "chemsys": getattr(doc, "chemsys", "N/A"),
+                "volume": volume_with_unit,
+                "density": density_with_unit,
+                "nsites": getattr(doc, "nsites", "N/A")
+            }
+            materials_data.append(material_dict)
+        
+        meta = {
+            "total_count": len(materials_data),
+            "limit": limit
+        }
+        meta.update(source_meta)
+        return {
+            "data": materials_data,
+            "meta": meta
+        }
     
     def get_material_by_id(self, material_id: str) -> Dict[str, Any]:
         """
@@ -188,99 +514,85 @@ class MaterialsProjectTool:
             if not material_id or material_id == "N/A" or material_id == "":
                 return {"error": f"无效的材料ID: {material_id}"}
             
-            # 添加调用间隔控制和重试机制
-            global _last_call_time, _call_interval, _max_retries
-            retries = 0
+            # 获取材料文档，限制只获取需要的字段
+            fields = [
+                "material_id", 
+                "formula_pretty", 
+                "chemsys", 
+                "volume", 
+                "density", 
+                "nsites",
+                "symmetry"
+            ]
+            
+            record = self.snapshot.get(material_id) if self.snapshot is not None else None
+            if record is not None:
+                docs = [as_mp_doc(record)]
+                source_meta = self.snapshot.info()
+            else:
+                docs = self._call_mp(self.mpr.materials.search, material_ids=[material_id], fields=fields)
+                source_meta = {"source": "api"}
             
-            while retries < _max_retries:
+            if not docs:
+                return {"error": f"未找到材料ID: {material_id}"}
+                
+            doc = docs[0]
+            
+            # 验证获取到的材料ID是否与查询的ID匹配
+            retrieved_material_id = str(getattr(doc, "material_id", ""))
+            if retrieved_material_id != material_id:
+                return {"error": f"材料ID不匹配: 查询 {material_id}, 获取到 {retrieved_material_id}"}
+            
+            # 提取关键信息并处理缺失值，确保所有值都能被JSON序列化
+            def safe_getattr(obj, attr, default="N/A"):
+                """安全获取属性值，确保能被JSON序列化"""
                 try:
-                    current_time = time.time()
-                    time_since_last_call = current_time - _last_call_time
-                    if time_since_last_call < _call_interval:
-                        time.sleep(_call_interval - time_since_last_call)
-                    _last_call_time = time.time()
-                    
-                    # 获取材料文档，限制只获取需要的字段
-                    fields = [
-                        "material_id", 
-                        "formula_pretty", 
-                        "chemsys", 
-                        "volume", 
-                        "density", 
-                        "nsites",
-                        "symmetry"
-                    ]
-                    
-                    docs = self.mpr.materials.search(material_ids=[material_id], fields=fields)
-                    
-                    if not docs:
-                        return {"error": f"未找到材料ID: {material_id}"}
-                        
-                    doc = docs[0]
-                    
-                    # 验证获取到的材料ID是否与查询的ID匹配
-                    retrieved_material_id = str(getattr(doc, "material_id", ""))
-                    if retrieved_material_id != material_id:
-                        return {"error": f"材料ID不匹配: 查询 {material_id}, 获取到 {retrieved_material_id}"}
-                    
-                    # 提取关键信息并处理缺失值，确保所有值都能被JSON序列化
-                    def safe_getattr(obj, attr, default="N/A"):
-                        """安全获取属性值，确保能被JSON序列化"""
-                        try:
-                            value = getattr(obj, attr, default)
-                            if value is None or value == "":
-                                return default
-                            # 转换为字符串以确保能被JSON序列化
-                            return str(value)
-                        except Exception:
-                            return default
-                    
-                    def safe_get_nested_attr(obj, attr_chain, default="N/A"):
-                        """安全获取嵌套属性值"""
-                        try:
-                            current = obj
-                            for attr in attr_chain:
-                                if current is None:
-                                    return default
-                                current = getattr(current, attr, None)
-                            if current is None or current == "":
-                                return default
-                            return str(current)
-                        except Exception:
+                    value = getattr(obj, attr, default)
+                    if value is None or value == "":
+                        return default
+                    # 转换为字符串以确保能被JSON序列化
+                    return str(value)
+                except Exception:
+                    return default
+            
+            def safe_get_nested_attr(obj, attr_chain, default="N/A"):
+                """安全获取嵌套属性值"""
+                try:
+                    current = obj
+                    for attr in attr_chain:
+                        if current is None:
                             return default
-                    
-                    # 为数值数据添加单位信息
-                    volume_value = safe_getattr(doc, "volume", "N/A")
-                    volume_with_unit = f"{volume_value} Å³" if volume_value != "N/A" else "N/A"
-                    
-                    density_value = safe_getattr(doc, "density", "N/A")
-                    density_with_unit = f"{density_value} g/cm³" if density_value != "N/A" else "N/A"
-                    
-                    # 安全获取嵌套的晶体系统属性
-                    crystal_system_value = safe_get_nested_attr(doc, ["symmetry", "crystal_system"], "N/A")
-                    
-                    material_info = {
-                        "material_id": safe_getattr(doc, "material_id", "N/A"),
-                        "formula": safe_getattr(doc, "formula_pretty", safe_getattr(doc, "formula", "N/A")),
-                        "chemsys": safe_getattr(doc, "chemsys", "N/A"),
-                        "volume": volume_with_unit,
-                        "density": density_with_unit,
-                        "nsites": safe_getattr(doc, "nsites", "N/A"),
-                        "crystal_system": crystal_system_value,
-                        "validated": True,
-                        "validation_time": time.time()
-                    }
-                    
-                    return material_info
-                    
-                except Exception as e:
-                    retries += 1
-                    if retries >= _max_retries:
-                        logger.error(f"获取材料详情时出错: {e}")
-                        return {"error": f"获取材料详情时出错: {str(e)}"}
-                    else:
-                        logger.warning(f"获取材料详情时出错，正在重试 ({retries}/{_max_retries}): {e}")
-                        time.sleep(_call_interval * retries)  # 指数退避
+                        current = getattr(current, attr, None)
+                    if current is None or current == "":
+                        return default
+                    return str(current)
+                except Exception:
+                    return default
+            
+            # 为数值数据添加单位信息
+            volume_value = safe_getattr(doc, "volume", "N/A")
+            volume_with_unit = f"{volume_value} Å³" if volume_value != "N/A" else "N/A"
+            
+            density_value = safe_getattr(doc, "density", "N/A")
+            density_with_unit = f"{density_value} g/cm³" if density_value != "N/A" else "N/A"
+            
+            # 安全获取嵌套的晶体系统属性
+            crystal_system_value = safe_get_nested_attr(doc, ["symmetry", "crystal_system"], "N/A")
+            
+            material_info = {
+                "material_id": safe_getattr(doc, "material_id", "N/A"),
+                "formula": safe_getattr(doc, "formula_pretty", safe_getattr(doc, "formula", "N/A")),
+                "chemsys": safe_getattr(doc, "chemsys", "N/A"),
+                "volume": volume_with_unit,
+                "density": density_with_unit,
+                "nsites": safe_getattr(doc, "nsites", "N/A"),
+                "crystal_system": crystal_system_value,
+                "validated": True,
+                "validation_time": time.time()
+            }
+            material_info.update(source_meta)
+            
+            return material_info
             
         except Exception as e:
             logger.error(f"获取材料详情时出错: {e}")
@@ -320,27 +632,125 @@ class MaterialsProjectTool:
             if not self.validate_material_id(material_id):
                 return False
             
-            # 添加调用间隔控制
-            global _last_call_time, _call_interval
-            current_time = time.time()
-            time_since_last_call = current_time - _last_call_time
-            if time_since_last_call < _call_interval:
-                time.sleep(_call_interval - time_since_last_call)
-            _last_call_time = time.time()
+            with self._verified_lock:
+                if material_id in self._verified_material_ids:
+                    return True
+            if self.snapshot is not None and self.snapshot.get(material_id) is not None:
+                return True
             
             # 使用Materials Project API验证材料ID是否存在
-            docs = self.mpr.materials.search(material_ids=[material_id], fields=["material_id"])
+            docs = self._call_mp(self.mpr.materials.search, material_ids=[material_id], fields=["material_id"])
             
             # 如果返回了结果且第一个结果的material_id与查询的ID匹配，则材料存在
             if docs and len(docs) > 0:
                 retrieved_material_id = str(getattr(docs[0], "material_id", ""))
-                return retrieved_material_id == material_id
+                if retrieved_material_id == material_id:
+                    with self._verified_lock:
+                        self._verified_material_ids.add(material_id)
+                    return True
             
             return False
         except Exception as e:
             logger.warning(f"验证材料ID时出错: {e}")
             return False
     
+    def verify_material_ids(self, material_ids: List[str]) -> Dict[str, bool]:
+        """
+        批量验证材料ID在Materials Project数据库中是否存在（一次查询）
+        
+        Args:
+            material_ids (List[str]): 材料ID列表
+            
+        Returns:
+            Dict[str, bool]: 以材料ID为键的验证结果
+        """
+        results = {}
+        pending = []
+        with self._verified_lock:
+            for material_id in material_ids:
+                if material_id in results or material_id in pending:
+                    continue
+                if not self.validate_material_id(material_id):
+                    results[material_id] = False
+                elif material_id in self._verified_material_ids:
+                    results[material_id] = True
+                elif self.snapshot is not None and self.snapshot.get(material_id) is not None:
+                    results[material_id] = True
+                else:
+                    pending.append(material_id)
+        
+        if not pending:
+            return results
+        
+        try:
+            docs = self._call_mp(
+                self.mpr.materials.search,
+                material_ids=pending,
+                fields=["material_id"],
+                chunk_size=len(pending),
+                num_chunks=1
+            )
+            found = {str(getattr(doc, "material_id", "")) for doc in (docs or [])}
+        except Exception as e:
+            logger.warning(f"批量验证材料ID时出错: {e}")
+            found = set()
+        
+        with self._verified_lock:
+            for material_id in pending:
+                exists = material_id in found
+                results[material_id] = exists
+                if exists:
+                    self._verified_material_ids.add(material_id)
+        
+        return results
+    
+    def iter_materials_summary(self,
+                               elements: Optional[List[str]] = None,
+                               predicate: Optional[Callable[[MaterialSummary], bool]] = None,
+                               page_size: int = 500,
+                               max_results: Optional[int] = None) -> Iterator[List[MaterialSummary]]:
+        """
+        按页流式获取材料摘要记录
+        
+        生成器按需拉取：只有在消费方请求下一页时才向服务器请求，因此处理速度慢的消费方会自然地减缓下载（背压），
+        内存中最多只保留一页文档。可选的过滤函数在每页到达时即时应用，不满足条件的记录不会被保留。
+        
+        Args:
+            elements (List[str], optional): 元素列表
+            predicate (Callable[[MaterialSummary], bool], optional): 过滤函数，返回True的记录才会被输出
+            page_size (int): 每页向服务器请求的文档数量（最大1000）
+            max_results (int, optional): 满足过滤条件的记录达到该数量后停止
+            
+        Yields:
+            List[MaterialSummary]: 一页满足条件的摘要记录（过滤后为空的页不会输出）
+        """
+        fields = ["material_id", "formula_pretty", "chemsys", "density"]
+        # 无过滤条件时可以直接把数量上限下推到服务器 / Without a predicate the cap can be pushed down to the server
+        limit = max_results if predicate is None else None
+        emitted = 0
+        
+        for page in self.iter_material_pages(elements=elements, fields=fields, limit=limit, page_size=page_size):
+            records = []
+            for doc in page:
+                density = getattr(doc, "density", None)
+                record = MaterialSummary(
+                    material_id=str(getattr(doc, "material_id", "N/A")),
+                    formula=getattr(doc, "formula_pretty", getattr(doc, "formula", "N/A")),
+                    chemsys=getattr(doc, "chemsys", "N/A"),
+                    density=float(density) if density is not None else None
+                )
+                if predicate is not None and not predicate(record):
+                    continue
+                records.append(record)
+                if max_results is not None and emitted + len(records) >= max_results:
+                    break
+            
+            if records:
+                emitted += len(records)
+                yield records
+            if max_results is not None and emitted >= max_results:
+                return
+    
     def get_materials_summary(self, 
                              elements: Optional[List[str]] = None,
                              limit: int = 100) -> Dict[str, Any]:
@@ -355,54 +765,86 @@ class MaterialsProjectTool:
             Dict: 材料摘要信息
         """
         try:
-            # 构建搜索参数
-            kwargs = {}
-            if elements:
-                kwargs["elements"] = elements
-                
-            # 优化：只获取需要的字段以提高查询速度
-            # 使用API支持的字段
-            fields = [
-                "material_id", 
-                "formula_pretty", 
-                "chemsys", 
-                "density"
-            ]
-                
-            # 执行搜索
-            docs = self.mpr.materials.search(
-                **kwargs,
-                chunk_size=min(limit, 1000),
-                fields=fields
-            )
-            
-            # 转换为摘要格式
             materials_data = []
-            for doc in docs:
-                # 为数值数据添加单位信息
-                density_value = getattr(doc, "density", "N/A")
-                density_with_unit = f"{density_value} g/cm³" if density_value != "N/A" else "N/A"
-                
-                material_dict = {
-                    "material_id": str(getattr(doc, "material_id", "N/A")),
-                    "formula": getattr(doc, "formula_pretty", getattr(doc, "formula", "N/A")),
-                    "chemsys": getattr(doc, "chemsys", "N/A"),
-                    "density": density_with_unit
-                }
-                materials_data.append(material_dict)
+            for page in self.iter_materials_summary(
+                elements=elements,
+                page_size=min(limit, MP_MAX_PAGE_SIZE),
+                max_results=limit
+            ):
+                for record in page:
+                    # 为数值数据添加单位信息
+                    density_with_unit = f"{record.density} g/cm³" if record.density is not None else "N/A"
+                    
+                    material_dict = {
+                        "material_id": record.material_id,
+                        "formula": record.formula,
+                        "chemsys": record.chemsys,
+                        "density": density_with_unit
+                    }
+                    materials_data.append(material_dict)
             
+            meta = {
+                "total_count": len(materials_data),
+                "limit": limit
+            }
+            meta.update(self._source_meta(elements=elements))
             return {
                 "data": materials_data,
-                "meta": {
-                    "total_count": len(materials_data),
-                    "limit": limit
-                }
+                "meta": meta
             }
             
         except Exception as e:
             logger.error(f"获取材料摘要时出错: {e}")
             return {"error": f"获取材料摘要时出错: {str(e)}"}
 
+def _is_transient_mp_error(error: Exception) -> bool:
+    """
+    判断MP API错误是否为限流或暂时性服务器错误
+    
+    Args:
+        error (Exception): 捕获到的异常
+        
+    Returns:
+        bool: 是否值得重试
+    """
+    response = getattr(error, "response", None)
+    status_code = getattr(response, "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    if type(error).__name__ in _TRANSIENT_ERROR_NAMES or isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return bool(_TRANSIENT_STATUS_PATTERN.search(str(error)))
+
+def get_mp_rate_limiter() -> TokenBucketRateLimiter:
+    """
+    获取Materials Project共享速率限制器
+    
+    Returns:
+        TokenBucketRateLimiter: 进程内共享的限制器
+    """
+    return get_rate_limiter(MP_HOST, rate=Config.MP_RATE_LIMIT, capacity=Config.MP_RATE_BURST)
+
+# 共享的自适应并发限制器
+_mp_concurrency_limiter = None
+_mp_concurrency_lock = threading.Lock()
+
+def get_mp_concurrency_limiter() -> AdaptiveConcurrencyLimiter:
+    """
+    获取Materials Project共享的自适应并发限制器
+    
+    Returns:
+        AdaptiveConcurrencyLimiter: 进程内共享的限制器
+    """
+    global _mp_concurrency_limiter
+    with _mp_concurrency_lock:
+        if _mp_concurrency_limiter is None:
+            _mp_concurrency_limiter = AdaptiveConcurrencyLimiter(
+                max_concurrency=Config.MP_MAX_CONCURRENCY,
+                initial_concurrency=Config.MP_INITIAL_CONCURRENCY,
+                name=MP_HOST
+            )
+        return _mp_concurrency_limiter
+
 # 创建全局实例
 materials_project_tool = None
 
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Materials Project本地快照 / Materials Project Local Snapshot
+将常用化学体系的summary文档批量下载到本地压缩文件，并在内存中按化学体系、化学式和材料ID建立索引
+/ Bulk-downloads summary docs for frequently used chemical systems into a compact local file
+and indexes them in memory by chemsys, formula and material ID
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.config.config import Config
+from src.utils.formula_parser import chemsys, element_set, reduced_formula
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# 快照文件格式版本 / Snapshot file format version
+SNAPSHOT_VERSION = 1
+
+# 快照中保存的字段（按列存储以减小体积） / Fields stored in the snapshot (stored as columns to keep it compact)
+SNAPSHOT_FIELDS = [
+    "material_id",
+    "formula_pretty",
+    "chemsys",
+    "volume",
+    "density",
+    "nsites",
+    "crystal_system"
+]
+
+# 从MP下载时请求的字段 / Fields requested from MP when downloading
+SNAPSHOT_MP_FIELDS = [
+    "material_id",
+    "formula_pretty",
+    "chemsys",
+    "volume",
+    "density",
+    "nsites",
+    "symmetry"
+]
+
+def chemsys_of(elements: Iterable[str]) -> str:
+    """
+    由元素集合构造MP格式的化学体系字符串 / Build an MP-style chemsys string from elements
+
+    Args:
+        elements (Iterable[str]): 元素列表 / Elements
+
+    Returns:
+        str: 例如 "Fe-O" / e.g. "Fe-O"
+    """
+    return "-".join(sorted(set(elements)))
+
+
+def default_snapshot_chemsys(metals: Optional[List[str]] = None,
+                             anions: Optional[List[str]] = None) -> List[str]:
+    """
+    生成默认快照的化学体系列表（单质及其氧化物、硫化物、氮化物） / Default chemsys list (elements and their oxides, sulfides, nitrides)
+
+    Args:
+        metals (List[str], optional): 金属元素，默认取配置 / Metals, defaults to configuration
+        anions (List[str], optional): 阴离子元素，默认取配置 / Anion elements, defaults to configuration
+
+    Returns:
+        List[str]: 化学体系列表 / List of chemsys strings
+    """
+    metals = metals or Config.MP_SNAPSHOT_METALS
+    anions = anions or Config.MP_SNAPSHOT_ANIONS
+    systems = []
+    for metal in metals:
+        systems.append(chemsys_of([metal]))
+        for anion in anions:
+            systems.append(chemsys_of([metal, anion]))
+    return sorted(set(systems))
+
+
+class MaterialsProjectSnapshot:
+    """Materials Project本地快照类 / Materials Project local snapshot class
+
+    快照记录其覆盖范围：
+    1. chemsys: 完整下载的化学体系，查询的化学体系在其中时结果是完整的
+    2. elements: 按"包含元素"完整下载的元素组，查询元素包含其中某组时结果是完整的
+    只有在覆盖范围内的查询才由快照回答，其余查询仍然访问API。
+    """
+
+    def __init__(self,
+                 records: Optional[List[Dict[str, Any]]] = None,
+                 chemsys: Optional[Iterable[str]] = None,
+                 elements: Optional[Iterable[Iterable[str]]] = None,
+                 created_at: Optional[float] = None,
+                 path: Optional[str] = None):
+        """
+        初始化快照并建立索引 / Initialize the snapshot and build its indexes
+
+        Args:
+            records (List[Dict], optional): 材料记录 / Material records
+            chemsys (Iterable[str], optional): 完整覆盖的化学体系 / Fully covered chemical systems
+            elements (Iterable[Iterable[str]], optional): 完整覆盖的元素组 / Fully covered element groups
+            created_at (float, optional): 快照创建时间戳 / Snapshot creation timestamp
+            path (str, optional): 快照文件路径 / Snapshot file path
+        """
+        self.records = sorted(records or [], key=lambda record: _material_id_sort_key(record.get("material_id", "")))
+        self.chemsys = set(chemsys or [])
+        self.element_groups = [frozenset(group) for group in (elements or []) if group]
+        self.created_at = created_at if created_at is not None else time.time()
+        self.path = path
+
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_chemsys: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_formula: Dict[str, List[Dict[str, Any]]] = {}
+        for record in self.records:
+            self._by_id[record["material_id"]] = record
+            self._by_chemsys.setdefault(record.get("chemsys", ""), []).append(record)
+            key = reduced_formula(record.get("formula_pretty", ""))
+            if key is not None:
+                self._by_formula.setdefault(key, []).append(record)
+
+    @property
+    def age_seconds(self) -> float:
+        """快照距今的秒数 / Seconds since the snapshot was created"""
+        return max(0.0, time.time() - self.created_at)
+
+    def info(self) -> Dict[str, Any]:
+        """
+        获取快照元信息（包括陈旧程度） / Get snapshot metadata (including staleness)
+
+        Returns:
+            Dict[str, Any]: 来源、创建时间、年龄和记录数 / Source, creation time, age and record count
+        """
+        return {
+            "source": "snapshot",
+            "snapshot_created_at": datetime.fromtimestamp(self.created_at, tz=timezone.utc).isoformat(),
+            "snapshot_age_days": round(self.age_seconds / 86400, 2),
+            "snapshot_records": len(self.records)
+        }
+
+    def _elements_covered(self, elements: Iterable[str]) -> bool:
+        """判断"包含这些元素"的查询是否被完整覆盖 / Whether a "contains these elements" query is fully covered"""
+        query = frozenset(elements)
+        return any(group <= query for group in self.element_groups)
+
+    def covers(self,
+               formula: Optional[str] = None,
+               elements: Optional[List[str]] = None) -> bool:
+        """
+        判断快照能否完整回答该查询 / Determine whether the snapshot can fully answer the query
+
+        Args:
+            formula (str, optional): 化学式 / Chemical formula
+            elements (List[str], optional): 必须包含的元素 / Required elements
+
+        Returns:
+            bool: 是否覆盖 / Whether the query is covered
+        """
+        if formula:
+            system = chemsys(formula)
+            if system is None:
+                return False
+            return system in self.chemsys or self._elements_covered(element_set(formula))
+        if elements:
+            return self._elements_covered(elements)
+        return False
+
+    def search(self,
+               formula: Optional[str] = None,
+               elements: Optional[List[str]] = None,
+               exclude_elements: Optional[List[str]] = None,
+               crystal_system: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        在内存索引中搜索材料（调用方应先用covers判断覆盖） / Search the in-memory index (callers should check covers first)
+
+        Args:
+            formula (str, optional): 化学式 / Chemical formula
+            elements (List[str], optional): 必须包含的元素 / Required elements
+            exclude_elements (List[str], optional): 要排除的元素 / Elements to exclude
+            crystal_system (str, optional): 晶体系统 / Crystal system
+
+        Returns:
+            List[Dict[str, Any]]: 匹配的记录 / Matching records
+        """
+        if formula:
+            key = reduced_formula(formula)
+            candidates = self._by_formula.get(key, []) if key is not None else []
+        elif elements:
+            required = set(elements)
+            candidates = [
+                record for system, records in self._by_chemsys.items()
+                if required <= set(system.split("-"))
+                for record in records
+            ]
+            candidates.sort(key=lambda record: _material_id_sort_key(record["material_id"]))
+        else:
+            candidates = self.records
+
+        required = set(elements or [])
+        excluded = set(exclude_elements or [])
+        wanted_system = crystal_system.lower() if crystal_system else None
+        results = []
+        for record in candidates:
+            record_elements = set(record.get("chemsys", "").split("-"))
+            if required and not required <= record_elements:
+                continue
+            if excluded and excluded & record_elements:
+                continue
+            if wanted_system and str(record.get("crystal_system", "")).lower() != wanted_system:
+                continue
+            results.append(record)
+        return results
+
+    def get(self, material_id: str) -> Optional[Dict[str, Any]]:
+        """
+        按材料ID获取记录 / Get a record by material ID
+
+        Args:
+            material_id (str): 材料ID / Material ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 记录，不存在时返回None / Record, or None if absent
+        """
+        return self._by_id.get(material_id)
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        以gzip压缩的列式JSON保存快照 / Save the snapshot as gzip-compressed columnar JSON
+
+        Args:
+            path (str, optional): 输出路径，默认使用加载路径或配置路径 / Output path, defaults to the load path or configured path
+
+        Returns:
+            str: 实际写入的路径 / Path written
+        """
+        path = path or self.path or Config.MP_SNAPSHOT_PATH
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        payload = {
+            "version": SNAPSHOT_VERSION,
+            "created_at": self.created_at,
+            "chemsys": sorted(self.chemsys),
+            "elements": [sorted(group) for group in self.element_groups],
+            "fields": SNAPSHOT_FIELDS,
+            "rows": [[record.get(field) for field in SNAPSHOT_FIELDS] for record in self.records]
+        }
+        # 先写临时文件再替换，避免读取到写了一半的快照 / Write then rename so readers never see a partial snapshot
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self.path = path
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "MaterialsProjectSnapshot":
+        """
+        从文件加载快照 / Load a snapshot from file
+
+        Args:
+            path (str): 快照文件路径 / Snapshot file path
+
+        Returns:
+            MaterialsProjectSnapshot: 快照实例 / Snapshot instance
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"不支持的快照版本: {payload.get('version')} / Unsupported snapshot version")
+        fields = payload.get("fields", SNAPSHOT_FIELDS)
+        records = [dict(zip(fields, row)) for row in payload.get("rows", [])]
+        return cls(
+            records=records,
+            chemsys=payload.get("chemsys", []),
+            elements=payload.get("elements", []),
+            created_at=payload.get("created_at"),
+            path=path
+        )
+
+
+def snapshot_record_from_doc(doc: Any) -> Dict[str, Any]:
+    """
+    将MP summary文档转换为快照记录 / Convert an MP summary doc into a snapshot record
+
+    Args:
+        doc (Any): MP文档对象 / MP document object
+
+    Returns:
+        Dict[str, Any]: 快照记录 / Snapshot record
+    """
+    symmetry = getattr(doc, "symmetry", None)
+    crystal_system = getattr(symmetry, "crystal_system", None) if symmetry is not None else None
+    # CrystalSystem是字符串枚举，保存其值 / CrystalSystem is a string enum; store its value
+    crystal_system = getattr(crystal_system, "value", crystal_system)
+    return {
+        "material_id": str(getattr(doc, "material_id", "")),
+        "formula_pretty": getattr(doc, "formula_pretty", None),
+        "chemsys": getattr(doc, "chemsys", None),
+        "volume": getattr(doc, "volume", None),
+        "density": getattr(doc, "density", None),
+        "nsites": getattr(doc, "nsites", None),
+        "crystal_system": str(crystal_system) if crystal_system is not None else None
+    }
+
+
+def as_mp_doc(record: Dict[str, Any]) -> SimpleNamespace:
+    """
+    将快照记录包装为与MP文档相同的属性访问形式 / Wrap a snapshot record with the same attribute access as an MP doc
+
+    Args:
+        record (Dict[str, Any]): 快照记录 / Snapshot record
+
+    Returns:
+        SimpleNamespace: 类文档对象 / Doc-like object
+    """
+    fields = {key: value for key, value in record.items() if value is not None and key != "crystal_system"}
+    if record.get("crystal_system"):
+        fields["symmetry"] = SimpleNamespace(crystal_system=record["crystal_system"])
+    return SimpleNamespace(**fields)
+
+
+def build_snapshot(search: Callable[..., List[Any]],
+                   chemsys: Optional[List[str]] = None,
+                   elements: Optional[List[List[str]]] = None,
+                   batch_size: int = 20) -> MaterialsProjectSnapshot:
+    """
+    从MP批量下载summary文档并构建快照 / Bulk-download summary docs from MP and build a snapshot
+
+    Args:
+        search (Callable): 接受MP搜索参数并返回文档列表的函数 / Callable taking MP search kwargs and returning docs
+        chemsys (List[str], optional): 要完整下载的化学体系 / Chemical systems to download completely
+        elements (List[List[str]], optional): 要按"包含元素"完整下载的元素组 / Element groups to download by containment
+        batch_size (int): 每次请求的化学体系数量 / Chemical systems per request
+
+    Returns:
+        MaterialsProjectSnapshot: 新快照 / New snapshot
+    """
+    records: Dict[str, Dict[str, Any]] = {}
+    chemsys = sorted(set(chemsys or []))
+    for start in range(0, len(chemsys), batch_size):
+        batch = chemsys[start:start + batch_size]
+        docs = search(chemsys=batch, fields=SNAPSHOT_MP_FIELDS)
+        for doc in docs or []:
+            record = snapshot_record_from_doc(doc)
+            records[record["material_id"]] = record
+        logger.info(f"已下载化学体系 {batch}: 累计 {len(records)} 条记录 / Downloaded {batch}: {len(records)} records so far")
+
+    for group in elements or []:
+        docs = search(elements=sorted(group), fields=SNAPSHOT_MP_FIELDS)
+        for doc in docs or []:
+            record = snapshot_record_from_doc(doc)
+            records[record["material_id"]] = record
+        logger.info(f"已下载包含 {group} 的材料: 累计 {len(records)} 条记录 / Downloaded materials containing {group}: {len(records)} records so far")
+
+    return MaterialsProjectSnapshot(records=list(records.values()), chemsys=chemsys, elements=elements)
+
+
+def _material_id_sort_key(material_id: str) -> Tuple[str, int]:
+    """按前缀和数字排序材料ID（mp-2 排在 mp-10 之前） / Sort material IDs by prefix then number (mp-2 before mp-10)"""
+    prefix, _, number = str(material_id).rpartition("-")
+    return (prefix, int(number)) if number.isdigit() else (str(material_id), 0)
+
+
+# 创建全局实例 / Create global instance
+_mp_snapshot = None
+_mp_snapshot_loaded = False
+_mp_snapshot_lock = threading.Lock()
+
+
+def get_mp_snapshot() -> Optional[MaterialsProjectSnapshot]:
+    """
+    获取已配置的本地快照（未启用或文件不存在时返回None） / Get the configured local snapshot (None if disabled or missing)
+
+    Returns:
+        Optional[MaterialsProjectSnapshot]: 快照实例 / Snapshot instance
+    """
+    global _mp_snapshot, _mp_snapshot_loaded
+    with _mp_snapshot_lock:
+        if _mp_snapshot_loaded:
+            return _mp_snapshot
+        _mp_snapshot_loaded = True
+        if not Config.MP_SNAPSHOT_ENABLED or not os.path.exists(Config.MP_SNAPSHOT_PATH):
+            return None
+        try:
+            _mp_snapshot = MaterialsProjectSnapshot.load(Config.MP_SNAPSHOT_PATH)
+        except Exception as e:
+            logger.warning(f"加载Materials Project快照失败: {e} / Failed to load Materials Project snapshot: {e}")
+            return None
+
+        age_days = _mp_snapshot.age_seconds / 86400
+        if age_days > Config.MP_SNAPSHOT_MAX_AGE_DAYS:
+            logger.warning(
+                f"Materials Project快照已有 {age_days:.1f} 天未更新，请运行 scripts/build_mp_snapshot.py 刷新 "
+                f"/ Materials Project snapshot is {age_days:.1f} days old; rerun scripts/build_mp_snapshot.py"
+            )
+        return _mp_snapshot
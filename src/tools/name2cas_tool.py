@@ -9,6 +9,9 @@ import requests
 import time
 import random
 from typing import Dict, Any, Optional
+from src.tools.pubchem_tool import get_pubchem_rate_limiter
+from src.utils.singleflight import get_singleflight
+from src.utils.formula_parser import name_key
 
 # 配置日志 / Configure logging
 logging.basicConfig(level=logging.WARNING)
@@ -24,6 +27,10 @@ class NameToCASTool:
         self.session.headers.update({
             "User-Agent": "ECOMATS-NameToCAS-Tool/1.0"
         })
+        # 与其他PubChem客户端共享速率限制器 / Share the rate limiter with the other PubChem clients
+        self.rate_limiter = get_pubchem_rate_limiter()
+        # 合并并发的相同查询 / Coalesce concurrent identical lookups
+        self.singleflight = get_singleflight("name2cas")
     
     def _make_request(self, endpoint: str, timeout: int = 30, max_retries: int = 3) -> Dict[str, Any]:
         """
@@ -39,6 +46,7 @@ class NameToCASTool:
         """
         for attempt in range(max_retries):
             try:
+                self.rate_limiter.acquire()
                 response = self.session.get(endpoint, timeout=timeout)
                 response.raise_for_status()
                 return response.json()
@@ -55,7 +63,21 @@ class NameToCASTool:
     
     def convert_name_to_cas(self, compound_name: str) -> Dict[str, Any]:
         """
-        将化学名称转换为CAS号 / Convert chemical name to CAS number
+        将化学名称转换为CAS号（并发的相同查询只执行一次） / Convert chemical name to CAS number (concurrent identical lookups run once)
+        
+        Args:
+            compound_name (str): 化学名称 / Chemical name
+            
+        Returns:
+            Dict[str, Any]: 包含CAS号和其他相关信息的字典 / Dictionary containing CAS number and other related information
+        """
+        # 化学式区分大小写（Co与CO不同），只有普通名称忽略大小写 / Formulas keep their case (Co is not CO), only plain names ignore case
+        key = name_key(compound_name)
+        return self.singleflight.do(key, self._convert_name_to_cas, compound_name)
+    
+    def _convert_name_to_cas(self, compound_name: str) -> Dict[str, Any]:
+        """
+        将化学名称转换为CAS号（实际执行查询） / Convert chemical name to CAS number (performs the lookup)
         
         Args:
             compound_name (str): 化学名称 / Chemical name
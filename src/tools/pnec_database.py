@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+本地PNEC参考数据库 / Local PNEC Reference Database
+可加载的生态毒性参考数据集（CSV或SQLite导入），按CAS号、名称、元素和离子价态建立索引，使PNEC查询无需访问网络
+/ Loadable ecotoxicity reference dataset (CSV or SQLite import) indexed by CAS number, name, element and ion
+valence, so PNEC lookups need no network traffic
+
+CSV列 / CSV columns:
+    substance, cas, element, valence, species, compartment, value, unit,
+    assessment_factor, endpoint, source, aliases（以"|"分隔 / "|" separated）
+"""
+
+import csv
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from src.config.config import Config
+from src.utils.formula_parser import METAL_ELEMENTS, extract_elements, is_valid_formula, name_key
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# 随代码分发的参考数据集 / Reference dataset shipped with the code
+BUILTIN_PNEC_DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "pnec_reference.csv")
+
+# 浓度单位到mg/L的换算系数 / Conversion factors from concentration units to mg/L
+_UNIT_TO_MG_L = {
+    "g/l": 1000.0,
+    "mg/l": 1.0,
+    "μg/l": 1e-3,
+    "µg/l": 1e-3,
+    "ug/l": 1e-3,
+    "ng/l": 1e-6
+}
+
+_RECORD_COLUMNS = [
+    "substance", "cas", "element", "valence", "species", "compartment", "value", "unit",
+    "value_mg_l", "assessment_factor", "endpoint", "source"
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pnec_records (
+    id INTEGER PRIMARY KEY,
+    substance TEXT NOT NULL,
+    cas TEXT,
+    element TEXT,
+    valence INTEGER,
+    species TEXT,
+    compartment TEXT NOT NULL DEFAULT 'freshwater',
+    value REAL NOT NULL,
+    unit TEXT NOT NULL,
+    value_mg_l REAL,
+    assessment_factor REAL,
+    endpoint TEXT,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS pnec_aliases (
+    alias TEXT NOT NULL,
+    record_id INTEGER NOT NULL REFERENCES pnec_records(id)
+);
+CREATE INDEX IF NOT EXISTS idx_pnec_cas ON pnec_records(cas);
+CREATE INDEX IF NOT EXISTS idx_pnec_element_valence ON pnec_records(element, valence);
+CREATE INDEX IF NOT EXISTS idx_pnec_alias ON pnec_aliases(alias);
+"""
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """转换为浮点数，空值返回None / Convert to float, None for empty values"""
+    if value is None or str(value).strip() == "":
+        return None
+    return float(value)
+
+
+def _to_mg_l(value: float, unit: str) -> Optional[float]:
+    """换算为mg/L，未知单位返回None / Convert to mg/L, None for unknown units"""
+    factor = _UNIT_TO_MG_L.get(str(unit or "").replace(" ", "").lower())
+    return value * factor if factor is not None else None
+
+
+class PNECDatabase:
+    """本地PNEC参考数据库类 / Local PNEC reference database class"""
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        初始化数据库 / Initialize the database
+
+        Args:
+            path (str): SQLite文件路径，默认在内存中 / SQLite file path, in memory by default
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+        self.sources: List[str] = []
+
+    def load_records(self, records: Iterable[Dict[str, Any]], source: Optional[str] = None) -> int:
+        """
+        批量导入记录（单个事务） / Bulk import records (in a single transaction)
+
+        Args:
+            records (Iterable[Dict]): 记录，字段同CSV列 / Records with the CSV columns
+            source (str, optional): 记录未提供source时使用的来源 / Source used when a record has none
+
+        Returns:
+            int: 导入的记录数 / Number of records imported
+        """
+        rows = []
+        aliases = []
+        for record in records:
+            value = _to_float(record.get("value"))
+            if value is None:
+                logger.warning(f"跳过缺少PNEC数值的记录: {record.get('substance')}")
+                continue
+            unit = (record.get("unit") or "mg/L").strip()
+            valence = _to_float(record.get("valence"))
+            rows.append((
+                (record.get("substance") or "").strip(),
+                (record.get("cas") or "").strip() or None,
+                (record.get("element") or "").strip() or None,
+                int(valence) if valence is not None else None,
+                (record.get("species") or "").strip() or None,
+                (record.get("compartment") or "freshwater").strip(),
+                value,
+                unit,
+                _to_mg_l(value, unit),
+                _to_float(record.get("assessment_factor")),
+                (record.get("endpoint") or "").strip() or None,
+                (record.get("source") or source or "").strip() or None
+            ))
+            names = [record.get("substance"), record.get("species")]
+            names.extend(str(record.get("aliases") or "").split("|"))
+            aliases.append({name_key(name) for name in names if name_key(name)})
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM pnec_records")
+            first_id = cursor.fetchone()[0] + 1
+            self._conn.executemany(
+                f"INSERT INTO pnec_records (id, {', '.join(_RECORD_COLUMNS)}) VALUES (?, {', '.join('?' * len(_RECORD_COLUMNS))})",
+                [(first_id + offset,) + row for offset, row in enumerate(rows)]
+            )
+            self._conn.executemany(
+                "INSERT INTO pnec_aliases (alias, record_id) VALUES (?, ?)",
+                [(alias, first_id + offset) for offset, names in enumerate(aliases) for alias in names]
+            )
+        return len(rows)
+
+    def load_csv(self, path: str) -> int:
+        """
+        从CSV文件批量导入 / Bulk import from a CSV file
+
+        Args:
+            path (str): CSV文件路径 / CSV file path
+
+        Returns:
+            int: 导入的记录数 / Number of records imported
+        """
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            count = self.load_records(csv.DictReader(f), source=os.path.basename(path))
+        self.sources.append(path)
+        return count
+
+    def load_sqlite(self, path: str) -> int:
+        """
+        从另一个SQLite数据库导入（需包含pnec_records表，可选pnec_aliases表）
+        / Import from another SQLite database (must contain pnec_records, optionally pnec_aliases)
+
+        Args:
+            path (str): SQLite文件路径 / SQLite file path
+
+        Returns:
+            int: 导入的记录数 / Number of records imported
+        """
+        source = sqlite3.connect(path)
+        source.row_factory = sqlite3.Row
+        try:
+            records = [dict(row) for row in source.execute("SELECT * FROM pnec_records")]
+            tables = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if "pnec_aliases" in tables:
+                alias_map: Dict[Any, List[str]] = {}
+                for row in source.execute("SELECT alias, record_id FROM pnec_aliases"):
+                    alias_map.setdefault(row["record_id"], []).append(row["alias"])
+                for record in records:
+                    record["aliases"] = "|".join(alias_map.get(record.get("id"), []))
+        finally:
+            source.close()
+        count = self.load_records(records, source=os.path.basename(path))
+        self.sources.append(path)
+        return count
+
+    def load(self, path: str) -> int:
+        """
+        按扩展名导入CSV或SQLite文件 / Import a CSV or SQLite file by extension
+
+        Args:
+            path (str): 数据文件路径 / Data file path
+
+        Returns:
+            int: 导入的记录数 / Number of records imported
+        """
+        if path.lower().endswith((".sqlite", ".sqlite3", ".db")):
+            return self.load_sqlite(path)
+        return self.load_csv(path)
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        """执行查询并返回字典列表 / Run a query and return dicts"""
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def by_cas(self, cas_number: str) -> List[Dict[str, Any]]:
+        """
+        按CAS号查询 / Look up by CAS number
+
+        Args:
+            cas_number (str): CAS号 / CAS number
+
+        Returns:
+            List[Dict[str, Any]]: 匹配的记录 / Matching records
+        """
+        return self._query("SELECT * FROM pnec_records WHERE cas = ? ORDER BY id", (str(cas_number).strip(),))
+
+    def by_name(self, name: str) -> List[Dict[str, Any]]:
+        """
+        按名称或别名查询 / Look up by name or alias
+
+        Args:
+            name (str): 名称 / Name
+
+        Returns:
+            List[Dict[str, Any]]: 匹配的记录 / Matching records
+        """
+        return self._query(
+            "SELECT DISTINCT r.* FROM pnec_records r JOIN pnec_aliases a ON a.record_id = r.id "
+            "WHERE a.alias = ? ORDER BY r.id",
+            (name_key(name),)
+        )
+
+    def by_element(self, element: str, valence: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        按元素（及可选的离子价态）查询 / Look up by element (and optionally ion valence)
+
+        Args:
+            element (str): 元素符号 / Element symbol
+            valence (int, optional): 离子价态 / Ion valence
+
+        Returns:
+            List[Dict[str, Any]]: 匹配的记录 / Matching records
+        """
+        if valence is None:
+            return self._query("SELECT * FROM pnec_records WHERE element = ? ORDER BY valence, id", (element,))
+        return self._query("SELECT * FROM pnec_records WHERE element = ? AND valence = ? ORDER BY id", (element, int(valence)))
+
+    def by_formula(self, formula: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        按化学式中的金属元素查询 / Look up the metal elements of a formula
+
+        Args:
+            formula (str): 化学式 / Chemical formula
+
+        Returns:
+            Dict[str, List[Dict]]: 金属元素到记录的映射（仅包含有记录的元素） / Metal element to records (elements with records only)
+        """
+        if not is_valid_formula(formula):
+            return {}
+        found = {}
+        for element in extract_elements(formula):
+            if element in METAL_ELEMENTS:
+                records = self.by_element(element)
+                if records:
+                    found[element] = records
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取数据库统计 / Get database statistics
+
+        Returns:
+            Dict[str, Any]: 记录数、元素数和已加载的数据源 / Record count, element count and loaded sources
+        """
+        with self._lock:
+            records, elements = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT element) FROM pnec_records"
+            ).fetchone()
+        return {"records": records, "elements": elements, "sources": list(self.sources)}
+
+
+# 创建全局实例 / Create global instance
+_pnec_database = None
+_pnec_database_lock = threading.Lock()
+
+
+def get_pnec_database() -> PNECDatabase:
+    """
+    获取共享的PNEC参考数据库（首次调用时加载内置数据集和 PNEC_DATASET_PATHS 中的数据文件）
+    / Get the shared PNEC reference database (loads the built-in dataset and PNEC_DATASET_PATHS on first use)
+
+    Returns:
+        PNECDatabase: PNEC参考数据库 / PNEC reference database
+    """
+    global _pnec_database
+    with _pnec_database_lock:
+        if _pnec_database is None:
+            database = PNECDatabase(Config.PNEC_DB_PATH or ":memory:")
+            if database.stats()["records"] == 0:
+                for path in [BUILTIN_PNEC_DATASET] + Config.PNEC_DATASET_PATHS:
+                    try:
+                        count = database.load(path)
+                        logger.info(f"已导入PNEC数据 {path}: {count} 条")
+                    except Exception as e:
+                        logger.warning(f"无法导入PNEC数据 {path}: {e}")
+            _pnec_database = database
+        return _pnec_database
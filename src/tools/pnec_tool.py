@@ -8,7 +8,13 @@ PNEC (Predicted No Effect Concentration) 数据库查询工具 / PNEC (Predicted
 import logging
 import requests
 import time
+from urllib.parse import quote
 from typing import Dict, Any, List, Optional
+from src.tools.pubchem_tool import get_pubchem_rate_limiter
+from src.utils.singleflight import get_singleflight
+from src.utils.composition import composition, molecular_weight as local_molecular_weight
+from src.utils.formula_parser import extract_elements, name_key
+from src.tools.pnec_database import get_pnec_database
 
 # 配置日志 / Configure logging
 logging.basicConfig(level=logging.WARNING)
@@ -26,6 +32,10 @@ class PNECTool:
         self.session.headers.update({
             "User-Agent": "ECOMATS-PNEC-Tool/1.0"
         })
+        # 与其他PubChem客户端共享速率限制器 / Share the rate limiter with the other PubChem clients
+        self.rate_limiter = get_pubchem_rate_limiter()
+        # 合并并发的相同查询 / Coalesce concurrent identical lookups
+        self.singleflight = get_singleflight("pnec")
         
         # PNEC相关参数的参考范围（用于模拟数据）
         # Reference range of PNEC-related parameters (used for simulated data)
@@ -40,50 +50,25 @@ class PNECTool:
             }
         }
         
-        # 常见金属元素及其价态对应的毒性数据
-        # Common metal elements and their toxicity data corresponding to valence states
-        self.metal_toxicity_data = {
-            "Ni": {
-                "valences": ["Ni²⁺"],
-                "cas_numbers": ["7440-02-0"],
-                "freshwater_pnec": {
-                    "Ni²⁺": {"value": 0.02, "unit": "mg/L", "description": "Ni²⁺离子在淡水中的预测无效应浓度"}
-                }
-            },
-            "W": {
-                "valences": ["W⁶⁺"],
-                "cas_numbers": ["7440-07-5"],
-                "freshwater_pnec": {
-                    "W⁶⁺": {"value": 0.1, "unit": "mg/L", "description": "W⁶⁺离子在淡水中的预测无效应浓度"}
-                }
-            },
-            "Co": {
-                "valences": ["Co²⁺"],
-                "cas_numbers": ["7440-48-4"],
-                "freshwater_pnec": {
-                    "Co²⁺": {"value": 0.01, "unit": "mg/L", "description": "Co²⁺离子在淡水中的预测无效应浓度"}
-                }
-            },
-            "Mo": {
-                "valences": ["Mo⁶⁺"],
-                "cas_numbers": ["7439-98-7"],
-                "freshwater_pnec": {
-                    "Mo⁶⁺": {"value": 0.05, "unit": "mg/L", "description": "Mo⁶⁺离子在淡水中的预测无效应浓度"}
-                }
-            },
-            "Fe": {
-                "valences": ["Fe²⁺", "Fe³⁺"],
-                "cas_numbers": ["7439-89-6"],
-                "freshwater_pnec": {
-                    "Fe²⁺": {"value": 0.5, "unit": "mg/L", "description": "Fe²⁺离子在淡水中的预测无效应浓度"},
-                    "Fe³⁺": {"value": 0.3, "unit": "mg/L", "description": "Fe³⁺离子在淡水中的预测无效应浓度"}
-                }
-            }
-        }
+        # 本地PNEC参考数据库（按CAS号、名称、元素和价态索引）
+        # Local PNEC reference database (indexed by CAS number, name, element and valence)
+        self.database = get_pnec_database()
     
     def get_pnec_by_cas(self, cas_number: str) -> Dict[str, Any]:
         """
-        根据CAS号查询PNEC数据
+        根据CAS号查询PNEC数据（并发的相同查询只执行一次）
+        
+        Args:
+            cas_number (str): 化学物质的CAS号
+            
+        Returns:
+            Dict[str, Any]: 包含PNEC数据的字典
+        """
+        return self.singleflight.do(("cas", str(cas_number).strip()), self._lookup_pnec_by_cas, cas_number)
+    
+    def _lookup_pnec_by_cas(self, cas_number: str) -> Dict[str, Any]:
+        """
+        根据CAS号查询PNEC数据（实际执行查询）
         
         Args:
             cas_number (str): 化学物质的CAS号
@@ -92,6 +77,11 @@ class PNECTool:
             Dict[str, Any]: 包含PNEC数据的字典
         """
         try:
+            # 本地参考数据库命中时直接返回，无需访问网络
+            records = self.database.by_cas(cas_number)
+            if records:
+                return self._local_result(records, cas_number=cas_number)
+            
             # 首先通过CAS号获取化合物基本信息
             compound_info = self._get_compound_info_by_cas(cas_number)
             
@@ -102,6 +92,14 @@ class PNECTool:
                     "error": compound_info["error"]
                 }
             
+            # 优先用本地原子量表由分子式计算分子量和组成，只有分子式无法解析时才使用PubChem返回的分子量
+            local_composition = composition(compound_info.get("molecular_formula", ""))
+            if local_composition is not None:
+                compound_info["molecular_weight"] = local_composition["molecular_weight"]
+                compound_info["molecular_weight_source"] = "local"
+            else:
+                compound_info["molecular_weight_source"] = "pubchem"
+            
             # 分析化合物中金属元素的价态
             valence_analysis = self._analyze_element_valences(compound_info)
             
@@ -114,8 +112,11 @@ class PNECTool:
                 "compound_name": compound_info.get("name", ""),
                 "molecular_formula": compound_info.get("molecular_formula", ""),
                 "molecular_weight": compound_info.get("molecular_weight", ""),
+                "molecular_weight_source": compound_info.get("molecular_weight_source", ""),
+                "composition": local_composition,
                 "valence_analysis": valence_analysis,
-                "pnec_data": pnec_data
+                "pnec_data": pnec_data,
+                "data_source": pnec_data.get("data_source", "estimate")
             }
             
         except Exception as e:
@@ -128,7 +129,21 @@ class PNECTool:
     
     def get_pnec_by_name(self, compound_name: str) -> Dict[str, Any]:
         """
-        根据化合物名称查询PNEC数据
+        根据化合物名称查询PNEC数据（并发的相同查询只执行一次）
+        
+        Args:
+            compound_name (str): 化学物质名称
+            
+        Returns:
+            Dict[str, Any]: 包含PNEC数据的字典
+        """
+        # 化学式区分大小写（Co与CO不同），只有普通名称忽略大小写
+        key = ("name", name_key(compound_name))
+        return self.singleflight.do(key, self._lookup_pnec_by_name, compound_name)
+    
+    def _lookup_pnec_by_name(self, compound_name: str) -> Dict[str, Any]:
+        """
+        根据化合物名称查询PNEC数据（实际执行查询）
         
         Args:
             compound_name (str): 化学物质名称
@@ -137,6 +152,18 @@ class PNECTool:
             Dict[str, Any]: 包含PNEC数据的字典
         """
         try:
+            # 本地参考数据库：先按名称/别名，再按化学式中的金属元素
+            records = self.database.by_name(compound_name)
+            if records:
+                return self._local_result(records, compound_name=compound_name)
+            element_records = self.database.by_formula(compound_name)
+            if element_records:
+                return self._local_result(
+                    [record for records in element_records.values() for record in records],
+                    compound_name=compound_name,
+                    molecular_formula=compound_name
+                )
+            
             # 首先获取化合物的CAS号
             cas_result = self._get_cas_by_name(compound_name)
             
@@ -177,15 +204,18 @@ class PNECTool:
             Dict[str, Any]: 化合物基本信息
         """
         try:
-            # 使用PubChem API通过CAS号查询化合物
-            url = f"{self.base_url}/compound/cid/{cas_number}/json"
+            # PubChem将CAS号作为名称（同义词）解析，cid端点只接受CID
+            url = f"{self.base_url}/compound/name/{quote(cas_number)}/cids/JSON"
+            self.rate_limiter.acquire()
             response = self.session.get(url, timeout=30)
+            if response.status_code == 404:
+                return {"error": "未找到该CAS号对应的化合物"}
             response.raise_for_status()
             data = response.json()
             
-            if "PC_Compounds" in data and len(data["PC_Compounds"]) > 0:
-                compound = data["PC_Compounds"][0]
-                cid = compound["id"]["id"]
+            cids = data.get("IdentifierList", {}).get("CID") or []
+            if cids:
+                cid = cids[0]
                 
                 # 获取更多详细信息
                 details = self._get_compound_details(cid)
@@ -215,6 +245,7 @@ class PNECTool:
         try:
             # 使用PubChem API通过名称查询化合物
             url = f"{self.base_url}/compound/name/{compound_name}/json"
+            self.rate_limiter.acquire()
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
             data = response.json()
@@ -252,6 +283,7 @@ class PNECTool:
         try:
             # 查询化合物的详细属性
             url = f"{self.base_url}/compound/cid/{cid}/property/MolecularFormula,MolecularWeight,IUPACName,CanonicalSMILES,IsomericSMILES/JSON"
+            self.rate_limiter.acquire()
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
             data = response.json()
@@ -294,16 +326,12 @@ class PNECTool:
             # 从化合物信息中提取元素
             elements = self._extract_elements_from_formula(molecular_formula)
             
-            # 分析金属元素的价态
+            # 分析金属元素的价态（数据来自本地PNEC参考数据库）
             metal_valences = {}
             for element in elements:
-                if element in self.metal_toxicity_data:
-                    metal_info = self.metal_toxicity_data[element]
-                    metal_valences[element] = {
-                        "valences": metal_info["valences"],
-                        "cas_numbers": metal_info["cas_numbers"],
-                        "toxicity_data": metal_info["freshwater_pnec"]
-                    }
+                records = self.database.by_element(element)
+                if records:
+                    metal_valences[element] = self._valence_entry(records)
             
             return {
                 "success": True,
@@ -329,23 +357,7 @@ class PNECTool:
         Returns:
             List[str]: 元素符号列表
         """
-        import re
-        # 匹配常见的元素符号（1-2个字母，首字母大写）
-        elements = re.findall(r'[A-Z][a-z]?', formula)
-        # 过滤掉可能不是元素的字符串
-        valid_elements = []
-        # 常见元素列表（简化版）
-        common_elements = ['H', 'He', 'Li', 'Be', 'B', 'C', 'N', 'O', 'F', 'Ne', 'Na', 'Mg', 'Al', 'Si', 'P', 'S', 'Cl', 'Ar',
-                          'K', 'Ca', 'Sc', 'Ti', 'V', 'Cr', 'Mn', 'Fe', 'Co', 'Ni', 'Cu', 'Zn', 'Ga', 'Ge', 'As', 'Se', 'Br', 'Kr',
-                          'Rb', 'Sr', 'Y', 'Zr', 'Nb', 'Mo', 'Tc', 'Ru', 'Rh', 'Pd', 'Ag', 'Cd', 'In', 'Sn', 'Sb', 'Te', 'I', 'Xe',
-                          'Cs', 'Ba', 'La', 'Ce', 'Pr', 'Nd', 'Pm', 'Sm', 'Eu', 'Gd', 'Tb', 'Dy', 'Ho', 'Er', 'Tm', 'Yb', 'Lu',
-                          'Hf', 'Ta', 'W', 'Re', 'Os', 'Ir', 'Pt', 'Au', 'Hg', 'Tl', 'Pb', 'Bi', 'Po', 'At', 'Rn']
-        
-        for element in elements:
-            if element in common_elements:
-                valid_elements.append(element)
-        
-        return list(set(valid_elements))  # 去重
+        return extract_elements(formula)
     
     def _calculate_pnec(self, compound_info: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -362,7 +374,15 @@ class PNECTool:
         # 在实际应用中，应该使用专业的PNEC数据库和计算方法
         # In actual applications, professional PNEC databases and calculation methods should be used
         
+        # 参考数据库中有该化合物所含元素的数据时使用实测参考值
+        element_records = self.database.by_formula(compound_info.get("molecular_formula", ""))
+        if element_records:
+            return self._pnec_from_records([record for records in element_records.values() for record in records])
+        
         molecular_weight = compound_info.get("molecular_weight", 0)
+        # 分子量缺失时由分子式本地计算 / Compute locally from the formula when the molecular weight is missing
+        if not molecular_weight:
+            molecular_weight = local_molecular_weight(compound_info.get("molecular_formula", "")) or 0
         try:
             mw = float(molecular_weight) if molecular_weight else 0
         except ValueError:
@@ -395,7 +415,118 @@ class PNECTool:
                 "assessment_factor": self.pnec_reference_data["assessment_factors"]["chronic"]
             },
             "methodology": "简化估算方法（仅用于演示）",
-            "note": "实际PNEC计算需要专业的毒性数据库和评估方法"
+            "note": "实际PNEC计算需要专业的毒性数据库和评估方法",
+            "data_source": "estimate"
+        }
+    
+    def _valence_entry(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        将同一元素的参考记录整理为价态分析条目
+        
+        Args:
+            records (List[Dict[str, Any]]): 同一元素的PNEC参考记录
+            
+        Returns:
+            Dict[str, Any]: 价态、CAS号和各价态的毒性数据
+        """
+        species = [record["species"] or record["substance"] for record in records]
+        return {
+            "valences": list(dict.fromkeys(species)),
+            "cas_numbers": list(dict.fromkeys(record["cas"] for record in records if record["cas"])),
+            "toxicity_data": {
+                name: {
+                    "value": record["value"],
+                    "unit": record["unit"],
+                    "description": f"{name}在{record['compartment']}中的预测无效应浓度",
+                    "source": record["source"]
+                }
+                for name, record in zip(species, records)
+            }
+        }
+    
+    def _pnec_from_records(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        由参考记录构造PNEC数据（取最保守的值作为关键PNEC）
+        
+        Args:
+            records (List[Dict[str, Any]]): PNEC参考记录
+            
+        Returns:
+            Dict[str, Any]: PNEC数据
+        """
+        entries = [
+            {
+                "substance": record["substance"],
+                "element": record["element"],
+                "species": record["species"],
+                "compartment": record["compartment"],
+                "value": record["value"],
+                "unit": record["unit"],
+                "value_mg_l": record["value_mg_l"],
+                "assessment_factor": record["assessment_factor"],
+                "endpoint": record["endpoint"],
+                "source": record["source"]
+            }
+            for record in records
+        ]
+        comparable = [entry for entry in entries if entry["value_mg_l"] is not None]
+        critical = min(comparable, key=lambda entry: entry["value_mg_l"]) if comparable else entries[0]
+        return {
+            "reference_values": entries,
+            "critical_pnec": {
+                "species": critical["species"] or critical["substance"],
+                "value": critical["value"],
+                "unit": critical["unit"],
+                "value_mg_l": critical["value_mg_l"],
+                "description": "参考数据中最保守（最低）的预测无效应浓度"
+            },
+            "methodology": "本地PNEC参考数据库",
+            "sources": list(dict.fromkeys(entry["source"] for entry in entries if entry["source"])),
+            "data_source": "local_database"
+        }
+    
+    def _local_result(self,
+                      records: List[Dict[str, Any]],
+                      cas_number: Optional[str] = None,
+                      compound_name: Optional[str] = None,
+                      molecular_formula: Optional[str] = None) -> Dict[str, Any]:
+        """
+        由本地参考数据库的记录构造查询结果（不访问网络）
+        
+        Args:
+            records (List[Dict[str, Any]]): 匹配的PNEC参考记录
+            cas_number (str, optional): 查询的CAS号
+            compound_name (str, optional): 查询的化合物名称
+            molecular_formula (str, optional): 化学式（按化学式查询时）
+            
+        Returns:
+            Dict[str, Any]: 与网络查询格式相同的PNEC结果
+        """
+        metal_elements = {}
+        for record in records:
+            if record["element"]:
+                metal_elements.setdefault(record["element"], []).append(record)
+        local_composition = composition(molecular_formula) if molecular_formula else None
+        return {
+            "success": True,
+            # 按化学式查询时记录的是元素的CAS号，不代表该化合物
+            "cas_number": cas_number or ("" if molecular_formula else records[0]["cas"] or ""),
+            "compound_name": compound_name or records[0]["substance"],
+            "molecular_formula": molecular_formula or "",
+            "molecular_weight": local_composition["molecular_weight"] if local_composition else "",
+            "molecular_weight_source": "local" if local_composition else "",
+            "composition": local_composition,
+            "valence_analysis": {
+                "success": True,
+                "compound_name": compound_name or records[0]["substance"],
+                "molecular_formula": molecular_formula or "",
+                "metal_elements": {
+                    element: self._valence_entry(element_records)
+                    for element, element_records in metal_elements.items()
+                }
+            },
+            "pnec_data": self._pnec_from_records(records),
+            "data_source": "local_database"
         }
 
 # 全局实例
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+风险商计算引擎 / Risk Quotient Engine
+基于NumPy对候选材料中每种金属计算PEC/PNEC风险商，在一次向量化调用中覆盖浸出比例、催化剂投加量和水体体积的完整网格，
+并给出蒙特卡洛分位数
+/ NumPy-backed PEC/PNEC risk quotients for every metal of a candidate material, covering the full grid of leaching
+fractions, catalyst doses and water volumes in one vectorized call, plus Monte Carlo percentiles
+
+模型 / Model:
+    PEC (mg/L) = 投加量(g) × 1000 × 金属质量分数 × 浸出比例 / (水体体积(L) × 稀释因子)
+               / dose (g) × 1000 × metal mass fraction × leached fraction / (water volume (L) × dilution factor)
+    RQ = PEC / PNEC，危害指数 HI = Σ RQ（对所有金属求和） / hazard index HI = Σ RQ over all metals
+
+分布规格 / Distribution specs (leaching, dose, volume):
+    0.05                                   固定值 / fixed value
+    (0.01, 0.1)                            均匀分布 / uniform
+    {"distribution": "loguniform", "low": 1e-3, "high": 0.1}
+    {"distribution": "lognormal", "median": 0.02, "gsd": 2.0}
+    {"distribution": "triangular", "low": 0.0, "mode": 0.02, "high": 0.1}
+    {"distribution": "beta", "alpha": 2, "beta": 50}
+    浸出规格也可以是元素到上述规格的映射 / leaching may also map elements to any of the above
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+from src.tools.pnec_database import PNECDatabase, get_pnec_database
+from src.utils.composition import composition
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    # NumPy未安装，风险商计算引擎将不可用
+    # NumPy not installed, the risk quotient engine will be unavailable
+    NUMPY_AVAILABLE = False
+    logger.warning("NumPy未安装，风险商计算引擎将不可用 / NumPy not installed, risk quotient engine will be unavailable")
+
+# 风险商阈值：RQ ≥ 1 表示存在潜在风险 / Risk quotient threshold: RQ ≥ 1 indicates a potential risk
+RQ_THRESHOLD = 1.0
+
+DistributionSpec = Union[float, Sequence[float], Dict[str, Any]]
+
+
+def _risk_level(value: float) -> str:
+    """按风险商（或危害指数）划分风险等级 / Risk level of a risk quotient (or hazard index)"""
+    if value < 0.1:
+        return "low"
+    if value < RQ_THRESHOLD:
+        return "moderate"
+    if value < 10:
+        return "high"
+    return "very_high"
+
+
+class RiskQuotientEngine:
+    """风险商计算引擎类 / Risk Quotient Engine Class"""
+
+    def __init__(self, database: Optional[PNECDatabase] = None):
+        """
+        初始化风险商计算引擎 / Initialize the risk quotient engine
+
+        Args:
+            database (PNECDatabase, optional): PNEC参考数据库，默认使用共享数据库 / PNEC reference database, shared one by default
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy未安装，请运行 'pip install numpy'")
+        self.database = database or get_pnec_database()
+
+    def _metal_fractions(self, material: Union[str, Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        解析材料组成：接受化学式或 composition() 的结果 / Resolve the composition from a formula or a composition() result
+
+        Returns:
+            Tuple[Optional[Dict], Optional[str]]: (组成, 错误信息) / (composition, error message)
+        """
+        material_composition = composition(material) if isinstance(material, str) else material
+        if not material_composition or "mass_fractions" not in material_composition:
+            return None, f"无法解析材料组成: {material}"
+        if not material_composition.get("metals"):
+            return None, f"材料中不含金属元素: {material_composition.get('formula', material)}"
+        return material_composition, None
+
+    def pnec_for(self,
+                 elements: Iterable[str],
+                 pnec_overrides: Optional[Dict[str, float]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各元素的关键PNEC（参考数据中最保守的值） / Get the critical PNEC of each element (most conservative reference value)
+
+        Args:
+            elements (Iterable[str]): 元素符号 / Element symbols
+            pnec_overrides (Dict[str, float], optional): 元素到PNEC（mg/L）的覆盖值 / Element to PNEC (mg/L) overrides
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 元素到 {"value_mg_l", "species", "source"} 的映射，无数据的元素不包含在内
+            / Element to {"value_mg_l", "species", "source"}, elements without data are left out
+        """
+        overrides = pnec_overrides or {}
+        found = {}
+        for element in elements:
+            if element in overrides:
+                found[element] = {"value_mg_l": float(overrides[element]), "species": element, "source": "override"}
+                continue
+            records = [record for record in self.database.by_element(element) if record["value_mg_l"]]
+            if records:
+                critical = min(records, key=lambda record: record["value_mg_l"])
+                found[element] = {
+                    "value_mg_l": critical["value_mg_l"],
+                    "species": critical["species"] or critical["substance"],
+                    "source": critical["source"]
+                }
+        return found
+
+    def _prepare(self,
+                 material: Union[str, Dict[str, Any]],
+                 pnec_overrides: Optional[Dict[str, float]]) -> Dict[str, Any]:
+        """准备金属列表、质量分数向量和PNEC向量 / Prepare the metal list, mass-fraction vector and PNEC vector"""
+        material_composition, error = self._metal_fractions(material)
+        if error:
+            return {"error": error}
+        pnec = self.pnec_for(material_composition["metals"], pnec_overrides)
+        metals = [metal for metal in material_composition["metals"] if metal in pnec]
+        if not metals:
+            return {"error": f"材料中的金属元素均无PNEC数据: {', '.join(material_composition['metals'])}"}
+        return {
+            "composition": material_composition,
+            "metals": metals,
+            "missing_pnec": [metal for metal in material_composition["metals"] if metal not in pnec],
+            "pnec": {metal: pnec[metal] for metal in metals},
+            "fractions": np.array([material_composition["mass_fractions"][metal] for metal in metals]),
+            "pnec_values": np.array([pnec[metal]["value_mg_l"] for metal in metals])
+        }
+
+    @staticmethod
+    def _grid_axis(values: Union[float, Sequence[float]], name: str,
+                   upper: Optional[float] = None, allow_zero: bool = False) -> "np.ndarray":
+        """将网格轴转换为一维数组并检查取值范围 / Convert a grid axis to a 1-D array and check its range"""
+        axis = np.atleast_1d(np.asarray(values, dtype=float)).ravel()
+        if axis.size == 0:
+            raise ValueError(f"{name}不能为空")
+        if np.any(axis < 0):
+            raise ValueError(f"{name}不能为负")
+        if not allow_zero and np.any(axis == 0):
+            raise ValueError(f"{name}必须为正数")
+        if upper is not None and np.any(axis > upper):
+            raise ValueError(f"{name}不能大于{upper}")
+        return axis
+
+    def _grid(self,
+              prepared: Dict[str, Any],
+              doses_g: Sequence[float],
+              volumes_l: Sequence[float],
+              leach_fractions: Sequence[float],
+              dilution: float,
+              include_grid: bool) -> Dict[str, Any]:
+        """在完整网格上计算风险商（轴顺序：金属 × 浸出比例 × 投加量 × 体积） / Risk quotients over the full grid
+        (axes: metal × leaching fraction × dose × volume)"""
+        leach = self._grid_axis(leach_fractions, "浸出比例", upper=1.0, allow_zero=True)
+        doses = self._grid_axis(doses_g, "投加量", allow_zero=True)
+        volumes = self._grid_axis(volumes_l, "水体体积")
+
+        # 单位金属PEC → 风险商，一次广播完成 / Per-metal PEC to risk quotient in a single broadcast
+        concentration = (doses[:, None] * 1000.0 / (volumes[None, :] * dilution))          # (dose, volume) mg/L
+        potency = prepared["fractions"] / prepared["pnec_values"]                           # (metal,)
+        rq = potency[:, None, None, None] * leach[None, :, None, None] * concentration[None, None, :, :]
+        hazard_index = rq.sum(axis=0)
+
+        per_metal = {}
+        for index, metal in enumerate(prepared["metals"]):
+            worst = np.unravel_index(int(np.argmax(rq[index])), rq[index].shape)
+            per_metal[metal] = {
+                "pnec_mg_l": prepared["pnec"][metal]["value_mg_l"],
+                "mass_fraction": float(prepared["fractions"][index]),
+                "min_rq": float(rq[index].min()),
+                "max_rq": float(rq[index].max()),
+                "exceedance_fraction": float(np.mean(rq[index] >= RQ_THRESHOLD)),
+                "worst_case": {
+                    "leach_fraction": float(leach[worst[0]]),
+                    "dose_g": float(doses[worst[1]]),
+                    "volume_l": float(volumes[worst[2]])
+                }
+            }
+
+        # 各浸出比例下使 HI < 1 的最大投加浓度（g/L） / Largest dose concentration (g/L) keeping HI < 1 at each leaching fraction
+        hazard_per_g_l = 1000.0 * float(potency.sum()) / dilution
+        with np.errstate(divide="ignore"):
+            max_safe = np.where(leach > 0, RQ_THRESHOLD / (hazard_per_g_l * leach), np.inf)
+
+        result = {
+            "shape": {"metals": len(prepared["metals"]), "leach_fractions": int(leach.size),
+                      "doses": int(doses.size), "volumes": int(volumes.size)},
+            "scenarios": int(hazard_index.size),
+            "per_metal": per_metal,
+            "hazard_index": {
+                "min": float(hazard_index.min()),
+                "max": float(hazard_index.max()),
+                "exceedance_fraction": float(np.mean(hazard_index >= RQ_THRESHOLD)),
+                "risk_level": _risk_level(float(hazard_index.max()))
+            },
+            "max_safe_dose_g_per_l": {
+                str(float(fraction)): (float(value) if np.isfinite(value) else None)
+                for fraction, value in zip(leach, max_safe)
+            }
+        }
+        if include_grid:
+            result["axes"] = {"leach_fractions": leach.tolist(), "doses_g": doses.tolist(), "volumes_l": volumes.tolist()}
+            result["rq"] = {metal: rq[index].tolist() for index, metal in enumerate(prepared["metals"])}
+            result["hazard_index"]["grid"] = hazard_index.tolist()
+        return result
+
+    @staticmethod
+    def _sample(spec: DistributionSpec, size: int, rng: "np.random.Generator", name: str) -> "np.ndarray":
+        """
+        按分布规格抽样 / Draw samples from a distribution spec
+
+        Args:
+            spec (DistributionSpec): 固定值、(low, high) 均匀区间或分布字典 / Fixed value, (low, high) uniform range or distribution dict
+            size (int): 样本数 / Number of samples
+            rng (np.random.Generator): 随机数生成器 / Random generator
+            name (str): 参数名（用于错误信息） / Parameter name (for error messages)
+
+        Returns:
+            np.ndarray: 样本 / Samples
+        """
+        if isinstance(spec, (int, float)):
+            return np.full(size, float(spec))
+        if isinstance(spec, (list, tuple)):
+            if len(spec) != 2:
+                raise ValueError(f"{name}的区间必须为 (low, high)")
+            return rng.uniform(float(spec[0]), float(spec[1]), size)
+        if not isinstance(spec, dict):
+            raise ValueError(f"无法识别的{name}分布: {spec}")
+
+        distribution = str(spec.get("distribution", "uniform")).lower()
+        if distribution == "fixed":
+            return np.full(size, float(spec["value"]))
+        if distribution == "uniform":
+            return rng.uniform(float(spec["low"]), float(spec["high"]), size)
+        if distribution == "loguniform":
+            return np.exp(rng.uniform(np.log(float(spec["low"])), np.log(float(spec["high"])), size))
+        if distribution == "lognormal":
+            # 以中位数和几何标准差参数化 / Parameterized by median and geometric standard deviation
+            return rng.lognormal(np.log(float(spec["median"])), np.log(float(spec.get("gsd", 2.0))), size)
+        if distribution == "triangular":
+            return rng.triangular(float(spec["low"]), float(spec["mode"]), float(spec["high"]), size)
+        if distribution == "beta":
+            return rng.beta(float(spec["alpha"]), float(spec["beta"]), size)
+        raise ValueError(f"不支持的{name}分布类型: {distribution}")
+
+    def _monte_carlo(self,
+                     prepared: Dict[str, Any],
+                     dose_g: DistributionSpec,
+                     volume_l: DistributionSpec,
+                     leaching: Union[DistributionSpec, Dict[str, DistributionSpec]],
+                     dilution: float,
+                     n_samples: int,
+                     percentiles: Sequence[float],
+                     seed: Optional[int]) -> Dict[str, Any]:
+        """蒙特卡洛抽样计算风险商分位数（轴顺序：金属 × 样本） / Monte Carlo risk quotient percentiles (axes: metal × sample)"""
+        if n_samples <= 0:
+            raise ValueError("样本数必须为正整数")
+        rng = np.random.default_rng(seed)
+        metals = prepared["metals"]
+
+        doses = self._sample(dose_g, n_samples, rng, "投加量")
+        volumes = self._sample(volume_l, n_samples, rng, "水体体积")
+        if np.any(doses < 0) or np.any(volumes <= 0):
+            raise ValueError("投加量不能为负，水体体积必须为正数")
+
+        # 浸出规格可以按元素分别给出 / Leaching specs may be given per element
+        per_element = isinstance(leaching, dict) and "distribution" not in leaching
+        if per_element:
+            missing = [metal for metal in metals if metal not in leaching]
+            if missing:
+                raise ValueError(f"缺少以下元素的浸出分布: {', '.join(missing)}")
+            leach = np.vstack([self._sample(leaching[metal], n_samples, rng, f"{metal}浸出比例") for metal in metals])
+        else:
+            leach = np.broadcast_to(self._sample(leaching, n_samples, rng, "浸出比例"), (len(metals), n_samples))
+        leach = np.clip(leach, 0.0, 1.0)
+
+        concentration = doses * 1000.0 / (volumes * dilution)                               # (sample,) mg/L
+        rq = (prepared["fractions"] / prepared["pnec_values"])[:, None] * leach * concentration[None, :]
+        hazard_index = rq.sum(axis=0)
+
+        levels = [float(p) for p in percentiles]
+        metal_percentiles = np.percentile(rq, levels, axis=1)                                 # (percentile, metal)
+        exceedance = np.mean(rq >= RQ_THRESHOLD, axis=1)
+        hazard_percentiles = np.percentile(hazard_index, levels)
+
+        return {
+            "n_samples": int(n_samples),
+            "seed": seed,
+            "per_metal": {
+                metal: {
+                    "percentiles": {f"p{level:g}": float(metal_percentiles[p_index, index]) for p_index, level in enumerate(levels)},
+                    "mean_rq": float(rq[index].mean()),
+                    "probability_exceedance": float(exceedance[index])
+                }
+                for index, metal in enumerate(metals)
+            },
+            "hazard_index": {
+                "percentiles": {f"p{level:g}": float(value) for level, value in zip(levels, hazard_percentiles)},
+                "mean": float(hazard_index.mean()),
+                "probability_exceedance": float(np.mean(hazard_index >= RQ_THRESHOLD)),
+                # 按报告的最高分位数定级，与分位数的给出顺序无关 / Graded on the highest reported percentile, whatever the order
+                "risk_level": _risk_level(float(hazard_percentiles.max()))
+            }
+        }
+
+    def grid(self,
+             material: Union[str, Dict[str, Any]],
+             doses_g: Sequence[float],
+             volumes_l: Sequence[float],
+             leach_fractions: Sequence[float],
+             dilution: float = 1.0,
+             pnec_overrides: Optional[Dict[str, float]] = None,
+             include_grid: bool = False) -> Dict[str, Any]:
+        """
+        在投加量 × 体积 × 浸出比例的完整网格上计算风险商 / Compute risk quotients over the full dose × volume × leaching grid
+
+        Args:
+            material (str | Dict): 化学式或 composition() 的结果 / Formula or a composition() result
+            doses_g (Sequence[float]): 催化剂投加量（g，可以为0） / Catalyst doses (g, zero allowed)
+            volumes_l (Sequence[float]): 水体体积（L） / Water volumes (L)
+            leach_fractions (Sequence[float]): 浸出比例（0-1） / Leached fractions (0-1)
+            dilution (float): 稀释因子 / Dilution factor
+            pnec_overrides (Dict[str, float], optional): 元素到PNEC（mg/L）的覆盖值 / Element to PNEC (mg/L) overrides
+            include_grid (bool): 是否返回完整的风险商网格 / Whether to return the full risk quotient grid
+
+        Returns:
+            Dict[str, Any]: 各金属的风险商统计、危害指数和安全投加浓度 / Per-metal statistics, hazard index and safe dose concentrations
+        """
+        return self.evaluate(material, doses_g, volumes_l, leach_fractions, dilution=dilution,
+                             pnec_overrides=pnec_overrides, include_grid=include_grid, n_samples=0)
+
+    def monte_carlo(self,
+                    material: Union[str, Dict[str, Any]],
+                    dose_g: DistributionSpec,
+                    volume_l: DistributionSpec,
+                    leaching: Union[DistributionSpec, Dict[str, DistributionSpec]],
+                    n_samples: int = 10000,
+                    percentiles: Sequence[float] = (5, 50, 95),
+                    seed: Optional[int] = None,
+                    dilution: float = 1.0,
+                    pnec_overrides: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        蒙特卡洛估计风险商分布 / Monte Carlo estimate of the risk quotient distribution
+
+        Args:
+            material (str | Dict): 化学式或 composition() 的结果 / Formula or a composition() result
+            dose_g (DistributionSpec): 投加量（g）分布 / Dose (g) distribution
+            volume_l (DistributionSpec): 水体体积（L）分布 / Water volume (L) distribution
+            leaching (DistributionSpec | Dict): 浸出比例分布，或元素到分布的映射 / Leaching distribution, or element to distribution
+            n_samples (int): 样本数 / Number of samples
+            percentiles (Sequence[float]): 报告的分位数 / Percentiles to report
+            seed (int, optional): 随机种子 / Random seed
+            dilution (float): 稀释因子 / Dilution factor
+            pnec_overrides (Dict[str, float], optional): 元素到PNEC（mg/L）的覆盖值 / Element to PNEC (mg/L) overrides
+
+        Returns:
+            Dict[str, Any]: 各金属与危害指数的分位数和超标概率 / Percentiles and exceedance probabilities per metal and for the hazard index
+        """
+        start_time = time.perf_counter()
+        try:
+            if dilution <= 0:
+                raise ValueError("稀释因子必须为正数")
+            prepared = self._prepare(material, pnec_overrides)
+            if "error" in prepared:
+                return prepared
+            result = self._common(prepared)
+            result["monte_carlo"] = self._monte_carlo(prepared, dose_g, volume_l, leaching, dilution,
+                                                      n_samples, percentiles, seed)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"蒙特卡洛风险商计算失败: {e}")
+            return {"error": f"蒙特卡洛风险商计算失败: {str(e)}"}
+        result["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000, 3)
+        return result
+
+    def evaluate(self,
+                 material: Union[str, Dict[str, Any]],
+                 doses_g: Sequence[float],
+                 volumes_l: Sequence[float],
+                 leach_fractions: Sequence[float],
+                 leaching: Optional[Union[DistributionSpec, Dict[str, DistributionSpec]]] = None,
+                 n_samples: int = 10000,
+                 percentiles: Sequence[float] = (5, 50, 95),
+                 seed: Optional[int] = None,
+                 dilution: float = 1.0,
+                 pnec_overrides: Optional[Dict[str, float]] = None,
+                 include_grid: bool = False) -> Dict[str, Any]:
+        """
+        一次调用完成网格计算和蒙特卡洛分析 / Grid evaluation and Monte Carlo analysis in one call
+
+        蒙特卡洛的投加量和体积在网格范围内按均匀分布抽样，浸出比例默认在网格范围内均匀抽样，也可由 leaching 指定分布。
+        / Monte Carlo draws doses and volumes uniformly within the grid ranges; leaching is drawn uniformly within the
+        grid range unless a distribution is given via leaching.
+
+        Args:
+            material (str | Dict): 化学式或 composition() 的结果 / Formula or a composition() result
+            doses_g (Sequence[float]): 催化剂投加量（g，可以为0） / Catalyst doses (g, zero allowed)
+            volumes_l (Sequence[float]): 水体体积（L） / Water volumes (L)
+            leach_fractions (Sequence[float]): 浸出比例（0-1） / Leached fractions (0-1)
+            leaching (DistributionSpec | Dict, optional): 蒙特卡洛使用的浸出分布 / Leaching distribution for Monte Carlo
+            n_samples (int): 蒙特卡洛样本数，0表示只计算网格 / Monte Carlo samples, 0 for the grid only
+            percentiles (Sequence[float]): 报告的分位数 / Percentiles to report
+            seed (int, optional): 随机种子 / Random seed
+            dilution (float): 稀释因子 / Dilution factor
+            pnec_overrides (Dict[str, float], optional): 元素到PNEC（mg/L）的覆盖值 / Element to PNEC (mg/L) overrides
+            include_grid (bool): 是否返回完整的风险商网格 / Whether to return the full risk quotient grid
+
+        Returns:
+            Dict[str, Any]: 网格结果和（可选的）蒙特卡洛结果 / Grid results and (optionally) Monte Carlo results
+        """
+        start_time = time.perf_counter()
+        try:
+            if dilution <= 0:
+                raise ValueError("稀释因子必须为正数")
+            prepared = self._prepare(material, pnec_overrides)
+            if "error" in prepared:
+                return prepared
+            result = self._common(prepared)
+            result["grid"] = self._grid(prepared, doses_g, volumes_l, leach_fractions, dilution, include_grid)
+            if n_samples:
+                doses = self._grid_axis(doses_g, "投加量", allow_zero=True)
+                volumes = self._grid_axis(volumes_l, "水体体积")
+                leach = self._grid_axis(leach_fractions, "浸出比例", upper=1.0, allow_zero=True)
+                result["monte_carlo"] = self._monte_carlo(
+                    prepared,
+                    (float(doses.min()), float(doses.max())),
+                    (float(volumes.min()), float(volumes.max())),
+                    leaching if leaching is not None else (float(leach.min()), float(leach.max())),
+                    dilution, n_samples, percentiles, seed
+                )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"风险商计算失败: {e}")
+            return {"error": f"风险商计算失败: {str(e)}"}
+        result["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000, 3)
+        return result
+
+    @staticmethod
+    def _common(prepared: Dict[str, Any]) -> Dict[str, Any]:
+        """结果中与计算方式无关的部分 / Parts of the result shared by all evaluation modes"""
+        return {
+            "success": True,
+            "formula": prepared["composition"]["formula"],
+            "metals": list(prepared["metals"]),
+            "missing_pnec": list(prepared["missing_pnec"]),
+            "pnec": prepared["pnec"],
+            "model": "PEC = dose × 1000 × w_metal × f_leach / (V × dilution); RQ = PEC / PNEC; HI = ΣRQ"
+        }
+
+
+# 创建全局实例 / Create global instance
+_risk_quotient_engine = None
+_risk_quotient_engine_lock = threading.Lock()
+
+
+def get_risk_quotient_engine() -> RiskQuotientEngine:
+    """
+    获取共享的风险商计算引擎 / Get the shared risk quotient engine
+
+    Returns:
+        RiskQuotientEngine: 风险商计算引擎 / Risk quotient engine
+    """
+    global _risk_quotient_engine
+    with _risk_quotient_engine_lock:
+        if _risk_quotient_engine is None:
+            _risk_quotient_engine = RiskQuotientEngine()
+        return _risk_quotient_engine
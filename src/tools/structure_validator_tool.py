@@ -5,10 +5,11 @@
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.tools.materials_project_tool import get_materials_project_tool
 from src.tools.pubchem_tool import get_pubchem_tool
 from src.tools.material_identifier_tool import get_material_identifier_tool
+from src.utils.formula_parser import METAL_ELEMENTS, ORGANIC_ELEMENTS, extract_elements
 
 # 配置日志
 logging.basicConfig(level=logging.WARNING)
@@ -81,7 +82,12 @@ class StructureValidatorTool:
                 result["reason"] = "标识符工具不可用，使用简单判断"
             
             # 根据材料类型使用相应的验证方法
-            if material_type == "metal":
+            # 标识符工具已在数据库中验证过该材料时直接复用其结果，不再重复查询
+            reused_result = self._structure_from_identification(identification) if self.identifier_tool else None
+            if reused_result is not None:
+                result.update(reused_result)
+                result["validation_confidence"] = "high"
+            elif material_type == "metal":
                 # 金属材料验证
                 validation_result = self._validate_metal_structure(material_formula)
                 result.update(validation_result)
@@ -136,6 +142,37 @@ class StructureValidatorTool:
                 "action_description": f"验证过程中出现错误: {str(e)}，需要人工检查"
             }
     
+    def _structure_from_identification(self, identification: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        由已验证的材料标识结果构造结构验证结果（标识符工具查询的是同一数据库）
+        
+        Args:
+            identification (Dict[str, Any]): 材料标识符工具的结果
+            
+        Returns:
+            Optional[Dict[str, Any]]: 验证结果，标识结果未经验证时返回None
+        """
+        if identification.get("validation_status") != "validated" or not identification.get("is_verified"):
+            return None
+        identifier_type = identification.get("identifier_type")
+        if identifier_type == "MP-ID":
+            return {
+                "valid": True,
+                "type": "metal",
+                "data": identification.get("additional_info"),
+                "source": "Materials Project",
+                "reason": "在Materials Project中找到匹配的材料结构（复用材料标识结果）"
+            }
+        if identifier_type == "CAS":
+            return {
+                "valid": True,
+                "type": "organic",
+                "data": identification.get("additional_info"),
+                "source": "PubChem",
+                "reason": "在PubChem中找到匹配的化合物结构（复用材料标识结果）"
+            }
+        return None
+    
     def _validate_metal_structure(self, formula: str) -> Dict[str, Any]:
         """
         验证金属材料结构
@@ -261,21 +298,11 @@ class StructureValidatorTool:
         # 提取元素符号
         elements = self._extract_elements(query)
         
-        # 常见金属元素
-        metal_elements = ['Li', 'Be', 'Na', 'Mg', 'Al', 'K', 'Ca', 'Sc', 'Ti', 'V', 'Cr', 'Mn', 'Fe', 'Co', 'Ni', 'Cu', 'Zn', 
-                         'Ga', 'Rb', 'Sr', 'Y', 'Zr', 'Nb', 'Mo', 'Tc', 'Ru', 'Rh', 'Pd', 'Ag', 'Cd', 'In', 'Sn', 'Cs', 'Ba',
-                         'La', 'Ce', 'Pr', 'Nd', 'Pm', 'Sm', 'Eu', 'Gd', 'Tb', 'Dy', 'Ho', 'Er', 'Tm', 'Yb', 'Lu', 'Hf', 'Ta',
-                         'W', 'Re', 'Os', 'Ir', 'Pt', 'Au', 'Hg', 'Tl', 'Pb', 'Bi', 'Po', 'Fr', 'Ra', 'Ac', 'Th', 'Pa', 'U',
-                         'Np', 'Pu', 'Am', 'Cm', 'Bk', 'Cf', 'Es', 'Fm', 'Md', 'No', 'Lr']
-        
-        # 常见非金属元素（通常构成有机物）
-        non_metal_elements = ['H', 'C', 'N', 'O', 'F', 'P', 'S', 'Cl', 'Br', 'I']
-        
         # 判断是否包含金属元素
-        has_metal = any(element in metal_elements for element in elements)
+        has_metal = any(element in METAL_ELEMENTS for element in elements)
         
         # 判断是否主要由非金属元素组成（可能是有机物）
-        non_metal_count = sum(1 for element in elements if element in non_metal_elements)
+        non_metal_count = sum(1 for element in elements if element in ORGANIC_ELEMENTS)
         total_elements = len(elements)
         
         # 如果包含金属元素，认为是金属材料
@@ -299,23 +326,7 @@ class StructureValidatorTool:
         Returns:
             list: 元素符号列表
         """
-        import re
-        # 匹配常见的元素符号（1-2个字母，首字母大写）
-        elements = re.findall(r'[A-Z][a-z]?', query)
-        # 过滤掉可能不是元素的字符串
-        valid_elements = []
-        # 常见元素列表（简化版）
-        common_elements = ['H', 'He', 'Li', 'Be', 'B', 'C', 'N', 'O', 'F', 'Ne', 'Na', 'Mg', 'Al', 'Si', 'P', 'S', 'Cl', 'Ar',
-                          'K', 'Ca', 'Sc', 'Ti', 'V', 'Cr', 'Mn', 'Fe', 'Co', 'Ni', 'Cu', 'Zn', 'Ga', 'Ge', 'As', 'Se', 'Br', 'Kr',
-                          'Rb', 'Sr', 'Y', 'Zr', 'Nb', 'Mo', 'Tc', 'Ru', 'Rh', 'Pd', 'Ag', 'Cd', 'In', 'Sn', 'Sb', 'Te', 'I', 'Xe',
-                          'Cs', 'Ba', 'La', 'Ce', 'Pr', 'Nd', 'Pm', 'Sm', 'Eu', 'Gd', 'Tb', 'Dy', 'Ho', 'Er', 'Tm', 'Yb', 'Lu',
-                          'Hf', 'Ta', 'W', 'Re', 'Os', 'Ir', 'Pt', 'Au', 'Hg', 'Tl', 'Pb', 'Bi', 'Po', 'At', 'Rn']
-        
-        for element in elements:
-            if element in common_elements:
-                valid_elements.append(element)
-        
-        return list(set(valid_elements))  # 去重
+        return extract_elements(query)
 
 # 全局实例
 _structure_validator_tool = None
@@ -4,8 +4,16 @@
 提供统一的工具调用逻辑，确保所有评估代理使用相同的工具调用流程
 """
 
+import copy
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from src.config.config import Config
+from src.utils.formula_parser import METAL_ELEMENTS, canonical_key, extract_elements
+from src.utils.material_context import ensure_material_context
 
 # 延迟导入以避免循环导入
 def get_material_identifier_tool():
@@ -42,6 +50,29 @@ from src.utils.tool_call_spec import ToolCallSpec
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# 工具调用图中的一个步骤：(依赖的步骤名称, 以已完成结果为参数的调用函数)
+ToolStep = Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Any]]
+
+# 所有执行器共享的工具调用线程池
+_tool_pool = None
+_tool_pool_lock = threading.Lock()
+
+def get_tool_pool() -> ThreadPoolExecutor:
+    """
+    获取（必要时创建）共享的工具调用线程池
+    
+    Returns:
+        ThreadPoolExecutor: 工具调用线程池
+    """
+    global _tool_pool
+    with _tool_pool_lock:
+        if _tool_pool is None:
+            _tool_pool = ThreadPoolExecutor(
+                max_workers=max(1, Config.ASSESSMENT_TOOL_WORKERS),
+                thread_name_prefix="ecomats-tool"
+            )
+        return _tool_pool
+
 class AssessmentToolExecutor:
     """评估工具执行器类 - 提供统一的工具调用逻辑"""
     
@@ -59,11 +90,15 @@ class AssessmentToolExecutor:
         """
         执行评估代理的强制工具调用序列
         
+        工具调用按依赖关系组成一个小型DAG并在线程池中并行执行：只有数据库查询（MP或PubChem）
+        依赖材料标识结果，其余工具相互独立。单个工具超时或失败时记录错误并返回其余工具的结果，
+        总耗时取决于最慢的分支而不是所有工具耗时之和。
+        
         Args:
             material_formula (str): 材料化学式
             
         Returns:
-            Dict[str, Any]: 所有工具调用的结果
+            Dict[str, Any]: 所有工具调用的结果（timings 为各工具耗时，单位秒）
         """
         results = {
             "material_identifier": None,
@@ -73,49 +108,255 @@ class AssessmentToolExecutor:
             "pnec": None,
             "data_validator": None,
             "material_search": None,
-            "errors": []
+            "errors": [],
+            "timings": {}
         }
         
-        try:
+        def material_type(done: Dict[str, Any]) -> str:
+            return (done.get("material_identifier") or {}).get("material_type", "unknown")
+        
+        # 创建一个包含材料信息的数据字典用于验证
+        material_data = {
+            "molecular_formula": material_formula,
+            "material_name": material_formula
+        }
+        
+        steps: Dict[str, ToolStep] = {
             # 1. 材料标识符工具调用
-            results["material_identifier"] = self.material_identifier_tool.identify_material(material_formula)
-            
+            "material_identifier": ((), lambda done: self.material_identifier_tool.identify_material(material_formula)),
             # 2. 结构验证工具调用
-            results["structure_validator"] = self.structure_validator_tool.validate_structure_exists(material_formula)
-            
+            "structure_validator": ((), lambda done: self.structure_validator_tool.validate_structure_exists(material_formula)),
             # 3. 根据材料类型调用相应的数据库工具
-            material_type = results["material_identifier"].get("material_type", "unknown")
-            if material_type == "metal":
-                results["materials_project"] = self.materials_project_tool.search_materials(formula=material_formula, limit=5)
-            elif material_type == "organic":
-                results["pubchem"] = self.pubchem_tool.search_compound(material_formula)
-            
-            # 4. 调用PNEC工具（环境风险评估）
-            # 根据材料类型调用相应的PNEC查询方法
-            if material_type == "organic":
-                results["pnec"] = self.pnec_tool.get_pnec_by_name(material_formula)
-            else:
-                # 对于金属材料，我们可能需要提取元素符号来查询
-                # 这里简化处理，直接使用名称查询
-                results["pnec"] = self.pnec_tool.get_pnec_by_name(material_formula)
-            
+            "materials_project": (("material_identifier",), lambda done: (
+                self.materials_project_tool.search_materials(formula=material_formula, limit=5)
+                if material_type(done) == "metal" else None
+            )),
+            "pubchem": (("material_identifier",), lambda done: (
+                self.pubchem_tool.search_compound(material_formula)
+                if material_type(done) == "organic" else None
+            )),
+            # 4. 调用PNEC工具（环境风险评估），金属与有机材料目前都按名称查询
+            "pnec": ((), lambda done: self.pnec_tool.get_pnec_by_name(material_formula)),
             # 5. 调用数据验证工具
-            # 创建一个包含材料信息的数据字典用于验证
-            material_data = {
-                "molecular_formula": material_formula,
-                "material_name": material_formula
-            }
-            results["data_validator"] = self.data_validator_tool.validate_chemical_data(material_data)
-            
+            "data_validator": ((), lambda done: self.data_validator_tool.validate_chemical_data(material_data)),
             # 6. 调用材料搜索工具
-            results["material_search"] = self.material_search_tool.search_similar_materials(material_formula)
-            
+            "material_search": ((), lambda done: self.material_search_tool.search_similar_materials(material_formula)),
+        }
+        
+        try:
+            # 标识结果与数据库命中在运行级材料上下文中共享，结构验证不再重新识别材料
+            with ensure_material_context():
+                outputs, errors, timings = self._run_tool_graph(steps)
+            results.update(outputs)
+            results["errors"].extend(f"{name} {message}" for name, message in errors.items())
+            results["timings"] = timings
         except Exception as e:
             results["errors"].append(f"工具调用过程中出现错误: {str(e)}")
             logger.error(f"评估工具调用失败: {e}")
         
         return results
     
+    def execute_for_many(self, material_formulas: List[str], mp_limit: int = 5) -> Dict[str, Dict[str, Any]]:
+        """
+        批量执行多个材料的强制工具调用
+        
+        化学式按规范键去重（Fe2O3、O3Fe2、Fe₂O₃只评估一次），先并行识别材料类型，再按类型分组：
+        金属材料合并为一次Materials Project批量查询，有机材料通过PubChem并发批量查询。
+        PNEC与单材料路径一样按名称查询；金属材料另外在 pnec["element_pnec"] 中附带各金属元素的PNEC，
+        元素查询在整批材料之间共享。数据库查询次数随候选数量亚线性增长。
+        整批材料共享同一个运行级材料上下文。
+        
+        Args:
+            material_formulas (List[str]): 材料化学式列表
+            mp_limit (int): 每个金属材料返回的Materials Project结果数量
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: 以输入化学式为键、与execute_mandatory_tool_calls格式相同的结果
+        """
+        with ensure_material_context():
+            return self._execute_for_many(material_formulas, mp_limit)
+    
+    def _execute_for_many(self, material_formulas: List[str], mp_limit: int) -> Dict[str, Dict[str, Any]]:
+        """批量执行多个材料的强制工具调用（在材料上下文中执行）"""
+        keys = {formula: canonical_key(formula) for formula in material_formulas}
+        representatives: Dict[str, str] = {}
+        for formula in material_formulas:
+            representatives.setdefault(keys[formula], formula)
+        
+        batch = {
+            key: {
+                "material_identifier": None,
+                "structure_validator": None,
+                "materials_project": None,
+                "pubchem": None,
+                "pnec": None,
+                "data_validator": None,
+                "material_search": None,
+                "errors": [],
+                "timings": {}
+            }
+            for key in representatives
+        }
+        
+        def collect(key: str, tool: str, name: str, outputs: Dict[str, Any],
+                    errors: Dict[str, str], timings: Dict[str, float]) -> None:
+            if name in outputs:
+                batch[key][tool] = outputs[name]
+            if name in errors:
+                batch[key]["errors"].append(f"{tool} {errors[name]}")
+            if name in timings:
+                batch[key]["timings"][tool] = timings[name]
+        
+        try:
+            # 第一阶段：并行识别所有材料的类型
+            outputs, errors, timings = self._run_tool_graph({
+                f"material_identifier/{key}": ((), lambda done, formula=formula: self.material_identifier_tool.identify_material(formula))
+                for key, formula in representatives.items()
+            })
+            material_types = {}
+            for key in representatives:
+                collect(key, "material_identifier", f"material_identifier/{key}", outputs, errors, timings)
+                material_types[key] = (batch[key]["material_identifier"] or {}).get("material_type", "unknown")
+            
+            metal_keys = [key for key in representatives if material_types[key] == "metal"]
+            organic_keys = [key for key in representatives if material_types[key] == "organic"]
+            
+            # 金属材料的元素PNEC在整批材料之间共享
+            metal_elements = {
+                key: [element for element in extract_elements(representatives[key]) if element in METAL_ELEMENTS]
+                for key in metal_keys
+            }
+            shared_elements = list(dict.fromkeys(element for elements in metal_elements.values() for element in elements))
+            
+            # 第二阶段：其余工具调用组成一个图，批量查询各自只发送一次
+            steps: Dict[str, ToolStep] = {}
+            for key, formula in representatives.items():
+                material_data = {"molecular_formula": formula, "material_name": formula}
+                steps[f"structure_validator/{key}"] = ((), lambda done, formula=formula: self.structure_validator_tool.validate_structure_exists(formula))
+                steps[f"data_validator/{key}"] = ((), lambda done, data=material_data: self.data_validator_tool.validate_chemical_data(data))
+                steps[f"material_search/{key}"] = ((), lambda done, formula=formula: self.material_search_tool.search_similar_materials(formula))
+                steps[f"pnec/{key}"] = ((), lambda done, formula=formula: self.pnec_tool.get_pnec_by_name(formula))
+            for element in shared_elements:
+                steps[f"pnec_element/{element}"] = ((), lambda done, element=element: self.pnec_tool.get_pnec_by_name(element))
+            if metal_keys:
+                metal_formulas = [representatives[key] for key in metal_keys]
+                steps["materials_project"] = ((), lambda done: self.materials_project_tool.search_materials_many(metal_formulas, limit=mp_limit))
+            if organic_keys:
+                organic_formulas = [representatives[key] for key in organic_keys]
+                steps["pubchem"] = ((), lambda done: self.pubchem_tool.search_compounds(organic_formulas))
+            
+            outputs, errors, timings = self._run_tool_graph(steps)
+            
+            for key, formula in representatives.items():
+                for tool in ("structure_validator", "data_validator", "material_search", "pnec"):
+                    collect(key, tool, f"{tool}/{key}", outputs, errors, timings)
+                if metal_elements.get(key):
+                    element_results = {}
+                    for element in metal_elements[key]:
+                        name = f"pnec_element/{element}"
+                        if name in outputs:
+                            element_results[element] = outputs[name]
+                        elif name in errors:
+                            batch[key]["errors"].append(f"pnec({element}) {errors[name]}")
+                    # 保持与单材料路径相同的按名称查询结果，元素PNEC作为附加字段
+                    pnec = batch[key]["pnec"]
+                    if not isinstance(pnec, dict):
+                        pnec = {"success": False, "compound_name": formula, "error": "按名称查询PNEC失败"}
+                    batch[key]["pnec"] = dict(pnec, element_pnec=element_results)
+                # 批量查询的结果按化学式拆分回各个材料
+                tool = "materials_project" if key in metal_keys else "pubchem" if key in organic_keys else None
+                if tool is not None:
+                    if tool in outputs:
+                        batch[key][tool] = (outputs[tool] or {}).get(formula)
+                    if tool in errors:
+                        batch[key]["errors"].append(f"{tool} {errors[tool]}")
+                    if tool in timings:
+                        batch[key]["timings"][tool] = timings[tool]
+        except Exception as e:
+            logger.error(f"批量评估工具调用失败: {e}")
+            for results in batch.values():
+                results["errors"].append(f"工具调用过程中出现错误: {str(e)}")
+        
+        # 同一材料的不同写法各自得到独立的结果副本
+        output: Dict[str, Dict[str, Any]] = {}
+        for formula in material_formulas:
+            results = batch[keys[formula]]
+            output[formula] = results if representatives[keys[formula]] == formula else copy.deepcopy(results)
+        return output
+    
+    def _run_tool_graph(self, steps: Dict[str, ToolStep],
+                        timeout: Optional[float] = None) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, float]]:
+        """
+        在共享线程池中按依赖关系执行工具调用图
+        
+        超时从工作线程实际开始执行该步骤时计时，在共享线程池中排队等待的时间不计入。
+        依赖步骤失败或超时时，下游步骤会被跳过；超时的调用无法被中断，会在后台结束后被丢弃。
+        
+        Args:
+            steps (Dict[str, ToolStep]): 步骤名称到(依赖, 调用函数)的映射
+            timeout (float, optional): 单个工具的超时时间（秒），默认取 ASSESSMENT_TOOL_TIMEOUT
+            
+        Returns:
+            Tuple: (成功步骤的结果, 失败步骤的错误信息, 各步骤耗时)，均以步骤名称为键
+        """
+        timeout = Config.ASSESSMENT_TOOL_TIMEOUT if timeout is None else timeout
+        pool = get_tool_pool()
+        pending = dict(steps)
+        running: Dict[Future, str] = {}
+        started: Dict[str, float] = {}
+        completed: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        timings: Dict[str, float] = {}
+        
+        def timed(name: str, func: Callable[[Dict[str, Any]], Any], done: Dict[str, Any]) -> Tuple[Any, float]:
+            # 记录实际开始时间作为超时起点；耗时只返回给调度线程记录，避免超时后的后台线程修改已返回的结果
+            started[name] = time.monotonic()
+            start_time = time.perf_counter()
+            value = func(done)
+            return value, round(time.perf_counter() - start_time, 3)
+        
+        while pending or running:
+            # 提交所有依赖已满足的步骤
+            for name, (deps, func) in list(pending.items()):
+                if any(dep in errors for dep in deps):
+                    del pending[name]
+                    errors[name] = "已跳过: 依赖的工具调用失败"
+                elif all(dep in completed for dep in deps):
+                    del pending[name]
+                    future = pool.submit(timed, name, func, dict(completed))
+                    running[future] = name
+            
+            if not running:
+                # 剩余步骤的依赖无法满足（配置错误）
+                for name in pending:
+                    errors[name] = "未执行: 依赖关系无法满足"
+                break
+            
+            # 仍在排队的步骤尚无截止时间，最多等待一个超时周期后重新检查它们是否已开始执行
+            deadlines = [started[name] + timeout for name in running.values() if name in started]
+            queued = len(deadlines) < len(running)
+            next_deadline = min(deadlines + ([time.monotonic() + timeout] if queued else []))
+            finished, _ = wait(list(running), timeout=max(0.0, next_deadline - time.monotonic()),
+                               return_when=FIRST_COMPLETED)
+            
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    completed[name], timings[name] = future.result()
+                except Exception as e:
+                    errors[name] = f"调用失败: {str(e)}"
+                    logger.error(f"评估工具 {name} 调用失败: {e}")
+            
+            now = time.monotonic()
+            for future, name in list(running.items()):
+                if name in started and started[name] + timeout <= now:
+                    running.pop(future)
+                    future.cancel()
+                    errors[name] = f"调用超时（{timeout} 秒）"
+                    logger.warning(f"评估工具 {name} 调用超时")
+        
+        return completed, errors, timings
+    
     def validate_tool_results(self, tool_results: Dict[str, Any]) -> Dict[str, Any]:
         """
         验证所有工具调用结果
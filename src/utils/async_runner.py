@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+异步运行工具 / Async Runner Utility
+在后台事件循环线程中执行协程，使同步代码可以安全调用异步客户端
+/ Runs coroutines on a background event-loop thread so synchronous code can safely call async clients
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Optional
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    获取（必要时启动）共享的后台事件循环 / Get (starting if needed) the shared background event loop
+
+    Returns:
+        asyncio.AbstractEventLoop: 后台事件循环 / Background event loop
+    """
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(
+                target=_loop.run_forever,
+                name="ecomats-async-runner",
+                daemon=True
+            )
+            _loop_thread.start()
+        return _loop
+
+
+def run_sync(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """
+    在后台事件循环中运行协程并阻塞等待结果 / Run a coroutine on the background loop and block for its result
+
+    无论调用方是否处于其他事件循环中（例如CrewAI的异步执行）都可以安全调用。
+    / Safe to call whether or not the caller is already inside another event loop (e.g. CrewAI's async execution).
+
+    Args:
+        coro (Awaitable[Any]): 要运行的协程 / Coroutine to run
+        timeout (float, optional): 超时时间（秒） / Timeout (seconds)
+
+    Returns:
+        Any: 协程的返回值 / Return value of the coroutine
+    """
+    loop = get_background_loop()
+    if threading.current_thread() is _loop_thread:
+        if hasattr(coro, "close"):
+            coro.close()
+        raise RuntimeError("不能在后台事件循环线程中同步等待协程 / Cannot block on a coroutine from the background loop thread")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout)
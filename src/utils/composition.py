@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+组成计算工具 / Composition Calculator
+基于离线原子量表计算分子量、质量分数和金属负载量，无需查询PubChem
+/ Computes molecular weight, mass fractions and metal loading from an offline atomic-mass table, without a PubChem round trip
+
+批量接口先对化学式去重，再把整批化学式组成元素计数矩阵，与原子量向量相乘一次得到全部分子量和金属质量；
+单个化学式只解析一次。未安装NumPy时逐行累加。
+/ The batch API deduplicates formulas first, then stacks the whole batch into an element-count matrix and multiplies
+it by the atomic-mass vector once to get every molecular weight and metal mass; each formula is parsed only once.
+Without NumPy the rows are summed one by one.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.utils.formula_parser import ELEMENTS, METAL_ELEMENTS, parse_formula, reduced_formula
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    # NumPy未安装，批量组成计算将逐行累加
+    # NumPy not installed, batch compositions will be summed row by row
+    NUMPY_AVAILABLE = False
+
+# 标准原子量（IUPAC简化值，按原子序数；无稳定同位素的元素取最稳定同位素的质量数）
+# / Standard atomic weights (IUPAC abridged, by atomic number; elements without stable isotopes use the mass
+# number of the longest-lived isotope)
+_ATOMIC_MASS_VALUES: Tuple[float, ...] = (
+    1.008, 4.0026, 6.94, 9.0122, 10.81, 12.011, 14.007, 15.999, 18.998, 20.180,
+    22.990, 24.305, 26.982, 28.085, 30.974, 32.06, 35.45, 39.95, 39.098, 40.078,
+    44.956, 47.867, 50.942, 51.996, 54.938, 55.845, 58.933, 58.693, 63.546, 65.38,
+    69.723, 72.630, 74.922, 78.971, 79.904, 83.798, 85.468, 87.62, 88.906, 91.224,
+    92.906, 95.95, 97.0, 101.07, 102.906, 106.42, 107.868, 112.414, 114.818, 118.71,
+    121.760, 127.60, 126.904, 131.293, 132.905, 137.327, 138.905, 140.116, 140.908, 144.242,
+    145.0, 150.36, 151.964, 157.25, 158.925, 162.500, 164.930, 167.259, 168.934, 173.045,
+    174.967, 178.49, 180.948, 183.84, 186.207, 190.23, 192.217, 195.084, 196.967, 200.592,
+    204.38, 207.2, 208.980, 209.0, 210.0, 222.0, 223.0, 226.0, 227.0, 232.038,
+    231.036, 238.029, 237.0, 244.0, 243.0, 247.0, 247.0, 251.0, 252.0, 257.0,
+    258.0, 259.0, 262.0, 267.0, 268.0, 269.0, 270.0, 269.0, 278.0, 281.0,
+    282.0, 285.0, 286.0, 289.0, 290.0, 293.0, 294.0, 294.0
+)
+
+# 元素符号到原子量的映射 / Element symbol to atomic mass
+ATOMIC_MASSES: Dict[str, float] = dict(zip(ELEMENTS, _ATOMIC_MASS_VALUES))
+
+# 元素符号到列索引的映射（批量计算使用） / Element symbol to column index (used by batch computation)
+_ELEMENT_INDEX: Dict[str, int] = {element: index for index, element in enumerate(ELEMENTS)}
+
+
+@lru_cache(maxsize=4096)
+def _count_row(formula: str) -> Optional[Tuple[Tuple[int, float], ...]]:
+    """化学式的稀疏计数行：(元素列索引, 原子数) / Sparse count row of a formula: (element column, atom count)"""
+    counts = parse_formula(formula)
+    if counts is None:
+        return None
+    return tuple((_ELEMENT_INDEX[element], amount) for element, amount in counts.items())
+
+
+def _mass_row(formula: str) -> Optional[Tuple[Tuple[int, float], ...]]:
+    """化学式的稀疏质量行：(元素列索引, 该元素的总质量) / Sparse mass row of a formula: (element column, total mass of that element)"""
+    row = _count_row(formula)
+    if row is None:
+        return None
+    return tuple((index, amount * _ATOMIC_MASS_VALUES[index]) for index, amount in row)
+
+
+def molecular_weight(formula: str) -> Optional[float]:
+    """
+    计算分子量 / Compute the molecular weight
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        Optional[float]: 分子量（g/mol），无法解析时返回None / Molecular weight (g/mol), or None if it cannot be parsed
+    """
+    row = _mass_row(formula)
+    if row is None:
+        return None
+    return round(sum(mass for _, mass in row), 3)
+
+
+def mass_fractions(formula: str) -> Optional[Dict[str, float]]:
+    """
+    计算各元素的质量分数 / Compute the mass fraction of each element
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        Optional[Dict[str, float]]: 元素到质量分数（0-1）的映射，无法解析时返回None / Element to mass fraction (0-1), or None
+    """
+    row = _mass_row(formula)
+    if row is None:
+        return None
+    total = sum(mass for _, mass in row)
+    return {ELEMENTS[index]: round(mass / total, 6) for index, mass in row}
+
+
+def metal_loading(formula: str) -> Optional[float]:
+    """
+    计算金属负载量（金属元素的总质量分数） / Compute the metal loading (total mass fraction of metal elements)
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        Optional[float]: 金属质量百分比（wt%），无法解析时返回None / Metal mass percentage (wt%), or None
+    """
+    row = _mass_row(formula)
+    if row is None:
+        return None
+    total = sum(mass for _, mass in row)
+    metal = sum(mass for index, mass in row if ELEMENTS[index] in METAL_ELEMENTS)
+    return round(100.0 * metal / total, 4)
+
+
+def _composition_from_totals(formula: str,
+                             row: Tuple[Tuple[int, float], ...],
+                             total: float,
+                             metal: float) -> Dict[str, Any]:
+    """由累加结果组装组成字典 / Assemble the composition dict from accumulated totals"""
+    return {
+        "formula": formula,
+        "reduced_formula": reduced_formula(formula),
+        "molecular_weight": round(total, 3),
+        "mass_fractions": {ELEMENTS[index]: round(mass / total, 6) for index, mass in row},
+        "metals": [ELEMENTS[index] for index, _ in row if ELEMENTS[index] in METAL_ELEMENTS],
+        "metal_loading": round(100.0 * metal / total, 4),
+        "source": "local"
+    }
+
+
+def composition(formula: str) -> Optional[Dict[str, Any]]:
+    """
+    计算单个化学式的完整组成 / Compute the full composition of one formula
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        Optional[Dict[str, Any]]: 分子量、质量分数、金属元素和金属负载量，无法解析时返回None
+        / Molecular weight, mass fractions, metals and metal loading, or None if it cannot be parsed
+    """
+    return compute_compositions([formula])[0]
+
+
+def compute_compositions(formulas: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    批量计算化学式的组成 / Compute compositions for a batch of formulas
+
+    Args:
+        formulas (Iterable[str]): 化学式列表 / Formulas
+
+    Returns:
+        List[Optional[Dict[str, Any]]]: 与输入顺序一致的组成结果，无法解析的位置为None
+        / Compositions in input order, None where a formula cannot be parsed
+    """
+    formulas = list(formulas)
+    unique = list(dict.fromkeys(formulas))
+    rows = [_count_row(formula) for formula in unique]
+    totals, metals = _batch_masses(rows)
+
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    for position, formula in enumerate(unique):
+        row = rows[position]
+        if row is None or totals[position] <= 0:
+            results[formula] = None
+        else:
+            mass_row = tuple((index, amount * _ATOMIC_MASS_VALUES[index]) for index, amount in row)
+            results[formula] = _composition_from_totals(formula, mass_row, totals[position], metals[position])
+    return [results[formula] for formula in formulas]
+
+
+def _batch_masses(rows: List[Optional[Tuple[Tuple[int, float], ...]]]) -> Tuple[List[float], List[float]]:
+    """
+    计算整批化学式的总质量和金属质量 / Compute the total and metal mass of every formula in a batch
+
+    Args:
+        rows (List[Optional[Tuple]]): 各化学式的稀疏计数行，无法解析的位置为None / Sparse count rows, None where unparsable
+
+    Returns:
+        Tuple[List[float], List[float]]: (总质量, 金属质量)，与输入顺序一致 / (total masses, metal masses) in input order
+    """
+    if not NUMPY_AVAILABLE:
+        totals = [sum(amount * _ATOMIC_MASS_VALUES[index] for index, amount in row or ()) for row in rows]
+        metals = [
+            sum(amount * _ATOMIC_MASS_VALUES[index] for index, amount in row or () if ELEMENTS[index] in METAL_ELEMENTS)
+            for row in rows
+        ]
+        return totals, metals
+
+    # 只保留本批出现过的元素列 / Keep only the element columns that occur in this batch
+    columns = sorted({index for row in rows for index, _ in row or ()})
+    column_of = {index: position for position, index in enumerate(columns)}
+    counts = np.zeros((len(rows), len(columns)))
+    for position, row in enumerate(rows):
+        for index, amount in row or ():
+            counts[position, column_of[index]] = amount
+
+    # 计数矩阵 × [原子量, 金属原子量] 一次得到总质量和金属质量 / One count-matrix product yields total and metal masses
+    masses = np.array([_ATOMIC_MASS_VALUES[index] for index in columns])
+    is_metal = np.array([ELEMENTS[index] in METAL_ELEMENTS for index in columns], dtype=bool)
+    weights = np.column_stack((masses, np.where(is_metal, masses, 0.0))) if columns else np.zeros((0, 2))
+    product = counts @ weights
+    return product[:, 0].tolist(), product[:, 1].tolist()
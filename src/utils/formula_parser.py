@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+化学式解析工具 / Chemical Formula Parser
+所有工具共用的规范化学式解析器：元素计数、约化化学式、规范键以及元素表
+/ Canonical formula parser shared by every tool: element counts, reduced formulas, canonical keys and element tables
+
+支持的写法 / Supported notation:
+    Fe2O3, O3Fe2, Fe₂O₃            -> 相同的规范键 / same canonical key
+    Ca(OH)2, K4[Fe(CN)6]           -> 括号（可嵌套） / (nested) brackets
+    CuSO4·5H2O, CuSO4*5H2O         -> 水合物（·•∙⋅*分隔，可带系数） / hydrates (·•∙⋅* separated, optional coefficient)
+    Fe3+, SO4^2-, SO4 2-, Ni²⁺      -> 电荷（单独返回，不影响计数） / charges (returned separately, counts unaffected)
+    Fe0.5Mn0.5O                    -> 小数计量比 / fractional stoichiometry
+
+不带 ^ 的电荷中，紧邻符号的一位数字只在以下情况表示电荷：前面只有一个元素符号（Fe3+）、前面是另一位数字（SO42-）
+或右方括号（[Fe(CN)6]4-）；否则它是下标，电荷为±1（MnO4-、NO3-、HSO5-）。
+"." 不作为水合物分隔符，因为它与小数计量比有歧义。
+/ Without ^, the single digit next to the sign is the charge only when it follows a lone element symbol (Fe3+),
+another digit (SO42-) or a closing square bracket ([Fe(CN)6]4-); otherwise it is a subscript and the charge is ±1
+(MnO4-, NO3-, HSO5-).
+"." is not a hydrate separator because it is ambiguous with fractional stoichiometry.
+"""
+
+import logging
+import re
+from functools import lru_cache, reduce
+from math import gcd
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# 元素周期表（按原子序数） / Periodic table (by atomic number)
+ELEMENTS: Tuple[str, ...] = (
+    "H", "He", "Li", "Be", "B", "C", "N", "O", "F", "Ne", "Na", "Mg", "Al", "Si", "P", "S", "Cl", "Ar",
+    "K", "Ca", "Sc", "Ti", "V", "Cr", "Mn", "Fe", "Co", "Ni", "Cu", "Zn", "Ga", "Ge", "As", "Se", "Br", "Kr",
+    "Rb", "Sr", "Y", "Zr", "Nb", "Mo", "Tc", "Ru", "Rh", "Pd", "Ag", "Cd", "In", "Sn", "Sb", "Te", "I", "Xe",
+    "Cs", "Ba", "La", "Ce", "Pr", "Nd", "Pm", "Sm", "Eu", "Gd", "Tb", "Dy", "Ho", "Er", "Tm", "Yb", "Lu",
+    "Hf", "Ta", "W", "Re", "Os", "Ir", "Pt", "Au", "Hg", "Tl", "Pb", "Bi", "Po", "At", "Rn",
+    "Fr", "Ra", "Ac", "Th", "Pa", "U", "Np", "Pu", "Am", "Cm", "Bk", "Cf", "Es", "Fm", "Md", "No", "Lr",
+    "Rf", "Db", "Sg", "Bh", "Hs", "Mt", "Ds", "Rg", "Cn", "Nh", "Fl", "Mc", "Lv", "Ts", "Og"
+)
+
+# 全部元素符号 / All element symbols
+ELEMENT_SET: FrozenSet[str] = frozenset(ELEMENTS)
+
+# 金属元素 / Metal elements
+METAL_ELEMENTS: FrozenSet[str] = frozenset([
+    "Li", "Be", "Na", "Mg", "Al", "K", "Ca", "Sc", "Ti", "V", "Cr", "Mn", "Fe", "Co", "Ni", "Cu", "Zn",
+    "Ga", "Rb", "Sr", "Y", "Zr", "Nb", "Mo", "Tc", "Ru", "Rh", "Pd", "Ag", "Cd", "In", "Sn", "Cs", "Ba",
+    "La", "Ce", "Pr", "Nd", "Pm", "Sm", "Eu", "Gd", "Tb", "Dy", "Ho", "Er", "Tm", "Yb", "Lu", "Hf", "Ta",
+    "W", "Re", "Os", "Ir", "Pt", "Au", "Hg", "Tl", "Pb", "Bi", "Po", "Fr", "Ra", "Ac", "Th", "Pa", "U",
+    "Np", "Pu", "Am", "Cm", "Bk", "Cf", "Es", "Fm", "Md", "No", "Lr"
+])
+
+# 通常构成有机物的非金属元素 / Non-metal elements that typically make up organic compounds
+ORGANIC_ELEMENTS: FrozenSet[str] = frozenset(["H", "C", "N", "O", "F", "P", "S", "Cl", "Br", "I"])
+
+# Unicode上下标到ASCII的转换表 / Translation table from Unicode sub/superscripts to ASCII
+_SUBSCRIPTS = str.maketrans("₀₁₂₃₄₅₆₇₈₉", "0123456789")
+_SUPERSCRIPT_DIGITS = "⁰¹²³⁴⁵⁶⁷⁸⁹"
+_SUPERSCRIPT_CHARGE = re.compile(r"([⁰¹²³⁴⁵⁶⁷⁸⁹]*)([⁺⁻])$")
+_SUPERSCRIPTS = str.maketrans(_SUPERSCRIPT_DIGITS + "⁺⁻", "0123456789+-")
+
+_HYDRATE_SEPARATORS = re.compile(r"[·•∙⋅*]")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?|\.\d+")
+# 带 ^ 或空格前缀的电荷可以有多位数字；无前缀时只取一位，且该数字是否为电荷由 _bare_digit_is_charge 判断
+# / Prefixed charges may have several digits; unprefixed ones take a single digit, which _bare_digit_is_charge
+# decides between charge and subscript
+_CHARGE_SUFFIX = re.compile(
+    r"(?:\^|\s+)(\d*)([+-])$|(?:\^|\s+)([+-])(\d*)$|(?P<bare_digit>\d?)(?P<bare_sign>[+-])$|([+-])(\d?)$"
+)
+_LONE_ELEMENT = re.compile(r"[A-Z][a-z]?")
+_ELEMENT_TOKEN = re.compile(r"[A-Z][a-z]?")
+_OPENING = {"(": ")", "[": "]", "{": "}"}
+
+# 解析结果：(按首次出现顺序的(元素, 计数)元组, 电荷) / Parse result: ((element, count) pairs in first-appearance order, charge)
+ParsedFormula = Tuple[Tuple[Tuple[str, float], ...], int]
+
+
+def _bare_digit_is_charge(body: str) -> bool:
+    """
+    判断无前缀电荷前的一位数字是否为电荷而非下标 / Decide whether the single digit before an unprefixed sign is the charge rather than a subscript
+
+    Args:
+        body (str): 该数字之前的化学式 / Formula text before the digit
+
+    Returns:
+        bool: 前面只有一个元素符号、另一位数字或右方括号时为True / True after a lone element symbol, another digit or a closing square bracket
+    """
+    body = re.sub(r"\s+", "", body)
+    return bool(_LONE_ELEMENT.fullmatch(body)) or body[-1:].isdigit() or body.endswith("]")
+
+
+def normalize_formula(formula: str) -> str:
+    """
+    规范化化学式写法（Unicode上下标、空白、水合物分隔符） / Normalize formula spelling (Unicode sub/superscripts, whitespace, hydrate separators)
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        str: 规范化后的化学式，电荷以 ^ 形式保留 / Normalized formula with any charge kept in ^ form
+    """
+    text = str(formula or "").strip().translate(_SUBSCRIPTS)
+    superscript_charge = _SUPERSCRIPT_CHARGE.search(text)
+    if superscript_charge:
+        digits, sign = superscript_charge.groups()
+        text = text[:superscript_charge.start()].rstrip() + "^" + (digits + sign).translate(_SUPERSCRIPTS)
+    text = _HYDRATE_SEPARATORS.sub("·", text)
+    # 电荷前的空格是有意义的（"SO4 2-"），其余空白删除 / A space before a charge is meaningful ("SO4 2-"); drop other whitespace
+    charge = _CHARGE_SUFFIX.search(text)
+    if charge:
+        body = text[:charge.start()]
+        if charge.group("bare_digit") and not _bare_digit_is_charge(body):
+            # 数字是下标（MnO4-），电荷为±1 / The digit is a subscript (MnO4-) and the charge is ±1
+            return re.sub(r"\s+", "", body) + charge.group("bare_digit") + "^" + charge.group("bare_sign")
+        return re.sub(r"\s+", "", body) + "^" + "".join(part for part in charge.groups() if part)
+    return re.sub(r"\s+", "", text)
+
+
+def _split_charge(text: str) -> Tuple[str, int]:
+    """拆分规范化化学式末尾的电荷 / Split the trailing charge off a normalized formula"""
+    if "^" in text:
+        body, _, charge_text = text.rpartition("^")
+        match = re.fullmatch(r"(\d*)([+-])|([+-])(\d*)", charge_text)
+        if not match:
+            return text, 0
+        digits = match.group(1) or match.group(4) or "1"
+        sign = match.group(2) or match.group(3)
+        return body, int(digits) * (1 if sign == "+" else -1)
+    return text, 0
+
+
+def _parse_part(part: str) -> Optional[Dict[str, float]]:
+    """
+    单趟栈式解析一个（可带系数的）化学式片段，时间复杂度O(len)
+    / Single-pass stack parse of one formula part (with optional leading coefficient), O(len)
+    """
+    position = 0
+    multiplier = 1.0
+    coefficient = _NUMBER.match(part)
+    if coefficient:
+        multiplier = float(coefficient.group())
+        position = coefficient.end()
+
+    stack: List[Dict[str, float]] = [{}]
+    closers: List[str] = []
+    length = len(part)
+    while position < length:
+        char = part[position]
+        if char in _OPENING:
+            stack.append({})
+            closers.append(_OPENING[char])
+            position += 1
+        elif closers and char == closers[-1]:
+            closers.pop()
+            position += 1
+            number = _NUMBER.match(part, position)
+            count = float(number.group()) if number else 1.0
+            if number:
+                position = number.end()
+            group = stack.pop()
+            target = stack[-1]
+            for element, amount in group.items():
+                target[element] = target.get(element, 0.0) + amount * count
+        elif "A" <= char <= "Z":
+            symbol = char
+            if position + 1 < length and "a" <= part[position + 1] <= "z":
+                symbol = part[position:position + 2]
+            if symbol not in ELEMENT_SET:
+                return None
+            position += len(symbol)
+            number = _NUMBER.match(part, position)
+            count = float(number.group()) if number else 1.0
+            if number:
+                position = number.end()
+            target = stack[-1]
+            target[symbol] = target.get(symbol, 0.0) + count
+        else:
+            return None
+
+    if closers or not stack[0]:
+        return None
+    if multiplier != 1.0:
+        return {element: amount * multiplier for element, amount in stack[0].items()}
+    return stack[0]
+
+
+@lru_cache(maxsize=4096)
+def _parse_cached(formula: str) -> Optional[ParsedFormula]:
+    """带缓存的解析入口，返回不可变结果 / Memoized parse entry point returning an immutable result"""
+    body, charge = _split_charge(normalize_formula(formula))
+    if not body:
+        return None
+    totals: Dict[str, float] = {}
+    for part in body.split("·"):
+        counts = _parse_part(part)
+        if counts is None:
+            return None
+        for element, amount in counts.items():
+            totals[element] = totals.get(element, 0.0) + amount
+    return tuple(totals.items()), charge
+
+
+def parse_formula(formula: str) -> Optional[Dict[str, float]]:
+    """
+    解析化学式为元素计数 / Parse a formula into element counts
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        Optional[Dict[str, float]]: 按首次出现顺序的元素计数，无法解析时返回None / Element counts in first-appearance order, or None
+    """
+    parsed = _parse_cached(formula)
+    return dict(parsed[0]) if parsed is not None else None
+
+
+def formula_charge(formula: str) -> Optional[int]:
+    """
+    获取化学式的电荷 / Get the charge of a formula
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        Optional[int]: 电荷（中性为0），无法解析时返回None / Charge (0 when neutral), or None
+    """
+    parsed = _parse_cached(formula)
+    return parsed[1] if parsed is not None else None
+
+
+def is_valid_formula(formula: str) -> bool:
+    """
+    判断字符串是否为可解析的化学式 / Whether the string is a parseable formula
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        bool: 是否可解析 / Whether it parses
+    """
+    return _parse_cached(formula) is not None
+
+
+def _format_amount(amount: float) -> str:
+    """格式化计数（1省略，整数不带小数点） / Format a count (1 omitted, integers without a decimal point)"""
+    if amount == 1:
+        return ""
+    if float(amount).is_integer():
+        return str(int(amount))
+    return f"{amount:.6g}"
+
+
+def _hill_order(elements) -> List[str]:
+    """Hill顺序：含碳时C、H在前，其余按字母顺序 / Hill order: C then H when carbon is present, the rest alphabetical"""
+    elements = sorted(elements)
+    if "C" in elements:
+        head = ["C"] + (["H"] if "H" in elements else [])
+        return head + [element for element in elements if element not in head]
+    return elements
+
+
+def reduce_counts(counts: Dict[str, float]) -> Dict[str, float]:
+    """
+    约化元素计数（全为整数时除以最大公约数） / Reduce element counts (divide by the GCD when all are integers)
+
+    Args:
+        counts (Dict[str, float]): 元素计数 / Element counts
+
+    Returns:
+        Dict[str, float]: 约化后的计数 / Reduced counts
+    """
+    if counts and all(float(amount).is_integer() for amount in counts.values()):
+        divisor = reduce(gcd, (int(amount) for amount in counts.values()))
+        if divisor > 1:
+            return {element: amount / divisor for element, amount in counts.items()}
+    return dict(counts)
+
+
+def format_formula(counts: Dict[str, float]) -> str:
+    """
+    按Hill顺序输出化学式 / Write counts as a formula in Hill order
+
+    Args:
+        counts (Dict[str, float]): 元素计数 / Element counts
+
+    Returns:
+        str: 化学式 / Formula
+    """
+    return "".join(f"{element}{_format_amount(counts[element])}" for element in _hill_order(counts))
+
+
+@lru_cache(maxsize=4096)
+def reduced_formula(formula: str) -> Optional[str]:
+    """
+    获取约化化学式（Hill顺序），如 Fe4O6、O3Fe2、Fe₂O₃ 均得到 Fe2O3
+    / Get the reduced formula in Hill order, e.g. Fe4O6, O3Fe2 and Fe₂O₃ all give Fe2O3
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        Optional[str]: 约化化学式，无法解析时返回None / Reduced formula, or None
+    """
+    counts = parse_formula(formula)
+    if counts is None:
+        return None
+    return format_formula(reduce_counts(counts))
+
+
+def canonical_key(formula: str) -> str:
+    """
+    获取用于缓存和去重的规范键：可解析时为Hill顺序的化学式（带电荷），否则为去除空白的原始文本。
+    不做约化，因为C2H4与C4H8是不同的分子。
+    / Get the canonical key for caching and deduplication: the Hill-ordered formula (with charge) when parseable,
+    otherwise the whitespace-collapsed original text. Counts are not reduced because C2H4 and C4H8 are different molecules.
+
+    Args:
+        formula (str): 化学式或材料名称 / Formula or material name
+
+    Returns:
+        str: 规范键 / Canonical key
+    """
+    parsed = _parse_cached(formula)
+    if parsed is None:
+        return " ".join(str(formula or "").split())
+    key = format_formula(dict(parsed[0]))
+    charge = parsed[1]
+    if charge:
+        return f"{key}^{abs(charge) if abs(charge) != 1 else ''}{'+' if charge > 0 else '-'}"
+    return key
+
+
+def name_key(name: str) -> str:
+    """
+    获取名称查询的索引/去重键：合并空白；化学式保留大小写（Co与CO不同），其余名称转为小写
+    / Get the index/deduplication key of a name lookup: whitespace collapsed; formulas keep their case (Co is not CO),
+    other names are lower-cased
+
+    Args:
+        name (str): 化学式或物质名称 / Formula or substance name
+
+    Returns:
+        str: 名称键 / Name key
+    """
+    key = " ".join(str(name or "").split())
+    return key if is_valid_formula(key) else key.lower()
+
+
+@lru_cache(maxsize=4096)
+def _extract_elements_cached(text: str) -> Tuple[str, ...]:
+    """带缓存的元素提取 / Memoized element extraction"""
+    parsed = _parse_cached(text)
+    if parsed is not None:
+        return tuple(element for element, _ in parsed[0])
+    # 非严格化学式（名称、描述）：按元素符号逐个扫描 / Not a strict formula (names, descriptions): scan symbol tokens
+    found = dict.fromkeys(
+        token for token in _ELEMENT_TOKEN.findall(str(text or "").translate(_SUBSCRIPTS))
+        if token in ELEMENT_SET
+    )
+    return tuple(found)
+
+
+def extract_elements(text: str) -> List[str]:
+    """
+    从化学式或任意查询文本中提取元素（去重，按首次出现顺序） / Extract elements from a formula or free text (deduplicated, first-appearance order)
+
+    Args:
+        text (str): 化学式或查询文本 / Formula or query text
+
+    Returns:
+        List[str]: 元素符号列表 / Element symbols
+    """
+    return list(_extract_elements_cached(text))
+
+
+def element_set(text: str) -> FrozenSet[str]:
+    """
+    提取元素集合 / Extract the set of elements
+
+    Args:
+        text (str): 化学式或查询文本 / Formula or query text
+
+    Returns:
+        FrozenSet[str]: 元素集合 / Set of elements
+    """
+    return frozenset(_extract_elements_cached(text))
+
+
+def chemsys(formula: str) -> Optional[str]:
+    """
+    获取MP格式的化学体系（按字母排序，以"-"连接），如 Fe2O3 -> "Fe-O"
+    / Get the MP-style chemical system (sorted, "-" joined), e.g. Fe2O3 -> "Fe-O"
+
+    Args:
+        formula (str): 化学式 / Chemical formula
+
+    Returns:
+        Optional[str]: 化学体系，无法解析时返回None / Chemical system, or None
+    """
+    parsed = _parse_cached(formula)
+    if parsed is None:
+        return None
+    return "-".join(sorted(element for element, _ in parsed[0]))
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+LLM响应缓存 / LLM Response Cache
+可选的磁盘LLM响应缓存，按模型、温度、max_tokens和消息哈希建立键，复用同一需求重复运行时的模型输出
+/ Opt-in on-disk LLM response cache keyed by model, temperature, max_tokens and message hash, so re-running a
+workflow for the same requirement reuses the model outputs
+
+两个接入点 / Two integration points:
+    1. LangChainLLMCache：LangChain的 BaseCache 实现，通过 ChatOpenAI(cache=...) 挂载（create_llm 使用）
+       / LangChain BaseCache implementation, attached via ChatOpenAI(cache=...) (used by create_llm)
+    2. enable_agent_llm_cache：为CrewAI LLM加上缓存，由LLM客户端注册表在创建智能体LLM时使用
+       / Adds caching to a CrewAI LLM, used by the LLM client registry when it builds agent LLMs
+
+存储复用 ResponseCache（SQLite，TTL + 按大小LRU淘汰）。设置 LLM_CACHE_BYPASS=True 或调用 set_bypass(True) 时
+跳过读取但仍写入新响应，用于刷新缓存。
+/ Storage reuses ResponseCache (SQLite, TTL + size-based LRU eviction). With LLM_CACHE_BYPASS=True or
+set_bypass(True), lookups are skipped while fresh responses are still written, which refreshes the cache.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+from src.config.config import Config
+from src.utils.response_cache import ResponseCache
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+try:
+    from langchain_core.caches import BaseCache
+    from langchain_core.load import dumps, loads
+    LANGCHAIN_CACHE_AVAILABLE = True
+except ImportError:
+    # langchain-core未安装，ChatOpenAI缓存适配器将不可用
+    # langchain-core not installed, the ChatOpenAI cache adapter will be unavailable
+    BaseCache = object
+    LANGCHAIN_CACHE_AVAILABLE = False
+
+
+def message_hash(messages: Any) -> str:
+    """
+    计算消息的稳定哈希 / Compute a stable hash of the messages
+
+    Args:
+        messages (Any): 提示字符串或消息列表 / Prompt string or list of messages
+
+    Returns:
+        str: SHA-256十六进制摘要 / SHA-256 hex digest
+    """
+    if isinstance(messages, str):
+        payload = messages
+    else:
+        payload = json.dumps(messages, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def llm_cache_key(model: str, temperature: Optional[float], max_tokens: Optional[int], messages: Any) -> str:
+    """
+    构造缓存键 / Build the cache key
+
+    Args:
+        model (str): 模型名称 / Model name
+        temperature (float, optional): 温度 / Temperature
+        max_tokens (int, optional): 最大令牌数 / Maximum tokens
+        messages (Any): 提示字符串或消息列表 / Prompt string or list of messages
+
+    Returns:
+        str: 缓存键 / Cache key
+    """
+    return f"llm/{model}/t={temperature}/max_tokens={max_tokens}/{message_hash(messages)}"
+
+
+class LLMResponseCache:
+    """LLM响应缓存类 / LLM response cache class"""
+
+    def __init__(self, store: ResponseCache, bypass: bool = False):
+        """
+        初始化LLM响应缓存 / Initialize the LLM response cache
+
+        Args:
+            store (ResponseCache): 底层磁盘缓存 / Underlying disk cache
+            bypass (bool): 是否跳过读取（仍写入） / Whether to skip lookups (writes still happen)
+        """
+        self.store = store
+        self.bypass = bypass
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "writes": 0}
+
+    def set_bypass(self, bypass: bool) -> None:
+        """
+        设置是否跳过读取 / Set whether lookups are skipped
+
+        Args:
+            bypass (bool): True时只写不读 / Write-only when True
+        """
+        self.bypass = bypass
+
+    def _count(self, name: str) -> None:
+        """累加统计计数 / Increment a statistics counter"""
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, model: str, temperature: Optional[float], max_tokens: Optional[int], messages: Any) -> Optional[Any]:
+        """
+        读取缓存的响应 / Read a cached response
+
+        Args:
+            model (str): 模型名称 / Model name
+            temperature (float, optional): 温度 / Temperature
+            max_tokens (int, optional): 最大令牌数 / Maximum tokens
+            messages (Any): 提示字符串或消息列表 / Prompt string or list of messages
+
+        Returns:
+            Optional[Any]: 缓存的响应，未命中或跳过读取时返回None / Cached response, or None on a miss or bypass
+        """
+        if self.bypass:
+            self._count("bypassed")
+            return None
+        value = self.store.get(llm_cache_key(model, temperature, max_tokens, messages))
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, model: str, temperature: Optional[float], max_tokens: Optional[int], messages: Any, response: Any) -> None:
+        """
+        写入响应 / Write a response
+
+        Args:
+            model (str): 模型名称 / Model name
+            temperature (float, optional): 温度 / Temperature
+            max_tokens (int, optional): 最大令牌数 / Maximum tokens
+            messages (Any): 提示字符串或消息列表 / Prompt string or list of messages
+            response (Any): 可JSON序列化的响应 / JSON-serializable response
+        """
+        self.store.set(llm_cache_key(model, temperature, max_tokens, messages), response)
+        self._count("writes")
+
+    def clear(self) -> None:
+        """清空缓存 / Clear the cache"""
+        self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息 / Get cache statistics
+
+        Returns:
+            Dict[str, Any]: 命中、未命中、跳过和写入次数，命中率以及底层存储统计
+            / Hits, misses, bypassed lookups and writes, hit rate, and storage statistics
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["bypass"] = self.bypass
+        stats["storage"] = self.store.stats()
+        return stats
+
+
+class LangChainLLMCache(BaseCache):
+    """ChatOpenAI使用的LangChain缓存适配器 / LangChain cache adapter used by ChatOpenAI
+
+    LangChain传入的 prompt 是序列化后的消息，llm_string 包含全部模型参数（含stop等），二者一起参与哈希。
+    / The prompt LangChain passes is the serialized messages and llm_string carries every model parameter
+    (stop sequences included); both go into the hash.
+    """
+
+    def __init__(self, cache: LLMResponseCache, model: str, temperature: Optional[float], max_tokens: Optional[int]):
+        """
+        初始化适配器 / Initialize the adapter
+
+        Args:
+            cache (LLMResponseCache): 共享的LLM响应缓存 / Shared LLM response cache
+            model (str): 模型名称 / Model name
+            temperature (float, optional): 温度 / Temperature
+            max_tokens (int, optional): 最大令牌数 / Maximum tokens
+        """
+        self.cache = cache
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Any]]:
+        """查找缓存的生成结果 / Look up cached generations"""
+        value = self.cache.get(self.model, self.temperature, self.max_tokens, [prompt, llm_string])
+        if value is None:
+            return None
+        try:
+            return [loads(generation) for generation in value]
+        except Exception as e:
+            logger.warning(f"LLM缓存条目无法反序列化，已忽略: {e}")
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        """写入生成结果 / Store generations"""
+        self.cache.set(self.model, self.temperature, self.max_tokens, [prompt, llm_string],
+                       [dumps(generation) for generation in return_val])
+
+    def clear(self, **kwargs: Any) -> None:
+        """清空缓存 / Clear the cache"""
+        self.cache.clear()
+
+
+# (原始LLM类, 缓存) 到带缓存子类的映射 / (original LLM class, cache) to its caching subclass
+_cached_llm_classes: Dict[Tuple[type, int], type] = {}
+_cached_llm_classes_lock = threading.Lock()
+
+
+def _cached_llm_class(llm_class: type, cache: LLMResponseCache) -> type:
+    """获取（或创建）某个LLM类的带缓存子类 / Get (or create) the caching subclass of an LLM class"""
+    with _cached_llm_classes_lock:
+        key = (llm_class, id(cache))
+        cached_class = _cached_llm_classes.get(key)
+        if cached_class is not None:
+            return cached_class
+
+        def call(self, messages, *args, **kwargs):
+            if args or kwargs.get("tools") or kwargs.get("available_functions") or kwargs.get("response_model"):
+                return super(cached_class, self).call(messages, *args, **kwargs)
+            cached = cache.get(self.model, self.temperature, self.max_tokens, messages)
+            if cached is not None:
+                return cached
+            response = super(cached_class, self).call(messages, *args, **kwargs)
+            if isinstance(response, str) and response:
+                cache.set(self.model, self.temperature, self.max_tokens, messages, response)
+            return response
+
+        cached_class = type(f"Cached{llm_class.__name__}", (llm_class,), {"call": call, "__module__": __name__})
+        _cached_llm_classes[key] = cached_class
+        return cached_class
+
+
+def enable_agent_llm_cache(llm: Any, cache: LLMResponseCache) -> Any:
+    """
+    为CrewAI LLM实例启用响应缓存 / Enable response caching on a CrewAI LLM instance
+
+    crewai.LLM(...) 是工厂，会按模型前缀返回原生提供方类（如OpenAICompletion）或LiteLLM实现，因此不能通过继承 crewai.LLM
+    加缓存；这里把实例的类替换为其实际类的带缓存子类。只缓存不带工具定义的文本补全调用（CrewAI智能体的常规调用方式）；
+    原生函数调用会执行工具，因此直接透传。
+    / crewai.LLM(...) is a factory that returns a native provider class (e.g. OpenAICompletion) or the LiteLLM
+    implementation depending on the model prefix, so caching cannot be added by subclassing crewai.LLM; instead the
+    instance's class is swapped for a caching subclass of its actual class. Only plain completions without tool
+    schemas are cached (how CrewAI agents normally call the model); native function calls execute tools, so they are
+    passed through.
+
+    Args:
+        llm (Any): CrewAI LLM实例 / CrewAI LLM instance
+        cache (LLMResponseCache): 共享的LLM响应缓存 / Shared LLM response cache
+
+    Returns:
+        Any: 启用缓存后的同一实例 / The same instance, with caching enabled
+    """
+    llm.__class__ = _cached_llm_class(type(llm), cache)
+    return llm
+
+
+# 共享实例 / Shared instance
+_llm_cache = None
+_llm_cache_initialized = False
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    获取共享的LLM响应缓存，未启用（LLM_CACHE_ENABLED）或不可用时返回None
+    / Get the shared LLM response cache, None if disabled (LLM_CACHE_ENABLED) or unavailable
+
+    Returns:
+        Optional[LLMResponseCache]: 共享缓存实例 / Shared cache instance
+    """
+    global _llm_cache, _llm_cache_initialized
+    with _llm_cache_lock:
+        if not _llm_cache_initialized:
+            _llm_cache_initialized = True
+            if Config.LLM_CACHE_ENABLED:
+                try:
+                    store = ResponseCache(
+                        Config.LLM_CACHE_PATH,
+                        default_ttl=Config.LLM_CACHE_TTL,
+                        max_size_bytes=int(Config.LLM_CACHE_MAX_MB * 1024 * 1024)
+                    )
+                    _llm_cache = LLMResponseCache(store, bypass=Config.LLM_CACHE_BYPASS)
+                except Exception as e:
+                    logger.warning(f"LLM缓存不可用，将直接调用模型: {e} / LLM cache unavailable, calling the model directly: {e}")
+                    _llm_cache = None
+        return _llm_cache
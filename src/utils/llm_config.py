@@ -5,8 +5,8 @@ LLM配置工具
 """
 
 import os
-from langchain_openai import ChatOpenAI
 from ..config.config import Config
+from .llm_registry import get_llm_registry
 
 def create_llm(temperature=None, max_tokens=None):
     """
@@ -24,14 +24,17 @@ def create_llm(temperature=None, max_tokens=None):
     if not model_name:
         raise ValueError("QWEN_MODEL_NAME 未在环境变量中设置")
     
+    temperature = temperature or Config.MODEL_TEMPERATURE
+    max_tokens = max_tokens or Config.MODEL_MAX_TOKENS
+    
     # 使用环境变量中定义的完整模型名称，不进行前缀处理
-    # 创建ChatOpenAI实例 / Create ChatOpenAI instance
-    llm = ChatOpenAI(
+    # 从注册表获取共享连接池上的ChatOpenAI实例 / Get a ChatOpenAI instance on the shared connection pool from the registry
+    llm = get_llm_registry().chat_model(
         base_url=Config.QWEN_API_BASE,    # API基础URL / API base URL
         api_key=Config.QWEN_API_KEY,      # API密钥 / API key
         model=model_name,                 # 模型名称 / Model name
-        temperature=temperature or Config.MODEL_TEMPERATURE,  # 温度参数 / Temperature parameter
-        max_tokens=max_tokens or Config.MODEL_MAX_TOKENS,     # 最大令牌数 / Maximum tokens
+        temperature=temperature,          # 温度参数 / Temperature parameter
+        max_tokens=max_tokens,            # 最大令牌数 / Maximum tokens
         streaming=False  # 禁用流式输出 / Disable streaming output
     )
     
@@ -62,13 +65,14 @@ def create_eas_llm():
         # 直接使用API密钥进行认证
         api_key = Config.EAS_TOKEN
         
-        eas_llm = ChatOpenAI(
+        # 同一配置的EAS实例在注册表中只创建一次 / The registry creates the EAS instance for one configuration only once
+        eas_llm = get_llm_registry().chat_model(
             base_url=base_url,
             api_key=api_key,
             model=model_name,
             temperature=Config.MODEL_TEMPERATURE,
-            streaming=False,
-            max_tokens=Config.MODEL_MAX_TOKENS
+            max_tokens=Config.MODEL_MAX_TOKENS,
+            streaming=False
         )
         return eas_llm
     except Exception as e:
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+LLM客户端注册表 / LLM Client Registry
+每个API端点共享一个带连接池的HTTP传输（keep-alive，可预热），并按 (模型, 温度, max_tokens) 发放轻量的客户端视图，
+使反复创建智能体不再重复建立连接和TLS握手
+/ One pooled HTTP transport per API endpoint (keep-alive, optionally pre-warmed), handing out lightweight client views
+per (model, temperature, max_tokens), so creating agents again and again no longer repeats connection setup and TLS
+handshakes
+
+两类视图 / Two kinds of views:
+    chat_model  LangChain ChatOpenAI，供直接 invoke() 的调用方使用（如TaskAllocator）
+                / LangChain ChatOpenAI for callers that invoke() directly (e.g. TaskAllocator)
+    agent_llm   CrewAI LLM，供智能体使用。CrewAI会把LangChain模型重建为自己的LLM并丢弃其http_client，因此智能体必须直接
+                使用注册表创建的CrewAI LLM，其OpenAI客户端（或LiteLLM的client_session）绑定到共享传输
+                / CrewAI LLM for agents. CrewAI rebuilds LangChain models as its own LLM and drops their http_client,
+                so agents must use CrewAI LLMs built by the registry, whose OpenAI client (or LiteLLM's
+                client_session) is bound to the shared transport
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from src.config.config import Config
+from src.utils.llm_cache import LANGCHAIN_CACHE_AVAILABLE, LangChainLLMCache, enable_agent_llm_cache, get_llm_cache
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def _secret(value: Any) -> Optional[str]:
+    """取出SecretStr中的明文 / Unwrap a SecretStr"""
+    if hasattr(value, "get_secret_value"):
+        return value.get_secret_value()
+    return value
+
+
+class LLMClientRegistry:
+    """LLM客户端注册表类 / LLM client registry class
+
+    1. 传输：每个 base_url 一个 httpx.Client，所有视图共享其连接池
+    2. 视图：相同 (base_url, 模型, 温度, max_tokens) 的客户端只创建一次
+    3. 预热：首次使用端点时在后台发起一次轻量请求，提前完成TCP/TLS握手
+    / 1. Transports: one httpx.Client per base_url, whose connection pool all views share
+    2. Views: a client for the same (base_url, model, temperature, max_tokens) is created once
+    3. Pre-warming: the first use of an endpoint fires a cheap background request to finish TCP/TLS setup early
+    """
+
+    def __init__(self,
+                 max_connections: int = 20,
+                 keepalive_connections: int = 10,
+                 keepalive_expiry: float = 120.0,
+                 timeout: float = 120.0,
+                 prewarm: bool = True):
+        """
+        初始化注册表 / Initialize the registry
+
+        Args:
+            max_connections (int): 每个端点的最大连接数 / Maximum connections per endpoint
+            keepalive_connections (int): 每个端点保持的空闲连接数 / Idle connections kept per endpoint
+            keepalive_expiry (float): 空闲连接的保持时间（秒） / Idle connection lifetime (seconds)
+            timeout (float): 请求超时（秒） / Request timeout (seconds)
+            prewarm (bool): 是否预热新端点的连接 / Whether to pre-warm connections to new endpoints
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self.prewarm = prewarm
+
+        self._lock = threading.Lock()
+        self._transports: Dict[str, httpx.Client] = {}
+        self._views: Dict[Tuple[Any, ...], Any] = {}
+        self._stats = {"transports": 0, "views_created": 0, "views_reused": 0, "prewarmed": 0, "prewarm_failed": 0}
+
+    def transport(self, base_url: str, api_key: Optional[str] = None) -> httpx.Client:
+        """
+        获取端点共享的HTTP传输 / Get the shared HTTP transport of an endpoint
+
+        Args:
+            base_url (str): API基础URL / API base URL
+            api_key (str, optional): 用于预热请求的API密钥 / API key used by the warm-up request
+
+        Returns:
+            httpx.Client: 共享的HTTP客户端 / Shared HTTP client
+        """
+        key = (base_url or "").rstrip("/")
+        with self._lock:
+            client = self._transports.get(key)
+            if client is not None:
+                return client
+            client = httpx.Client(limits=self.limits, timeout=self.timeout)
+            self._transports[key] = client
+            self._stats["transports"] += 1
+        if self.prewarm and key:
+            threading.Thread(target=self._warm, args=(client, key, api_key), daemon=True,
+                             name=f"llm-prewarm-{key}").start()
+        return client
+
+    def _warm(self, client: httpx.Client, base_url: str, api_key: Optional[str]) -> None:
+        """发起一次轻量请求以建立连接（响应内容被忽略） / Fire a cheap request to open a connection (the response is ignored)"""
+        start_time = time.perf_counter()
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        try:
+            client.get(f"{base_url}/models", headers=headers, timeout=10)
+            with self._lock:
+                self._stats["prewarmed"] += 1
+            logger.info(f"已预热LLM端点连接 {base_url}（{(time.perf_counter() - start_time) * 1000:.0f} ms）")
+        except httpx.HTTPError as e:
+            with self._lock:
+                self._stats["prewarm_failed"] += 1
+            logger.info(f"预热LLM端点连接失败 {base_url}: {e}")
+
+    def chat_model(self,
+                   base_url: str,
+                   api_key: Any,
+                   model: str,
+                   temperature: Optional[float],
+                   max_tokens: Optional[int],
+                   streaming: bool = False) -> Any:
+        """
+        获取共享传输上的ChatOpenAI视图 / Get a ChatOpenAI view on the shared transport
+
+        Args:
+            base_url (str): API基础URL / API base URL
+            api_key (Any): API密钥（str或SecretStr） / API key (str or SecretStr)
+            model (str): 模型名称 / Model name
+            temperature (float, optional): 温度 / Temperature
+            max_tokens (int, optional): 最大令牌数 / Maximum tokens
+            streaming (bool): 是否流式输出 / Whether to stream
+
+        Returns:
+            ChatOpenAI: 共享的客户端视图 / Shared client view
+        """
+        from langchain_openai import ChatOpenAI
+
+        api_key = _secret(api_key)
+        key = (base_url, api_key, model, temperature, max_tokens, streaming)
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._stats["views_reused"] += 1
+                return view
+
+        kwargs = {}
+        llm_cache = get_llm_cache()
+        if llm_cache is not None and LANGCHAIN_CACHE_AVAILABLE:
+            # 可选的响应缓存 / Optional response cache
+            kwargs["cache"] = LangChainLLMCache(llm_cache, model, temperature, max_tokens)
+        view = ChatOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            streaming=streaming,
+            http_client=self.transport(base_url, api_key),
+            **kwargs
+        )
+        with self._lock:
+            # 并发创建时保留先注册的视图 / Keep the first registered view when created concurrently
+            registered = self._views.setdefault(key, view)
+            self._stats["views_created" if registered is view else "views_reused"] += 1
+        return registered
+
+    def agent_llm(self,
+                  base_url: str,
+                  api_key: Any,
+                  model: str,
+                  temperature: Optional[float],
+                  max_tokens: Optional[int],
+                  streaming: bool = False) -> Any:
+        """
+        获取共享传输上的CrewAI LLM视图（启用LLM缓存时带缓存） / Get a CrewAI LLM view on the shared transport (with
+        caching when the LLM cache is enabled)
+
+        同一配置的视图只创建一次，由所有使用该配置的智能体共享。
+        / A view is created once per configuration and shared by every agent using that configuration.
+
+        Args:
+            base_url (str): API基础URL / API base URL
+            api_key (Any): API密钥（str或SecretStr） / API key (str or SecretStr)
+            model (str): 带提供方前缀的模型名称（如 openai/qwen-plus） / Model name with provider prefix (e.g. openai/qwen-plus)
+            temperature (float, optional): 温度 / Temperature
+            max_tokens (int, optional): 最大令牌数 / Maximum tokens
+            streaming (bool): 是否流式输出 / Whether to stream
+
+        Returns:
+            crewai.LLM: 共享的智能体LLM / Shared agent LLM
+        """
+        from crewai import LLM
+
+        api_key = _secret(api_key)
+        llm_cache = get_llm_cache()
+        key = ("agent", base_url, api_key, model, temperature, max_tokens, streaming, llm_cache is not None)
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._stats["views_reused"] += 1
+                return view
+
+        view = LLM(
+            model=model,
+            base_url=base_url,
+            api_key=api_key,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=streaming
+        )
+        self._bind_transport(view, base_url, api_key)
+        if llm_cache is not None:
+            # 可选的响应缓存 / Optional response cache
+            enable_agent_llm_cache(view, llm_cache)
+        with self._lock:
+            # 并发创建时保留先注册的视图 / Keep the first registered view when created concurrently
+            registered = self._views.setdefault(key, view)
+            self._stats["views_created" if registered is view else "views_reused"] += 1
+        return registered
+
+    def _bind_transport(self, llm: Any, base_url: str, api_key: Optional[str]) -> None:
+        """
+        让CrewAI LLM使用端点的共享传输 / Make a CrewAI LLM use the endpoint's shared transport
+
+        原生OpenAI提供方：用共享传输重建其同步OpenAI客户端；LiteLLM实现：共享传输设为 litellm.client_session
+        （进程级，httpx按主机分别维护连接池）。
+        / Native OpenAI provider: rebuild its sync OpenAI client on the shared transport; LiteLLM implementation:
+        the shared transport becomes litellm.client_session (process-wide; httpx pools connections per host).
+        """
+        transport = self.transport(base_url, api_key)
+        if getattr(llm, "is_litellm", False):
+            try:
+                import litellm
+            except ImportError:
+                return
+            if litellm.client_session is None:
+                litellm.client_session = transport
+            return
+        try:
+            from crewai.llms.providers.openai.completion import OpenAICompletion
+            from openai import OpenAI
+        except ImportError:
+            OpenAICompletion = None
+        if OpenAICompletion is not None and isinstance(llm, OpenAICompletion):
+            try:
+                llm._client = OpenAI(**{**llm._get_client_params(), "http_client": transport})
+            except ValueError as e:
+                # 缺少API密钥时保留CrewAI的延迟创建 / Keep CrewAI's deferred client creation when the API key is missing
+                logger.info(f"智能体LLM未绑定共享传输: {e}")
+        else:
+            logger.info(f"{type(llm).__name__} 不支持绑定共享传输，将使用其自带的HTTP客户端")
+
+    def close(self) -> None:
+        """关闭所有传输并清空视图 / Close every transport and drop all views"""
+        with self._lock:
+            transports = list(self._transports.values())
+            self._transports.clear()
+            self._views.clear()
+        try:
+            import litellm
+            if litellm.client_session in transports:
+                litellm.client_session = None
+        except ImportError:
+            pass
+        for client in transports:
+            client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取注册表统计 / Get registry statistics
+
+        Returns:
+            Dict[str, Any]: 传输数、视图创建/复用次数和预热结果 / Transports, views created/reused and warm-up outcomes
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["endpoints"] = list(self._transports)
+            stats["views"] = len(self._views)
+        return stats
+
+
+# 共享实例 / Shared instance
+_llm_registry = None
+_llm_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    """
+    获取共享的LLM客户端注册表 / Get the shared LLM client registry
+
+    Returns:
+        LLMClientRegistry: 进程内共享的注册表 / Process-wide shared registry
+    """
+    global _llm_registry
+    with _llm_registry_lock:
+        if _llm_registry is None:
+            _llm_registry = LLMClientRegistry(
+                max_connections=Config.LLM_POOL_MAX_CONNECTIONS,
+                keepalive_connections=Config.LLM_POOL_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=Config.LLM_POOL_KEEPALIVE_EXPIRY,
+                timeout=Config.LLM_HTTP_TIMEOUT,
+                prewarm=Config.LLM_PREWARM
+            )
+        return _llm_registry
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+运行级材料上下文 / Run-scoped Material Context
+在一次工作流运行内按规范化学式记忆材料标识、Materials Project和PubChem的查询结果，使每个材料每次运行只解析一次
+/ Memoizes material identification, Materials Project hits and PubChem hits per canonical formula within one workflow
+run, so each material is resolved once per run
+
+用法 / Usage:
+    with material_context() as context:
+        crew.kickoff()          # 工具调用自动复用 context 中的结果 / tool calls reuse results held by the context
+        print(context.stats())
+"""
+
+import copy
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def _is_reusable(result: Any) -> bool:
+    """查询错误（"未找到"除外）不在运行内复用，以便后续调用可以重试 / Lookup errors (other than "not found") are not reused so later calls can retry"""
+    if isinstance(result, dict) and "error" in result:
+        return bool(result.get("not_found"))
+    if isinstance(result, dict) and result.get("validation_status") == "error":
+        return False
+    return True
+
+
+class MaterialContext:
+    """运行级材料上下文类 / Run-scoped material context class
+
+    与进程级缓存不同，上下文只在一次运行内有效，运行结束即丢弃，因此不需要TTL。
+    同一键的并发解析只执行一次，其余调用方等待结果；调用方得到结果的深拷贝。
+    / Unlike process-wide caches, a context only lives for one run and is dropped afterwards, so no TTL is needed.
+    Concurrent resolutions of the same key run once while other callers wait; callers receive deep copies.
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        """
+        初始化材料上下文 / Initialize the material context
+
+        Args:
+            run_id (str, optional): 运行标识，默认随机生成 / Run identifier, random by default
+        """
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.created_at = time.time()
+
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Hashable], Future] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+    def resolve(self, kind: str, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        获取记忆的结果，首次出现时调用func解析 / Get the memoized result, calling func on first sight
+
+        Args:
+            kind (str): 结果类别，如 "identify"、"mp_search"、"pubchem_search" / Result kind
+            key (Hashable): 规范化的键（通常包含规范化学式） / Normalized key (usually containing the canonical formula)
+            func (Callable): 解析函数 / Resolver
+
+        Returns:
+            Any: 结果的深拷贝 / Deep copy of the result
+        """
+        entry_key = (kind, key)
+        with self._lock:
+            future = self._entries.get(entry_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._entries[entry_key] = future
+                self._misses[kind] = self._misses.get(kind, 0) + 1
+            else:
+                self._hits[kind] = self._hits.get(kind, 0) + 1
+
+        if not owner:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._entries.pop(entry_key, None)
+            future.set_exception(e)
+            raise
+        if not _is_reusable(result):
+            # 等待中的调用方仍得到本次结果，但之后的调用会重新解析 / Current waiters still get this result, later calls re-resolve
+            with self._lock:
+                self._entries.pop(entry_key, None)
+        future.set_result(result)
+        return copy.deepcopy(result)
+
+    def peek(self, kind: str, key: Hashable) -> Optional[Any]:
+        """
+        获取已解析完成的结果（不触发解析） / Get an already resolved result without resolving
+
+        Args:
+            kind (str): 结果类别 / Result kind
+            key (Hashable): 规范化的键 / Normalized key
+
+        Returns:
+            Optional[Any]: 结果的深拷贝，未解析时返回None / Deep copy of the result, or None if not resolved
+        """
+        with self._lock:
+            future = self._entries.get((kind, key))
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return copy.deepcopy(future.result())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取上下文统计 / Get context statistics
+
+        Returns:
+            Dict[str, Any]: 各类别的命中与解析次数 / Hits and resolutions per kind
+        """
+        with self._lock:
+            kinds = sorted(set(self._hits) | set(self._misses))
+            return {
+                "run_id": self.run_id,
+                "entries": len(self._entries),
+                "age_seconds": round(time.time() - self.created_at, 3),
+                "kinds": {
+                    kind: {"hits": self._hits.get(kind, 0), "resolved": self._misses.get(kind, 0)}
+                    for kind in kinds
+                }
+            }
+
+
+# 当前生效的上下文栈（进程级，使CrewAI在其他线程中执行的工具也能看到） / Stack of active contexts (process-wide so
+# tools that CrewAI runs on other threads see it too)
+_active_contexts: List[MaterialContext] = []
+_active_lock = threading.Lock()
+
+
+def get_material_context() -> Optional[MaterialContext]:
+    """
+    获取当前生效的材料上下文 / Get the active material context
+
+    Returns:
+        Optional[MaterialContext]: 当前上下文，没有运行中的工作流时返回None / Active context, or None outside a run
+    """
+    with _active_lock:
+        return _active_contexts[-1] if _active_contexts else None
+
+
+@contextmanager
+def material_context(run_id: Optional[str] = None) -> Iterator[MaterialContext]:
+    """
+    在with块内激活一个新的材料上下文 / Activate a fresh material context for the duration of a with block
+
+    Args:
+        run_id (str, optional): 运行标识 / Run identifier
+
+    Yields:
+        MaterialContext: 新的上下文 / The new context
+    """
+    context = MaterialContext(run_id)
+    with _active_lock:
+        _active_contexts.append(context)
+    try:
+        yield context
+    finally:
+        with _active_lock:
+            if context in _active_contexts:
+                _active_contexts.remove(context)
+        logger.info(f"材料上下文 {context.run_id} 结束: {context.stats()}")
+
+
+@contextmanager
+def ensure_material_context() -> Iterator[MaterialContext]:
+    """
+    复用当前上下文，没有时临时创建一个 / Reuse the active context, or create a temporary one
+
+    Yields:
+        MaterialContext: 生效的上下文 / The effective context
+    """
+    context = get_material_context()
+    if context is not None:
+        yield context
+        return
+    with material_context() as context:
+        yield context
+
+
+def resolve_in_context(kind: str, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    有生效的上下文时通过它记忆结果，否则直接调用 / Memoize through the active context if any, otherwise call directly
+
+    Args:
+        kind (str): 结果类别 / Result kind
+        key (Hashable): 规范化的键 / Normalized key
+        func (Callable): 解析函数 / Resolver
+
+    Returns:
+        Any: 结果 / Result
+    """
+    context = get_material_context()
+    if context is None:
+        return func(*args, **kwargs)
+    return context.resolve(kind, key, func, *args, **kwargs)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+速率限制工具 / Rate Limiter Utility
+进程内共享的令牌桶速率限制器，按主机注册，同时支持线程和asyncio调用；以及基于AIMD的自适应并发限制器
+/ Process-wide token-bucket rate limiters registered per host, usable from threads and asyncio,
+plus an AIMD-based adaptive concurrency limiter
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """令牌桶速率限制器 / Token-bucket rate limiter
+
+    采用预约模式：调用方在锁内预约令牌并计算需要等待的时间，然后在锁外休眠，
+    因此同一个限制器可以同时服务于阻塞线程和asyncio协程，且按到达顺序公平分配。
+    / Uses a reservation model: callers reserve a token under the lock and compute how long to wait,
+    then sleep outside the lock, so one limiter can serve blocking threads and asyncio coroutines fairly.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, name: str = ""):
+        """
+        初始化令牌桶 / Initialize token bucket
+
+        Args:
+            rate (float): 每秒补充的令牌数 / Tokens refilled per second
+            capacity (float): 令牌桶容量（突发上限） / Bucket capacity (burst size)
+            name (str): 限制器名称（通常为主机名） / Limiter name (usually the host)
+        """
+        if rate <= 0:
+            raise ValueError("rate必须大于0 / rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+        self._acquired = 0
+        self._waited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _reserve(self, tokens: float = 1.0) -> float:
+        """
+        预约令牌并返回需要等待的秒数 / Reserve tokens and return the seconds to wait
+
+        Args:
+            tokens (float): 需要的令牌数 / Tokens required
+
+        Returns:
+            float: 需要等待的秒数 / Seconds to wait before proceeding
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+            # 令牌可以透支，透支部分即为后续调用方的排队时间
+            # Tokens may go negative; the deficit becomes the queueing delay for later callers
+            self._tokens -= tokens
+            wait = 0.0
+            if self._tokens < 0:
+                wait = -self._tokens / self.rate
+            if self._paused_until > now:
+                wait = max(wait, self._paused_until - now)
+
+            self._acquired += 1
+            if wait > 0:
+                self._waited += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            return wait
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        阻塞获取令牌 / Acquire tokens, blocking the current thread
+
+        Args:
+            tokens (float): 需要的令牌数 / Tokens required
+
+        Returns:
+            float: 实际等待的秒数 / Seconds waited
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        异步获取令牌，不阻塞事件循环 / Acquire tokens without blocking the event loop
+
+        Args:
+            tokens (float): 需要的令牌数 / Tokens required
+
+        Returns:
+            float: 实际等待的秒数 / Seconds waited
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        暂停发放令牌（例如服务器返回Retry-After时），影响所有共享该主机的客户端
+        / Pause token issuance (e.g. on Retry-After), affecting every client sharing this host
+
+        Args:
+            seconds (float): 暂停秒数 / Seconds to pause
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取等待时间统计 / Get wait-time statistics
+
+        Returns:
+            Dict[str, Any]: 获取次数、等待次数、总/平均/最大等待时间 / Acquire count, wait count, total/average/max wait
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "rate": self.rate,
+                "capacity": self.capacity,
+                "acquired": self._acquired,
+                "waited": self._waited,
+                "total_wait_seconds": round(self._total_wait, 4),
+                "avg_wait_seconds": round(self._total_wait / self._acquired, 4) if self._acquired else 0.0,
+                "max_wait_seconds": round(self._max_wait, 4)
+            }
+
+
+class AdaptiveConcurrencyLimiter:
+    """自适应并发限制器（AIMD） / Adaptive concurrency limiter (AIMD)
+
+    允许同时存在多个进行中的请求，上限随服务器反馈调整：
+    每次成功请求线性增加上限（加性增），遇到限流或服务器错误时按比例减小上限（乘性减）。
+    / Allows several in-flight requests; the limit follows server feedback:
+    each success raises it additively, throttling or server errors cut it multiplicatively.
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 4,
+                 initial_concurrency: Optional[float] = None,
+                 min_concurrency: int = 1,
+                 increase_step: float = 1.0,
+                 decrease_factor: float = 0.5,
+                 name: str = ""):
+        """
+        初始化自适应并发限制器 / Initialize adaptive concurrency limiter
+
+        Args:
+            max_concurrency (int): 并发上限的最大值 / Ceiling for the concurrency limit
+            initial_concurrency (float, optional): 初始并发上限 / Initial concurrency limit
+            min_concurrency (int): 并发上限的最小值 / Floor for the concurrency limit
+            increase_step (float): 每个"窗口"成功后增加的并发数 / Limit increase per window of successes
+            decrease_factor (float): 限流时的乘性减小系数 / Multiplicative decrease factor on throttling
+            name (str): 限制器名称 / Limiter name
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_concurrency = max(1, min(int(min_concurrency), self.max_concurrency))
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.name = name
+
+        initial = initial_concurrency if initial_concurrency is not None else self.max_concurrency
+        self._limit = float(min(self.max_concurrency, max(self.min_concurrency, initial)))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+        self._successes = 0
+        self._throttles = 0
+        self._waited = 0
+        self._total_wait = 0.0
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限 / Current concurrency limit"""
+        return max(self.min_concurrency, int(self._limit))
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        获取一个并发槽位，必要时阻塞等待 / Acquire a concurrency slot, blocking if needed
+
+        Args:
+            timeout (float, optional): 最长等待时间（秒） / Maximum wait (seconds)
+
+        Returns:
+            float: 实际等待的秒数 / Seconds waited
+        """
+        start = time.monotonic()
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < self.limit, timeout=timeout):
+                raise TimeoutError(f"等待并发槽位超时 / Timed out waiting for a concurrency slot ({self.name})")
+            self._in_flight += 1
+            waited = time.monotonic() - start
+            if waited > 0.001:
+                self._waited += 1
+                self._total_wait += waited
+            return waited
+
+    def release(self, throttled: bool = False) -> None:
+        """
+        释放槽位并根据结果调整并发上限 / Release a slot and adapt the limit from the outcome
+
+        Args:
+            throttled (bool): 请求是否遭遇限流或服务器错误 / Whether the request was throttled or hit a server error
+        """
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            if throttled:
+                self._throttles += 1
+                self._limit = max(float(self.min_concurrency), self._limit * self.decrease_factor)
+            else:
+                self._successes += 1
+                # 每完成约一个窗口（limit次）成功请求，上限增加increase_step
+                # Roughly one window (limit successes) raises the limit by increase_step
+                self._limit = min(float(self.max_concurrency), self._limit + self.increase_step / max(self._limit, 1.0))
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取并发统计 / Get concurrency statistics
+
+        Returns:
+            Dict[str, Any]: 当前上限、进行中请求数、成功/限流次数和等待时间 / Current limit, in-flight count, successes/throttles and wait time
+        """
+        with self._condition:
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "successes": self._successes,
+                "throttles": self._throttles,
+                "waited": self._waited,
+                "total_wait_seconds": round(self._total_wait, 4)
+            }
+
+
+# 按主机注册的全局限制器 / Global limiters registered per host
+_host_limiters: Dict[str, TokenBucketRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def _host_from(url_or_host: str) -> str:
+    """从URL或主机名中提取主机 / Extract the host from a URL or host name"""
+    if "://" in url_or_host:
+        return urlparse(url_or_host).netloc.lower()
+    return url_or_host.split("/", 1)[0].lower()
+
+
+def register_rate_limiter(url_or_host: str, rate: float, capacity: float = 1.0) -> TokenBucketRateLimiter:
+    """
+    为主机注册（或替换）速率限制器 / Register (or replace) the rate limiter for a host
+
+    Args:
+        url_or_host (str): 主机名或URL / Host name or URL
+        rate (float): 每秒请求数 / Requests per second
+        capacity (float): 突发上限 / Burst capacity
+
+    Returns:
+        TokenBucketRateLimiter: 注册的限制器 / Registered limiter
+    """
+    host = _host_from(url_or_host)
+    limiter = TokenBucketRateLimiter(rate, capacity, name=host)
+    with _registry_lock:
+        _host_limiters[host] = limiter
+    return limiter
+
+
+def get_rate_limiter(url_or_host: str,
+                     rate: Optional[float] = None,
+                     capacity: Optional[float] = None) -> TokenBucketRateLimiter:
+    """
+    获取主机共享的速率限制器，不存在时按给定参数创建 / Get the shared limiter for a host, creating it if needed
+
+    Args:
+        url_or_host (str): 主机名或URL / Host name or URL
+        rate (float, optional): 首次创建时的每秒请求数 / Requests per second when first created
+        capacity (float, optional): 首次创建时的突发上限 / Burst capacity when first created
+
+    Returns:
+        TokenBucketRateLimiter: 共享的限制器 / Shared limiter
+    """
+    host = _host_from(url_or_host)
+    with _registry_lock:
+        limiter = _host_limiters.get(host)
+        if limiter is None:
+            limiter = TokenBucketRateLimiter(rate or 1.0, capacity or 1.0, name=host)
+            _host_limiters[host] = limiter
+        return limiter
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    获取所有主机限制器的统计信息 / Get statistics for all host limiters
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 以主机为键的统计信息 / Statistics keyed by host
+    """
+    with _registry_lock:
+        limiters = dict(_host_limiters)
+    return {host: limiter.stats() for host, limiter in limiters.items()}
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+响应缓存工具 / Response Cache Utility
+基于SQLite的磁盘响应缓存，支持按端点设置TTL、按大小LRU淘汰以及命中统计
+/ SQLite-backed on-disk response cache with per-endpoint TTLs, size-based LRU eviction and hit statistics
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# 默认缓存目录 / Default cache directory
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ecomats")
+
+
+class ResponseCache:
+    """磁盘响应缓存类 / On-disk response cache class
+
+    缓存值以JSON形式存储，键通常为API端点：
+    1. 按端点前缀/关键字匹配TTL（首个匹配的规则生效）
+    2. 总大小超过上限时按最近访问时间（LRU）淘汰
+    3. 记录命中、未命中、过期和淘汰次数
+    """
+
+    def __init__(self,
+                 db_path: str,
+                 default_ttl: float = 86400,
+                 ttl_rules: Optional[List[Tuple[str, float]]] = None,
+                 max_size_bytes: int = 64 * 1024 * 1024):
+        """
+        初始化响应缓存 / Initialize response cache
+
+        Args:
+            db_path (str): SQLite数据库文件路径 / SQLite database file path
+            default_ttl (float): 默认过期时间（秒） / Default time-to-live (seconds)
+            ttl_rules (List[Tuple[str, float]], optional): (端点关键字, TTL秒数) 规则列表 / List of (endpoint keyword, TTL seconds) rules
+            max_size_bytes (int): 缓存总大小上限（字节） / Maximum total cache size (bytes)
+        """
+        self.db_path = db_path
+        self.default_ttl = default_ttl
+        self.ttl_rules = list(ttl_rules or [])
+        self.max_size_bytes = max_size_bytes
+
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "writes": 0}
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache(last_access)")
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()
+        self._total_size = int(row[0])
+
+    def ttl_for(self, key: str) -> float:
+        """
+        获取键对应的TTL / Get TTL for a key
+
+        Args:
+            key (str): 缓存键 / Cache key
+
+        Returns:
+            float: TTL秒数 / TTL in seconds
+        """
+        for pattern, ttl in self.ttl_rules:
+            if pattern in key:
+                return ttl
+        return self.default_ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        读取缓存值 / Read cached value
+
+        Args:
+            key (str): 缓存键 / Cache key
+
+        Returns:
+            Optional[Any]: 缓存值，未命中或已过期时返回None / Cached value, or None on miss/expiry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            value, size, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._total_size -= size
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+            self._stats["hits"] += 1
+
+        try:
+            return json.loads(value)
+        except ValueError as e:
+            logger.warning(f"缓存数据损坏，忽略该条目: {e} / Corrupted cache entry ignored: {e}")
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        写入缓存值 / Write cached value
+
+        Args:
+            key (str): 缓存键 / Cache key
+            value (Any): 可JSON序列化的值 / JSON-serializable value
+            ttl (float, optional): 过期时间（秒），默认按规则计算 / TTL in seconds, defaults to rule-based TTL
+        """
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"无法序列化缓存值: {e} / Unable to serialize cache value: {e}")
+            return
+
+        size = len(payload.encode("utf-8"))
+        if size > self.max_size_bytes:
+            return
+
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl_for(key))
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._total_size -= row[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, size, now, expires_at, now)
+            )
+            self._total_size += size
+            self._stats["writes"] += 1
+            self._evict_locked()
+
+    def delete(self, key: str) -> None:
+        """
+        删除缓存条目 / Delete a cache entry
+
+        Args:
+            key (str): 缓存键 / Cache key
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._total_size -= row[0]
+
+    def clear(self) -> None:
+        """清空缓存 / Clear the cache"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._total_size = 0
+
+    def _evict_locked(self) -> None:
+        """按LRU顺序淘汰条目直到总大小低于上限（调用方需持有锁） / Evict entries in LRU order until under the size limit (caller holds the lock)"""
+        if self._total_size <= self.max_size_bytes:
+            return
+
+        # 先清理已过期的条目 / Drop expired entries first
+        now = time.time()
+        expired = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM cache WHERE expires_at <= ?", (now,)
+        ).fetchone()
+        if expired[1]:
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            self._total_size -= int(expired[0])
+            self._stats["evictions"] += expired[1]
+
+        cursor = self._conn.execute("SELECT key, size FROM cache ORDER BY last_access ASC")
+        victims = []
+        for key, size in cursor:
+            if self._total_size <= self.max_size_bytes:
+                break
+            victims.append((key,))
+            self._total_size -= size
+        if victims:
+            self._conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+            self._stats["evictions"] += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息 / Get cache statistics
+
+        Returns:
+            Dict[str, Any]: 命中/未命中次数、命中率、条目数和大小 / Hit/miss counts, hit rate, entry count and size
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            stats = dict(self._stats)
+            stats["entries"] = entries
+            stats["size_bytes"] = self._total_size
+            stats["max_size_bytes"] = self.max_size_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+请求合并工具 / Singleflight Utility
+并发的相同请求（相同的规范化键）共享同一个进行中的调用，只有第一个调用方真正发送请求
+/ Concurrent identical requests (same normalized key) share one in-flight call; only the first caller actually sends it
+"""
+
+import asyncio
+import copy
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """请求合并类 / Request coalescing class
+
+    与缓存不同，合并只作用于同时进行中的调用：调用完成后键即被移除，下一次调用会重新执行。
+    等待方默认得到结果的深拷贝，避免调用方之间互相修改同一个字典。
+    / Unlike a cache, coalescing only covers calls that overlap in time: the key is dropped once the call
+    finishes. Waiters receive a deep copy of the result by default so callers cannot mutate each other's dicts.
+    """
+
+    def __init__(self, name: str = "", copy_result: bool = True):
+        """
+        初始化请求合并器 / Initialize the coalescer
+
+        Args:
+            name (str): 名称（用于统计） / Name (used in statistics)
+            copy_result (bool): 是否向等待方返回结果的深拷贝 / Whether waiters receive a deep copy of the result
+        """
+        self.name = name
+        self.copy_result = copy_result
+
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+
+        self._executed = 0
+        self._coalesced = 0
+
+    def _share(self, result: Any) -> Any:
+        """返回给等待方的结果 / Result handed to a waiter"""
+        return copy.deepcopy(result) if self.copy_result else result
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        执行调用，若相同键的调用正在进行则等待其结果 / Run the call, or wait for the in-flight call with the same key
+
+        Args:
+            key (Hashable): 规范化的请求键 / Normalized request key
+            func (Callable): 实际执行的函数 / Function doing the work
+
+        Returns:
+            Any: 调用结果（异常同样会传递给所有等待方） / Call result (exceptions propagate to every waiter too)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._calls[key] = future
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            return self._share(future.result())
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        异步执行调用，若同一事件循环中相同键的调用正在进行则等待其结果
+        / Run the call asynchronously, or await the in-flight call with the same key on the same event loop
+
+        Args:
+            key (Hashable): 规范化的请求键 / Normalized request key
+            func (Callable[[], Awaitable]): 返回协程的函数 / Function returning the coroutine doing the work
+
+        Returns:
+            Any: 调用结果 / Call result
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            future = self._async_calls.get(loop_key)
+            if future is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                future = loop.create_future()
+                self._async_calls[loop_key] = future
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            # shield: 一个等待方被取消不应取消共享的调用 / One cancelled waiter must not cancel the shared call
+            return self._share(await asyncio.shield(future))
+
+        try:
+            result = await func()
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # 没有等待方时避免"exception was never retrieved"警告 / Avoid "never retrieved" warnings when nobody waits
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._async_calls.pop(loop_key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取合并统计 / Get coalescing statistics
+
+        Returns:
+            Dict[str, Any]: 实际执行次数、被合并次数和进行中的调用数 / Executed count, coalesced count and in-flight calls
+        """
+        with self._lock:
+            calls = self._executed + self._coalesced
+            return {
+                "name": self.name,
+                "calls": calls,
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "coalesced_rate": round(self._coalesced / calls, 4) if calls else 0.0,
+                "in_flight": len(self._calls) + len(self._async_calls)
+            }
+
+
+# 按名称注册的全局合并器 / Global coalescers registered by name
+_singleflights: Dict[str, SingleFlight] = {}
+_registry_lock = threading.Lock()
+
+
+def get_singleflight(name: str, copy_result: bool = True) -> SingleFlight:
+    """
+    获取按名称共享的请求合并器 / Get the coalescer shared under a name
+
+    Args:
+        name (str): 合并器名称（通常为工具或主机名） / Coalescer name (usually the tool or host)
+        copy_result (bool): 首次创建时是否向等待方返回深拷贝 / Whether waiters get deep copies, when first created
+
+    Returns:
+        SingleFlight: 共享的合并器 / Shared coalescer
+    """
+    with _registry_lock:
+        singleflight = _singleflights.get(name)
+        if singleflight is None:
+            singleflight = SingleFlight(name, copy_result=copy_result)
+            _singleflights[name] = singleflight
+        return singleflight
+
+
+def get_singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    获取所有合并器的统计信息 / Get statistics for all coalescers
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 以名称为键的统计信息 / Statistics keyed by name
+    """
+    with _registry_lock:
+        singleflights = dict(_singleflights)
+    return {name: singleflight.stats() for name, singleflight in singleflights.items()}
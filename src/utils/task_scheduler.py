@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+任务图调度器 / Task Graph Scheduler
+声明式任务图（任务类型 → 工厂、依赖、智能体），由任务分配结果构建执行计划，裁剪不需要的节点，
+并在线程池中并发执行所有依赖已满足的任务
+/ Declarative task graph (task type → factory, dependencies, agents). Builds an execution plan from the task
+allocation result, prunes nodes that are not needed and runs every task whose dependencies are met concurrently
+on a thread pool
+
+依赖类型 / Dependency kinds:
+    depends_on  必需依赖：未请求时被自动加入（或以占位任务提供上下文） / required: added automatically when not
+                requested (or provided as a placeholder context task)
+    optional    可选依赖：仅当其在计划中时才作为上下文并决定执行顺序 / optional: used as context and ordering only
+                when it is part of the plan
+    implies     请求该类型时一并加入的类型 / types added whenever this type is requested
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 配置日志 / Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# 工厂函数：(智能体列表, 依赖类型到任务列表的映射) -> 任务列表
+# Factory: (agents, dependency type to tasks) -> tasks
+TaskFactory = Callable[[List[Any], Dict[str, List[Any]]], List[Any]]
+
+
+class TaskNode:
+    """任务图节点类 / Task graph node class"""
+
+    def __init__(self,
+                 task_type: str,
+                 factory: TaskFactory,
+                 depends_on: Sequence[str] = (),
+                 optional: Sequence[str] = (),
+                 implies: Sequence[str] = (),
+                 placeholder: Optional[TaskFactory] = None):
+        """
+        初始化节点 / Initialize the node
+
+        Args:
+            task_type (str): 任务类型 / Task type
+            factory (TaskFactory): 创建该类型任务的工厂 / Factory creating the tasks of this type
+            depends_on (Sequence[str]): 必需依赖 / Required dependencies
+            optional (Sequence[str]): 可选依赖 / Optional dependencies
+            implies (Sequence[str]): 请求该类型时一并加入的类型 / Types added whenever this type is requested
+            placeholder (TaskFactory, optional): 作为依赖但未被请求时，创建只提供上下文、不执行的占位任务
+                / Creates context-only placeholder tasks (never executed) when the type is needed but not requested
+        """
+        self.task_type = task_type
+        self.factory = factory
+        self.depends_on = tuple(depends_on)
+        self.optional = tuple(optional)
+        self.implies = tuple(implies)
+        self.placeholder = placeholder
+
+
+class TaskPlan:
+    """执行计划类：按拓扑顺序排列的任务及其依赖 / Execution plan class: tasks in topological order with their dependencies"""
+
+    def __init__(self):
+        self.order: List[str] = []
+        self.tasks: Dict[str, List[Any]] = {}
+        self.placeholders: Dict[str, List[Any]] = {}
+        self.dependencies: Dict[str, Tuple[str, ...]] = {}
+        self.ignored: List[str] = []
+
+    def units(self) -> Dict[str, Tuple[Any, Tuple[str, ...]]]:
+        """
+        将计划展开为可调度单元（每个任务一个） / Expand the plan into schedulable units (one per task)
+
+        Returns:
+            Dict[str, Tuple]: 单元名称到 (任务, 依赖单元名称) 的映射，按拓扑顺序 / Unit name to (task, dependency unit names), in topological order
+        """
+        names = {
+            task_type: [task_type] if len(tasks) == 1 else [f"{task_type}[{index}]" for index in range(len(tasks))]
+            for task_type, tasks in self.tasks.items()
+        }
+        units = {}
+        for task_type in self.order:
+            deps = tuple(name for dep in self.dependencies[task_type] for name in names[dep])
+            for name, task in zip(names[task_type], self.tasks[task_type]):
+                units[name] = (task, deps)
+        return units
+
+    def all_tasks(self) -> List[Any]:
+        """
+        按拓扑顺序获取所有需要执行的任务 / Get every task to execute, in topological order
+
+        Returns:
+            List[Any]: 任务列表 / Tasks
+        """
+        return [task for task_type in self.order for task in self.tasks[task_type]]
+
+    def agents(self) -> List[Any]:
+        """
+        获取参与执行的智能体（按首次出现去重） / Get the participating agents (deduplicated by first appearance)
+
+        Returns:
+            List[Any]: 智能体列表 / Agents
+        """
+        agents = {}
+        for task in self.all_tasks():
+            agent = getattr(task, "agent", None)
+            if agent is not None:
+                agents.setdefault(id(agent), agent)
+        return list(agents.values())
+
+
+class TaskGraph:
+    """声明式任务图类 / Declarative task graph class"""
+
+    def __init__(self):
+        self.nodes: Dict[str, TaskNode] = {}
+
+    def add(self, node: TaskNode) -> "TaskGraph":
+        """
+        注册节点 / Register a node
+
+        Args:
+            node (TaskNode): 节点 / Node
+
+        Returns:
+            TaskGraph: 图本身，便于链式调用 / The graph, for chaining
+        """
+        self.nodes[node.task_type] = node
+        return self
+
+    def _select(self, requested: Iterable[str]) -> Tuple[List[str], List[str], List[str]]:
+        """
+        确定需要执行的类型、占位类型和被忽略的类型 / Determine executed types, placeholder types and ignored types
+
+        Returns:
+            Tuple[List[str], List[str], List[str]]: (执行的类型, 占位类型, 被忽略的类型)
+        """
+        ignored = [task_type for task_type in requested if task_type not in self.nodes]
+        selected = []
+        stack = [task_type for task_type in requested if task_type in self.nodes]
+        while stack:
+            task_type = stack.pop()
+            if task_type not in selected:
+                selected.append(task_type)
+                stack.extend(implied for implied in self.nodes[task_type].implies if implied in self.nodes)
+
+        # 补全必需依赖：有占位工厂的依赖只提供上下文，否则作为任务加入
+        # Complete required dependencies: dependencies with a placeholder only provide context, others join as tasks
+        placeholders = []
+        stack = list(selected)
+        while stack:
+            for dep in self.nodes[stack.pop()].depends_on:
+                if dep in selected or dep in placeholders:
+                    continue
+                if dep not in self.nodes:
+                    raise ValueError(f"任务类型依赖未注册的类型: {dep}")
+                if self.nodes[dep].placeholder is not None:
+                    placeholders.append(dep)
+                else:
+                    selected.append(dep)
+                    stack.append(dep)
+        return selected, placeholders, ignored
+
+    def _topological_order(self, selected: List[str], placeholders: List[str]) -> List[str]:
+        """按依赖对类型排序（保持注册顺序的稳定性） / Sort types by dependency (stable in registration order)"""
+        available = set(selected) | set(placeholders)
+        order: List[str] = []
+        visiting = set()
+
+        def visit(task_type: str) -> None:
+            if task_type in order:
+                return
+            if task_type in visiting:
+                raise ValueError(f"任务图存在循环依赖: {task_type}")
+            visiting.add(task_type)
+            node = self.nodes[task_type]
+            for dep in node.depends_on + node.optional:
+                if dep in available:
+                    visit(dep)
+            visiting.discard(task_type)
+            order.append(task_type)
+
+        for task_type in self.nodes:
+            if task_type in available:
+                visit(task_type)
+        return order
+
+    def build(self, requested: Iterable[str], resolve_agents: Callable[[str], List[Any]]) -> TaskPlan:
+        """
+        由请求的任务类型构建执行计划 / Build an execution plan from the requested task types
+
+        Args:
+            requested (Iterable[str]): 任务分配器给出的任务类型 / Task types from the task allocator
+            resolve_agents (Callable[[str], List]): 任务类型到智能体列表的解析函数 / Resolves a task type to its agents
+
+        Returns:
+            TaskPlan: 执行计划 / Execution plan
+        """
+        requested = list(requested)
+        selected, placeholders, ignored = self._select(requested)
+        if ignored:
+            logger.warning(f"任务图中没有以下任务类型，已忽略: {ignored}")
+
+        plan = TaskPlan()
+        plan.ignored = ignored
+        context: Dict[str, List[Any]] = {}
+        for task_type in self._topological_order(selected, placeholders):
+            node = self.nodes[task_type]
+            deps = {dep: context[dep] for dep in node.depends_on + node.optional if dep in context}
+            agents = resolve_agents(task_type)
+            if task_type in placeholders:
+                context[task_type] = plan.placeholders[task_type] = node.placeholder(agents, deps)
+                continue
+            tasks = node.factory(agents, deps)
+            context[task_type] = plan.tasks[task_type] = tasks
+            plan.order.append(task_type)
+            # 占位任务不执行，因此不构成调度依赖 / Placeholders never run, so they are not scheduling dependencies
+            plan.dependencies[task_type] = tuple(dep for dep in deps if dep in selected)
+        return plan
+
+
+class TaskScheduler:
+    """任务图调度器类 / Task graph scheduler class
+
+    依赖已满足的任务立即提交到线程池（受最大并发数限制）；任务失败时其下游任务被跳过。
+    / Tasks whose dependencies are met are submitted to the pool at once (bounded by the worker limit); when a task
+    fails its downstream tasks are skipped.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        初始化调度器 / Initialize the scheduler
+
+        Args:
+            max_workers (int): 最大并发任务数 / Maximum concurrent tasks
+        """
+        self.max_workers = max(1, max_workers)
+
+    def run(self,
+            plan: TaskPlan,
+            execute: Callable[[Any], Any]) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, float]]:
+        """
+        执行计划 / Run the plan
+
+        Args:
+            plan (TaskPlan): 执行计划 / Execution plan
+            execute (Callable[[Any], Any]): 执行单个任务并返回输出的函数 / Runs one task and returns its output
+
+        Returns:
+            Tuple: (各单元的输出, 失败单元的错误信息, 各单元耗时)，均以单元名称为键，输出按拓扑顺序排列
+            / (outputs, errors of failed units, per-unit timings), keyed by unit name; outputs are in topological order
+        """
+        pending = plan.units()
+        order = list(pending)
+        running: Dict[Future, str] = {}
+        completed: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        timings: Dict[str, float] = {}
+
+        def timed(task: Any) -> Tuple[Any, float]:
+            start_time = time.perf_counter()
+            output = execute(task)
+            return output, round(time.perf_counter() - start_time, 2)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="task-graph") as pool:
+            while pending or running:
+                # 提交所有依赖已满足的任务 / Submit every task whose dependencies are met
+                for name, (task, deps) in list(pending.items()):
+                    if any(dep in errors for dep in deps):
+                        del pending[name]
+                        errors[name] = "已跳过: 依赖的任务失败"
+                    elif all(dep in completed for dep in deps):
+                        del pending[name]
+                        running[pool.submit(timed, task)] = name
+
+                if not running:
+                    for name in pending:
+                        errors[name] = "未执行: 依赖关系无法满足"
+                    break
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        completed[name], timings[name] = future.result()
+                    except Exception as e:
+                        errors[name] = f"执行失败: {str(e)}"
+                        logger.error(f"任务 {name} 执行失败: {e}")
+
+        outputs = {name: completed[name] for name in order if name in completed}
+        return outputs, errors, timings